@@ -19,6 +19,12 @@ from kivy.uix.gridlayout import GridLayout
 
 from app.services.bluetooth_service import BluetoothService
 
+# Interval between RSSI tracking updates while scanning (seconds)
+TRACK_INTERVAL = 0.5
+
+# Interval between checks for departed devices (seconds)
+PRESENCE_INTERVAL = 1.0
+
 # Define the KV language string for the BluetoothScreen
 KV = '''
 <BluetoothScreen>:
@@ -84,10 +90,29 @@ class BluetoothDeviceItem(Button):
             **kwargs: Additional keyword arguments
         """
         super().__init__(**kwargs)
-        self.device_info = device_info
-        self.text = f"{device_info['name']} ({device_info['address']})"
         self.size_hint_y = None
         self.height = 50
+        self.update_device(device_info)
+        
+    def update_device(self, device_info):
+        """
+        Update the button with the latest device information.
+        
+        Args:
+            device_info: Dictionary containing device information
+        """
+        self.device_info = device_info
+        self.text = f"{device_info['name']} ({device_info['address']})"
+        
+        details = []
+        if device_info.get('major_class'):
+            details.append(device_info.get('minor_class') or device_info['major_class'])
+        if device_info.get('vendor'):
+            details.append(device_info['vendor'])
+        if device_info.get('distance') is not None:
+            details.append(f"{device_info['rssi_smoothed']:.0f} dBm, ~{device_info['distance']:.1f} m")
+        if details:
+            self.text += "\n" + ", ".join(details)
         
 class BluetoothScreen(BoxLayout):
     """
@@ -100,8 +125,12 @@ class BluetoothScreen(BoxLayout):
         self.bluetooth_service = BluetoothService()
         self.scanning = False
         self.scan_thread = None
+        self.scan_cancel = None
         self.selected_device = None
         self.selected_button = None
+        self.device_items = {}
+        self.pending_devices = []
+        self.presence_event = None
         
     def on_parent(self, widget, parent):
         """Called when the screen is added to a parent widget."""
@@ -116,6 +145,9 @@ class BluetoothScreen(BoxLayout):
             if not self.bluetooth_service.is_available():
                 self.show_message("Bluetooth Not Available", 
                                 "Bluetooth is not available on this device. Please make sure Bluetooth is enabled.")
+            elif not self.presence_event:
+                # Devices stay listed across scans until they depart
+                self.presence_event = Clock.schedule_interval(self.update_presence, PRESENCE_INTERVAL)
         except Exception as e:
             self.show_message("Bluetooth Error", 
                               f"Failed to initialize Bluetooth: {str(e)}")
@@ -136,14 +168,19 @@ class BluetoothScreen(BoxLayout):
         
         self.scanning = True
         self.ids.scan_button.text = "Stop Scan"
-        self.ids.device_list.clear_widgets()
+        self.pending_devices = []
         self.ids.scan_progress.value = 0
         
         # Start progress animation
         self.progress_event = Clock.schedule_interval(self.update_progress, 0.1)
         
-        # Start scan in a separate thread
-        self.scan_thread = threading.Thread(target=self.scan_process)
+        # Smooth RSSI for all devices seen since the last tick
+        self.track_event = Clock.schedule_interval(self.update_tracking, TRACK_INTERVAL)
+        
+        # Start scan in a separate thread; the scan gets its own cancel
+        # event so stopping it cannot affect a later scan
+        self.scan_cancel = threading.Event()
+        self.scan_thread = threading.Thread(target=self.scan_process, args=(self.scan_cancel,))
         self.scan_thread.daemon = True
         self.scan_thread.start()
     
@@ -151,33 +188,114 @@ class BluetoothScreen(BoxLayout):
         """Stop Bluetooth scanning process."""
         if self.scanning:
             self.scanning = False
+            self.scan_cancel.set()
             self.ids.scan_button.text = "Start Scan"
             if hasattr(self, 'progress_event'):
                 self.progress_event.cancel()
+            if hasattr(self, 'track_event'):
+                self.track_event.cancel()
+            self.update_tracking(0)
             self.ids.scan_progress.value = 0
     
-    def scan_process(self):
-        """Background process for Bluetooth scanning."""
+    def scan_process(self, cancel_event):
+        """
+        Background process for Bluetooth scanning.
+        
+        Args:
+            cancel_event: threading.Event that stops this scan when set
+        """
         try:
-            devices = self.bluetooth_service.scan_devices()
+            def device_callback(device):
+                # Show each device as soon as it is discovered
+                Clock.schedule_once(lambda dt: self.add_device(device))
+                
+            def name_callback(device):
+                # Names are resolved after the device was listed
+                Clock.schedule_once(lambda dt: self.update_device_name(device))
+                
+            self.bluetooth_service.scan_devices(callback=device_callback, on_name=name_callback,
+                                                cancel_event=cancel_event)
             
-            # Update UI on the main thread
-            def update_ui(dt):
-                self.ids.device_list.clear_widgets()
-                for device in devices:
-                    item = BluetoothDeviceItem(device)
-                    item.bind(on_release=self.select_device)
-                    self.ids.device_list.add_widget(item)
-                self.stop_scan()
+            # The scan scheduler owns presence while monitoring
+            if not self.bluetooth_service.is_monitoring():
+                self.bluetooth_service.update_presence()
                 
-            Clock.schedule_once(update_ui)
+            Clock.schedule_once(lambda dt: self.scan_finished(cancel_event))
             
         except Exception as e:
             def show_error(dt):
                 self.show_message("Scan Error", f"Error during scan: {str(e)}")
-                self.stop_scan()
+                self.scan_finished(cancel_event)
             Clock.schedule_once(show_error)
     
+    def scan_finished(self, cancel_event):
+        """
+        Stop scanning once a scan thread ends, unless a newer scan has
+        been started since.
+        
+        Args:
+            cancel_event: threading.Event of the scan that ended
+        """
+        if cancel_event is self.scan_cancel:
+            self.stop_scan()
+    
+    def add_device(self, device):
+        """
+        Add a discovered device to the device list.
+        
+        Args:
+            device: Dictionary containing device information
+        """
+        if not self.scanning:
+            return
+            
+        self.pending_devices.append(device)
+        
+        item = self.device_items.get(device['address'])
+        if item:
+            item.update_device(device)
+        else:
+            item = BluetoothDeviceItem(device)
+            item.bind(on_release=self.select_device)
+            self.device_items[device['address']] = item
+            self.ids.device_list.add_widget(item)
+    
+    def update_device_name(self, device):
+        """
+        Refresh a listed device after its name was resolved.
+        
+        Args:
+            device: Dictionary containing device information
+        """
+        item = self.device_items.get(device['address'])
+        if item:
+            item.update_device(device)
+    
+    def update_tracking(self, dt):
+        """Apply RSSI smoothing to the devices seen since the last tick."""
+        if not self.pending_devices:
+            return
+            
+        devices = self.pending_devices
+        self.pending_devices = []
+        self.bluetooth_service.track_devices(devices)
+        
+        for device in devices:
+            item = self.device_items.get(device['address'])
+            if item:
+                item.update_device(device)
+    
+    def update_presence(self, dt):
+        """Remove the devices that departed from the device list."""
+        present = {entry['address'] for entry in self.bluetooth_service.get_present_devices()}
+        for address in [a for a in self.device_items if a not in present]:
+            item = self.device_items.pop(address)
+            self.ids.device_list.remove_widget(item)
+            if item is self.selected_button:
+                self.selected_button = None
+                self.selected_device = None
+                self.ids.record_button.disabled = True
+    
     def update_progress(self, dt):
         """Update the scan progress indicator."""
         self.ids.scan_progress.value = (self.ids.scan_progress.value + 2) % 100
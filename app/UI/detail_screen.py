@@ -3,6 +3,7 @@ Detail screen implementation for Signal Catcher app.
 Displays detailed information about a selected signal record.
 Using standard Kivy widgets instead of KivyMD.
 """
+import threading
 from kivy.lang import Builder
 from kivy.clock import Clock
 from kivy.utils import platform
@@ -15,6 +16,7 @@ import datetime
 from app.services.storage_service import StorageService
 from app.services.bluetooth_service import BluetoothService
 from app.services.infrared_service import InfraredService
+from app.services.ir_decoder import format_code
 
 # Define the KV language string for the DetailScreen
 KV = '''
@@ -147,12 +149,19 @@ class DetailScreen(BoxLayout):
         
         # Format properties based on signal type
         if record.get('type') == 'bluetooth':
+            device_class = record.get('major_class') or 'Unknown'
+            if record.get('minor_class'):
+                device_class += f" / {record['minor_class']}"
+                
             properties = f"Properties:\n" \
                          f"Device Name: {record.get('device_name', 'Unknown')}\n" \
                          f"Device Address: {record.get('address', 'Unknown')}\n" \
+                         f"Vendor: {record.get('vendor') or 'Unknown'}\n" \
+                         f"Class: {device_class}\n" \
                          f"Signal Strength: {record.get('rssi', 'Unknown')} dBm"
         else:  # infrared
             properties = f"Properties:\n" \
+                         f"Code: {format_code(record)}\n" \
                          f"Frequency: {record.get('frequency', 'Unknown')} Hz\n" \
                          f"Duration: {record.get('duration', 'Unknown')} ms"
                          
@@ -209,7 +218,13 @@ class DetailScreen(BoxLayout):
                     share_text += f"Device: {self.current_record.get('device_name', 'Unknown')}\n" \
                                  f"Address: {self.current_record.get('address', 'Unknown')}"
                 else:
-                    share_text += f"Frequency: {self.current_record.get('frequency', 'Unknown')} Hz"
+                    # Infrared codes are shared as Pronto hex, which other
+                    # IR tools can import directly
+                    pronto = self.infrared_service.get_pronto_code(self.current_record)
+                    if pronto:
+                        share_text = f"{record_name} ({format_code(self.current_record)})\n{pronto}"
+                    else:
+                        share_text += f"Frequency: {self.current_record.get('frequency', 'Unknown')} Hz"
                 
                 intent.putExtra(Intent.EXTRA_TEXT, String(share_text))
                 intent.setType('text/plain')
@@ -235,14 +250,22 @@ class DetailScreen(BoxLayout):
             # Attempt to transmit based on signal type
             if signal_type == 'bluetooth':
                 if self.bluetooth_service.is_available():
-                    success = self.bluetooth_service.transmit_signal(self.current_record)
-                    self.show_transmission_result(success)
+                    # Connecting can take seconds; keep it off the UI thread
+                    thread = threading.Thread(target=self.bluetooth_transmit_process,
+                                              args=(self.current_record,))
+                    thread.daemon = True
+                    thread.start()
                 else:
                     self.show_message("Not Available", "Bluetooth not available for transmission")
             elif signal_type == 'infrared':
                 if self.infrared_service.is_available():
-                    success = self.infrared_service.transmit_signal(self.current_record)
-                    self.show_transmission_result(success)
+                    # Sent from the transmit queue; the UI is not blocked
+                    future = self.infrared_service.transmit_signal(
+                        self.current_record,
+                        callback=lambda report: Clock.schedule_once(
+                            lambda dt: self.show_transmission_result(report['success'])))
+                    if future is None:
+                        self.show_transmission_result(False)
                 else:
                     self.show_message("Not Available", "Infrared not available for transmission")
             else:
@@ -251,6 +274,33 @@ class DetailScreen(BoxLayout):
         except Exception as e:
             self.show_message("Error", f"Error transmitting signal: {str(e)}")
     
+    def bluetooth_transmit_process(self, record):
+        """
+        Background process sending a Bluetooth record.
+        
+        Records belonging to a device group are sent to every device of
+        the group.
+        
+        Args:
+            record: The Bluetooth record to transmit
+        """
+        payload = self.bluetooth_service.get_payload(record)
+        results = self.bluetooth_service.broadcast(
+            payload,
+            addresses=[record.get('address')],
+            group=record.get('device_group')
+        )
+        
+        def show_result(dt):
+            if len(results) <= 1:
+                self.show_transmission_result(bool(results) and results[0]['success'])
+            else:
+                sent = sum(1 for result in results if result['success'])
+                self.show_message("Broadcast Complete",
+                                  f"Signal sent to {sent} of {len(results)} devices")
+                                  
+        Clock.schedule_once(show_result)
+    
     def show_transmission_result(self, success):
         """
         Show the result of a transmission attempt.
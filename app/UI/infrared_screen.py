@@ -16,6 +16,13 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.popup import Popup
 
 from app.services.infrared_service import InfraredService
+from app.services.ir_decoder import format_code
+
+# Most detected signals taken from the service buffer per frame
+SIGNALS_PER_FRAME = 32
+
+# Most signal cards kept in the recent signals list
+MAX_SIGNAL_CARDS = 50
 
 # Define the KV language string for the InfraredScreen
 KV = '''
@@ -123,6 +130,7 @@ class IRSignalCard(BoxLayout):
         # Add signal info to the card
         label = Label(
             text=(f"Signal detected at {signal_info['timestamp']}\n"
+                 f"Code: {format_code(signal_info)}\n"
                  f"Frequency: {signal_info.get('frequency', 'Unknown')} Hz\n"
                  f"Duration: {signal_info.get('duration', 'Unknown')} ms"),
             halign="left",
@@ -189,6 +197,9 @@ class InfraredScreen(BoxLayout):
         # Start progress animation
         self.progress_event = Clock.schedule_interval(self.update_progress, 0.1)
         
+        # Take detected signals in batches once per frame
+        self.drain_event = Clock.schedule_interval(self.update_signals, 0)
+        
         # Start listening in a separate thread
         self.listen_thread = threading.Thread(target=self.listen_process)
         self.listen_thread.daemon = True
@@ -201,30 +212,17 @@ class InfraredScreen(BoxLayout):
             self.ids.listen_button.text = "Start Listening"
             if hasattr(self, 'progress_event'):
                 self.progress_event.cancel()
+            if hasattr(self, 'drain_event'):
+                self.drain_event.cancel()
             self.ids.listen_progress.value = 0
             self.infrared_service.stop_listening()
+            self.update_signals(0)
     
     def listen_process(self):
         """Background process for infrared listening."""
         try:
-            def signal_callback(signal):
-                def update_ui(dt):
-                    self.current_signal = signal
-                    self.ids.signal_info.text = (
-                        f"Signal detected!\n"
-                        f"Frequency: {signal.get('frequency', 'Unknown')} Hz\n"
-                        f"Duration: {signal.get('duration', 'Unknown')} ms\n"
-                        f"Pattern: {signal.get('pattern', 'Unknown')}"
-                    )
-                    self.ids.record_button.disabled = False
-                    
-                    # Add to recent signals list
-                    signal_card = IRSignalCard(signal)
-                    self.ids.signal_list.add_widget(signal_card)
-                    
-                Clock.schedule_once(update_ui)
-            
-            self.infrared_service.start_listening(signal_callback)
+            # Detected signals are buffered by the service (see update_signals)
+            self.infrared_service.start_listening()
             
         except Exception as e:
             def show_error(dt):
@@ -232,6 +230,36 @@ class InfraredScreen(BoxLayout):
                 self.stop_listening()
             Clock.schedule_once(show_error)
     
+    def update_signals(self, dt):
+        """Show the signals detected since the last frame."""
+        signals = self.infrared_service.drain_signals(SIGNALS_PER_FRAME)
+        if not signals:
+            return
+            
+        # Only the latest signal of a burst is shown in detail
+        signal = signals[-1]
+        self.current_signal = signal
+        info = (
+            f"Signal detected!\n"
+            f"Code: {format_code(signal)}\n"
+            f"Frequency: {signal.get('frequency', 'Unknown')} Hz\n"
+            f"Duration: {signal.get('duration', 'Unknown')} ms\n"
+            f"Pattern: {signal.get('pattern', 'Unknown')}"
+        )
+        dropped = self.infrared_service.get_buffer_stats()['dropped']
+        if dropped:
+            info += f"\nDropped: {dropped} signals"
+        self.ids.signal_info.text = info
+        self.ids.record_button.disabled = False
+        
+        # Add to recent signals list, keeping it bounded
+        signal_list = self.ids.signal_list
+        for signal in signals[-MAX_SIGNAL_CARDS:]:
+            signal_list.add_widget(IRSignalCard(signal))
+        while len(signal_list.children) > MAX_SIGNAL_CARDS:
+            # Kivy keeps the most recently added widget first
+            signal_list.remove_widget(signal_list.children[-1])
+    
     def update_progress(self, dt):
         """Update the listening progress indicator."""
         self.ids.listen_progress.value = (self.ids.listen_progress.value + 1) % 100
@@ -5,18 +5,45 @@ Handles SQLite database operations for storing signal records.
 import os
 import sqlite3
 import json
+import threading
 from kivy.utils import platform
 
 class Database:
     """
     SQLite database manager for the Signal Catcher app.
     Handles database creation, connection, and operations.
+    
+    The UI, scan scheduler and background worker threads share one
+    instance; each operation holds the instance's lock from connect() to
+    disconnect(), so threads never use or close each other's connection.
     """
+    # Signal properties that are also stored in their own indexed columns
+    # so they can be filtered without decoding the properties blob
+    INDEXED_COLUMNS = (
+        ('address', 'TEXT'),
+        ('device_group', 'TEXT'),
+        ('vendor', 'TEXT'),
+        ('identity_id', 'TEXT'),
+        ('major_class', 'TEXT'),
+        ('minor_class', 'TEXT'),
+        ('service_bits', 'INTEGER'),
+        ('ir_protocol', 'TEXT'),
+        ('ir_address', 'INTEGER'),
+        ('ir_command', 'INTEGER'),
+        ('ir_repeat', 'INTEGER'),
+        ('pattern_hash', 'TEXT'),
+    )
+    
+    # Most values bound in one query (SQLite builds before 3.32 allow 999)
+    MAX_QUERY_VALUES = 500
+    
     def __init__(self):
         """Initialize the database manager."""
         self.conn = None
         self.cursor = None
         self.db_path = self._get_db_path()
+        self._lock = threading.RLock()
+        self._depth = 0
         
     def _get_db_path(self):
         """
@@ -51,32 +78,169 @@ class Database:
                 )
             ''')
             
+            self._setup_indexed_columns()
+            
+            # Create presence events table
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS presence_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    address TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    first_seen REAL,
+                    last_seen REAL,
+                    properties TEXT
+                )
+            ''')
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_presence_events_address
+                ON presence_events (address, timestamp)
+            ''')
+            
+            # Create infrared pattern similarity index (LSH band keys)
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS pattern_bands (
+                    band INTEGER NOT NULL,
+                    signal_id TEXT NOT NULL
+                )
+            ''')
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pattern_bands_band
+                ON pattern_bands (band)
+            ''')
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pattern_bands_signal
+                ON pattern_bands (signal_id)
+            ''')
+            
             self.conn.commit()
         except Exception as e:
             print(f"Database setup error: {str(e)}")
         finally:
             self.disconnect()
             
+    def _setup_indexed_columns(self):
+        """Add missing indexed columns, backfilling them from existing rows."""
+        self.cursor.execute("PRAGMA table_info(signals)")
+        existing = {row['name'] for row in self.cursor.fetchall()}
+        
+        added = []
+        for column, column_type in self.INDEXED_COLUMNS:
+            if column not in existing:
+                self.cursor.execute(f"ALTER TABLE signals ADD COLUMN {column} {column_type}")
+                added.append(column)
+            self.cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_signals_{column} ON signals ({column})")
+                
+        if added:
+            self.cursor.execute("SELECT id, properties FROM signals")
+            for row in self.cursor.fetchall():
+                try:
+                    properties = json.loads(row['properties'] or '{}')
+                except ValueError:
+                    continue
+                self.cursor.execute(
+                    f"UPDATE signals SET {', '.join(f'{c} = ?' for c in added)} WHERE id = ?",
+                    [properties.get(c) for c in added] + [row['id']])
+                    
+    def _row_values(self, signal_dict):
+        """
+        Convert a signal dictionary into column values.
+        
+        Args:
+            signal_dict: Dictionary containing signal data
+            
+        Returns:
+            Tuple of (column names, values)
+        """
+        # Extract data field
+        data = signal_dict.get('data')
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+            
+        # Extract all other properties
+        properties_dict = {k: v for k, v in signal_dict.items() 
+                         if k not in ('id', 'type', 'name', 'timestamp', 'data')}
+        properties = json.dumps(properties_dict)
+        
+        columns = ['type', 'name', 'timestamp', 'data', 'properties']
+        values = [signal_dict.get('type'), signal_dict.get('name'),
+                  signal_dict.get('timestamp'), data, properties]
+                  
+        for column, _ in self.INDEXED_COLUMNS:
+            columns.append(column)
+            values.append(signal_dict.get(column))
+            
+        return columns, values
+        
+    def _row_to_dict(self, row):
+        """
+        Convert a database row into a signal dictionary.
+        
+        Args:
+            row: sqlite3.Row from the signals table
+            
+        Returns:
+            Dictionary containing signal data
+        """
+        result = dict(row)
+        
+        # Indexed columns duplicate the properties; drop empty ones
+        for column, _ in self.INDEXED_COLUMNS:
+            if result.get(column) is None:
+                result.pop(column, None)
+        
+        # Parse JSON fields
+        if 'data' in result and result['data']:
+            try:
+                result['data'] = json.loads(result['data'])
+            except:
+                pass  # Keep as string if not valid JSON
+                
+        if 'properties' in result and result['properties']:
+            try:
+                properties = json.loads(result['properties'])
+                # Merge properties into the result
+                result.update(properties)
+                del result['properties']
+            except:
+                pass
+                
+        return result
+            
     def connect(self):
-        """Establish a connection to the SQLite database."""
+        """
+        Establish a connection to the SQLite database.
+        
+        Takes the database lock, which is held until the matching
+        disconnect() call; calls may nest within one thread.
+        """
+        self._lock.acquire()
+        self._depth += 1
         if not self.conn:
             self.conn = sqlite3.connect(self.db_path)
             self.conn.row_factory = sqlite3.Row  # Enable row access by column name
             self.cursor = self.conn.cursor()
             
     def disconnect(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            self.cursor = None
+        """Close the database connection and release the database lock."""
+        try:
+            self._depth -= 1
+            if self._depth == 0 and self.conn:
+                self.conn.close()
+                self.conn = None
+                self.cursor = None
+        finally:
+            self._lock.release()
             
-    def insert_signal(self, signal_dict):
+    def insert_signal(self, signal_dict, pattern_bands=None):
         """
         Insert a new signal record into the database.
         
         Args:
             signal_dict: Dictionary containing signal data
+            pattern_bands: Optional similarity index band keys of the
+                signal's pattern, stored in the same transaction
             
         Returns:
             String ID of the inserted record or None on failure
@@ -84,28 +248,18 @@ class Database:
         try:
             self.connect()
             
-            # Extract main fields
             signal_id = signal_dict.get('id')
-            signal_type = signal_dict.get('type')
-            signal_name = signal_dict.get('name')
-            signal_timestamp = signal_dict.get('timestamp')
-            
-            # Extract data field
-            data = signal_dict.get('data')
-            if isinstance(data, (dict, list)):
-                data = json.dumps(data)
-                
-            # Extract all other properties
-            properties_dict = {k: v for k, v in signal_dict.items() 
-                             if k not in ('id', 'type', 'name', 'timestamp', 'data')}
-            properties = json.dumps(properties_dict)
+            columns, values = self._row_values(signal_dict)
             
             # Insert the record
-            self.cursor.execute('''
-                INSERT INTO signals (id, type, name, timestamp, data, properties)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (signal_id, signal_type, signal_name, signal_timestamp, data, properties))
+            self.cursor.execute(f'''
+                INSERT INTO signals (id, {', '.join(columns)})
+                VALUES (?, {', '.join('?' for _ in columns)})
+            ''', [signal_id] + values)
             
+            if pattern_bands:
+                self._write_pattern_bands(signal_id, pattern_bands)
+                
             self.conn.commit()
             return signal_id
             
@@ -117,6 +271,86 @@ class Database:
         finally:
             self.disconnect()
             
+    def insert_signals(self, signal_dicts, pattern_bands=None):
+        """
+        Insert several signal records in a single transaction.
+        
+        Args:
+            signal_dicts: List of dictionaries containing signal data
+            pattern_bands: Optional list of similarity index band keys, one
+                list (or None) per signal
+            
+        Returns:
+            Number of records inserted
+        """
+        if not signal_dicts:
+            return 0
+            
+        try:
+            self.connect()
+            
+            rows = []
+            for signal_dict in signal_dicts:
+                columns, values = self._row_values(signal_dict)
+                rows.append([signal_dict.get('id')] + values)
+                
+            self.cursor.executemany(f'''
+                INSERT INTO signals (id, {', '.join(columns)})
+                VALUES (?, {', '.join('?' for _ in columns)})
+            ''', rows)
+            
+            if pattern_bands is not None:
+                self.cursor.executemany('''
+                    INSERT INTO pattern_bands (band, signal_id) VALUES (?, ?)
+                ''', [(band, signal_dict.get('id'))
+                      for signal_dict, bands in zip(signal_dicts, pattern_bands)
+                      for band in bands or ()])
+                
+            self.conn.commit()
+            return len(rows)
+            
+        except Exception as e:
+            print(f"Error inserting signals: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return 0
+        finally:
+            self.disconnect()
+            
+    def get_existing_values(self, column, values):
+        """
+        Find which values of an indexed column are already stored.
+        
+        Args:
+            column: Indexed column name (see INDEXED_COLUMNS)
+            values: Values to look up
+            
+        Returns:
+            Set of the values found
+        """
+        values = list(set(values))
+        try:
+            self.connect()
+            
+            if column not in {name for name, _ in self.INDEXED_COLUMNS}:
+                raise ValueError(f"Column {column} is not indexed")
+                
+            found = set()
+            for start in range(0, len(values), self.MAX_QUERY_VALUES):
+                chunk = values[start:start + self.MAX_QUERY_VALUES]
+                self.cursor.execute(f'''
+                    SELECT DISTINCT {column} FROM signals
+                    WHERE {column} IN ({', '.join('?' for _ in chunk)})
+                ''', chunk)
+                found.update(row[0] for row in self.cursor.fetchall())
+            return found
+            
+        except Exception as e:
+            print(f"Error looking up stored values: {str(e)}")
+            return set()
+        finally:
+            self.disconnect()
+            
     def get_signal(self, signal_id):
         """
         Retrieve a signal record by ID.
@@ -138,26 +372,7 @@ class Database:
             if not row:
                 return None
                 
-            # Convert row to dictionary
-            result = dict(row)
-            
-            # Parse JSON fields
-            if 'data' in result and result['data']:
-                try:
-                    result['data'] = json.loads(result['data'])
-                except:
-                    pass  # Keep as string if not valid JSON
-                    
-            if 'properties' in result and result['properties']:
-                try:
-                    properties = json.loads(result['properties'])
-                    # Merge properties into the result
-                    result.update(properties)
-                    del result['properties']
-                except:
-                    pass
-                    
-            return result
+            return self._row_to_dict(row)
             
         except Exception as e:
             print(f"Error getting signal: {str(e)}")
@@ -185,46 +400,259 @@ class Database:
                 query = "SELECT * FROM signals ORDER BY timestamp DESC"
                 self.cursor.execute(query)
                 
-            rows = self.cursor.fetchall()
-            result = []
+            return [self._row_to_dict(row) for row in self.cursor.fetchall()]
+            
+        except Exception as e:
+            print(f"Error getting signals: {str(e)}")
+            return []
+        finally:
+            self.disconnect()
+            
+    def iter_signals(self, signal_type=None, batch_size=1000, missing=None):
+        """
+        Retrieve all signal records in batches, for jobs over the whole table.
+        
+        Args:
+            signal_type: Optional type to filter by
+            batch_size: Number of records per batch
+            missing: Optional indexed column that must be empty, e.g. to
+                backfill it
             
+        Yields:
+            Lists of up to batch_size dictionaries containing signal data
+        """
+        last_rowid = 0
+        while True:
+            try:
+                self.connect()
+                
+                query = "SELECT rowid AS signal_rowid, * FROM signals WHERE rowid > ?"
+                params = [last_rowid]
+                if signal_type:
+                    query += " AND type = ?"
+                    params.append(signal_type)
+                if missing:
+                    if missing not in {column for column, _ in self.INDEXED_COLUMNS}:
+                        raise ValueError(f"Column {missing} is not indexed")
+                    query += f" AND {missing} IS NULL"
+                query += " ORDER BY rowid LIMIT ?"
+                params.append(batch_size)
+                
+                self.cursor.execute(query, params)
+                rows = self.cursor.fetchall()
+                
+            except Exception as e:
+                print(f"Error getting signals: {str(e)}")
+                return
+            finally:
+                self.disconnect()
+                
+            if not rows:
+                return
+                
+            last_rowid = rows[-1]['signal_rowid']
+            batch = []
             for row in rows:
-                # Convert row to dictionary
-                signal_dict = dict(row)
+                signal = self._row_to_dict(row)
+                del signal['signal_rowid']
+                batch.append(signal)
+            yield batch
+            
+    def find_signals(self, signal_type=None, since=None, until=None, limit=None,
+                     service_mask=None, **filters):
+        """
+        Retrieve signal records matching indexed column values.
+        
+        Args:
+            signal_type: Optional type to filter by
+            since: Optional minimum timestamp
+            until: Optional maximum timestamp
+            limit: Optional maximum number of records
+            service_mask: Optional Class of Device service bits that must
+                all be set (see device_class.service_mask())
+            **filters: Indexed column values to match (see INDEXED_COLUMNS)
+            
+        Returns:
+            List of dictionaries containing signal data
+        """
+        try:
+            self.connect()
+            
+            indexed = {column for column, _ in self.INDEXED_COLUMNS}
+            conditions = []
+            params = []
+            
+            if signal_type:
+                conditions.append("type = ?")
+                params.append(signal_type)
+            if since is not None:
+                conditions.append("timestamp >= ?")
+                params.append(since)
+            if until is not None:
+                conditions.append("timestamp <= ?")
+                params.append(until)
+            if service_mask:
+                conditions.append("service_bits & ? = ?")
+                params.extend([service_mask, service_mask])
+                
+            for column, value in filters.items():
+                if column not in indexed:
+                    raise ValueError(f"Column {column} is not indexed")
+                conditions.append(f"{column} = ?")
+                params.append(value)
                 
-                # Parse JSON fields
-                if 'data' in signal_dict and signal_dict['data']:
-                    try:
-                        signal_dict['data'] = json.loads(signal_dict['data'])
-                    except:
-                        pass  # Keep as string if not valid JSON
-                        
-                if 'properties' in signal_dict and signal_dict['properties']:
-                    try:
-                        properties = json.loads(signal_dict['properties'])
-                        # Merge properties into the result
-                        signal_dict.update(properties)
-                        del signal_dict['properties']
-                    except:
-                        pass
-                        
-                result.append(signal_dict)
+            query = "SELECT * FROM signals"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY timestamp DESC"
+            if limit:
+                query += " LIMIT ?"
+                params.append(limit)
                 
-            return result
+            self.cursor.execute(query, params)
+            return [self._row_to_dict(row) for row in self.cursor.fetchall()]
             
         except Exception as e:
-            print(f"Error getting signals: {str(e)}")
+            print(f"Error finding signals: {str(e)}")
             return []
         finally:
             self.disconnect()
             
-    def update_signal(self, signal_id, signal_dict):
+    def update_device_name(self, address, name, unknown_name='Unknown Device'):
+        """
+        Fill in the name of stored Bluetooth records whose name was unknown.
+        
+        Args:
+            address: Device address
+            name: Resolved device name
+            unknown_name: Placeholder name given to unnamed devices
+            
+        Returns:
+            Number of records updated
+        """
+        try:
+            self.connect()
+            
+            self.cursor.execute('''
+                SELECT id, properties FROM signals
+                WHERE type = 'bluetooth' AND address = ? AND name = ?
+            ''', (address, unknown_name))
+            
+            updated = 0
+            for row in self.cursor.fetchall():
+                properties = json.loads(row['properties'] or '{}')
+                properties['device_name'] = name
+                self.cursor.execute('''
+                    UPDATE signals SET name = ?, properties = ? WHERE id = ?
+                ''', (name, json.dumps(properties), row['id']))
+                updated += 1
+                
+            self.conn.commit()
+            return updated
+            
+        except Exception as e:
+            print(f"Error updating device name: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return 0
+        finally:
+            self.disconnect()
+            
+    def insert_presence_events(self, events):
+        """
+        Insert device arrive/depart events in a single transaction.
+        
+        Args:
+            events: List of event dictionaries with address, event,
+                timestamp, first_seen and last_seen keys
+            
+        Returns:
+            Number of events inserted
+        """
+        try:
+            self.connect()
+            
+            rows = []
+            for event in events:
+                properties = {k: v for k, v in event.items()
+                              if k not in ('address', 'event', 'timestamp', 'first_seen', 'last_seen')}
+                rows.append((event.get('address'), event.get('event'), event.get('timestamp'),
+                             event.get('first_seen'), event.get('last_seen'),
+                             json.dumps(properties)))
+                
+            self.cursor.executemany('''
+                INSERT INTO presence_events
+                    (address, event, timestamp, first_seen, last_seen, properties)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+            
+            self.conn.commit()
+            return len(rows)
+            
+        except Exception as e:
+            print(f"Error inserting presence events: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return 0
+        finally:
+            self.disconnect()
+            
+    def get_presence_events(self, address=None, since=None, limit=None):
+        """
+        Retrieve device arrive/depart events, newest first.
+        
+        Args:
+            address: Optional device address to filter by
+            since: Optional minimum timestamp
+            limit: Optional maximum number of events
+            
+        Returns:
+            List of event dictionaries
+        """
+        try:
+            self.connect()
+            
+            conditions = []
+            params = []
+            if address:
+                conditions.append("address = ?")
+                params.append(address)
+            if since is not None:
+                conditions.append("timestamp >= ?")
+                params.append(since)
+                
+            query = "SELECT * FROM presence_events"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY timestamp DESC, id DESC"
+            if limit:
+                query += " LIMIT ?"
+                params.append(limit)
+                
+            self.cursor.execute(query, params)
+            
+            events = []
+            for row in self.cursor.fetchall():
+                event = dict(row)
+                event.update(json.loads(event.pop('properties') or '{}'))
+                events.append(event)
+            return events
+            
+        except Exception as e:
+            print(f"Error getting presence events: {str(e)}")
+            return []
+        finally:
+            self.disconnect()
+            
+    def update_signal(self, signal_id, signal_dict, pattern_bands=None):
         """
         Update an existing signal record.
         
         Args:
             signal_id: ID of the signal to update
             signal_dict: Dictionary containing updated signal data
+            pattern_bands: Optional similarity index band keys replacing
+                the stored ones
             
         Returns:
             Boolean indicating success or failure
@@ -232,30 +660,22 @@ class Database:
         try:
             self.connect()
             
-            # Extract main fields
-            signal_type = signal_dict.get('type')
-            signal_name = signal_dict.get('name')
-            signal_timestamp = signal_dict.get('timestamp')
-            
-            # Extract data field
-            data = signal_dict.get('data')
-            if isinstance(data, (dict, list)):
-                data = json.dumps(data)
-                
-            # Extract all other properties
-            properties_dict = {k: v for k, v in signal_dict.items() 
-                             if k not in ('id', 'type', 'name', 'timestamp', 'data')}
-            properties = json.dumps(properties_dict)
+            columns, values = self._row_values(signal_dict)
             
             # Update the record
-            self.cursor.execute('''
+            self.cursor.execute(f'''
                 UPDATE signals
-                SET type = ?, name = ?, timestamp = ?, data = ?, properties = ?
+                SET {', '.join(f'{column} = ?' for column in columns)}
                 WHERE id = ?
-            ''', (signal_type, signal_name, signal_timestamp, data, properties, signal_id))
+            ''', values + [signal_id])
+            updated = self.cursor.rowcount > 0
             
+            if updated and pattern_bands is not None:
+                self.cursor.execute("DELETE FROM pattern_bands WHERE signal_id = ?", (signal_id,))
+                self._write_pattern_bands(signal_id, pattern_bands)
+                
             self.conn.commit()
-            return self.cursor.rowcount > 0
+            return updated
             
         except Exception as e:
             print(f"Error updating signal: {str(e)}")
@@ -265,6 +685,51 @@ class Database:
         finally:
             self.disconnect()
             
+    def update_signals(self, signal_dicts, pattern_bands=None):
+        """
+        Update several existing signal records in a single transaction.
+        
+        Args:
+            signal_dicts: List of dictionaries containing updated signal
+                data, each with its 'id'
+            pattern_bands: Optional list of similarity index band keys
+                replacing the stored ones, one list per signal
+            
+        Returns:
+            Number of records updated
+        """
+        if not signal_dicts:
+            return 0
+            
+        try:
+            self.connect()
+            
+            updated = 0
+            for index, signal_dict in enumerate(signal_dicts):
+                columns, values = self._row_values(signal_dict)
+                self.cursor.execute(f'''
+                    UPDATE signals
+                    SET {', '.join(f'{column} = ?' for column in columns)}
+                    WHERE id = ?
+                ''', values + [signal_dict['id']])
+                updated += self.cursor.rowcount
+                
+                if pattern_bands is not None and pattern_bands[index] is not None:
+                    self.cursor.execute("DELETE FROM pattern_bands WHERE signal_id = ?",
+                                        (signal_dict['id'],))
+                    self._write_pattern_bands(signal_dict['id'], pattern_bands[index])
+                    
+            self.conn.commit()
+            return updated
+            
+        except Exception as e:
+            print(f"Error updating signals: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return 0
+        finally:
+            self.disconnect()
+            
     def delete_signal(self, signal_id):
         """
         Delete a signal record by ID.
@@ -281,9 +746,12 @@ class Database:
             self.cursor.execute('''
                 DELETE FROM signals WHERE id = ?
             ''', (signal_id,))
+            deleted = self.cursor.rowcount > 0
+            
+            self.cursor.execute("DELETE FROM pattern_bands WHERE signal_id = ?", (signal_id,))
             
             self.conn.commit()
-            return self.cursor.rowcount > 0
+            return deleted
             
         except Exception as e:
             print(f"Error deleting signal: {str(e)}")
@@ -292,3 +760,112 @@ class Database:
             return False
         finally:
             self.disconnect()
+            
+    def _write_pattern_bands(self, signal_id, pattern_bands):
+        """
+        Store the similarity index band keys of a signal (no commit).
+        
+        Args:
+            signal_id: ID of the signal
+            pattern_bands: List of band keys
+        """
+        self.cursor.executemany('''
+            INSERT INTO pattern_bands (band, signal_id) VALUES (?, ?)
+        ''', [(band, signal_id) for band in pattern_bands])
+        
+    def insert_pattern_bands(self, entries):
+        """
+        Store similarity index band keys of existing signals in a single transaction.
+        
+        Args:
+            entries: List of (signal ID, list of band keys) tuples
+            
+        Returns:
+            Number of signals indexed
+        """
+        try:
+            self.connect()
+            
+            for signal_id, pattern_bands in entries:
+                self.cursor.execute("DELETE FROM pattern_bands WHERE signal_id = ?", (signal_id,))
+                self._write_pattern_bands(signal_id, pattern_bands)
+                
+            self.conn.commit()
+            return len(entries)
+            
+        except Exception as e:
+            print(f"Error inserting pattern bands: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return 0
+        finally:
+            self.disconnect()
+            
+    def find_pattern_candidates(self, pattern_bands, limit=None, min_shared=1):
+        """
+        Retrieve the signals sharing similarity index band keys.
+        
+        Args:
+            pattern_bands: List of band keys of the pattern searched for
+            limit: Optional maximum number of signals
+            min_shared: Minimum number of band keys a signal must share
+            
+        Returns:
+            List of dictionaries containing signal data, those sharing the
+            most band keys first
+        """
+        if not pattern_bands:
+            return []
+            
+        try:
+            self.connect()
+            
+            # Rank on the band index alone, then fetch only the best signals
+            query = f'''
+                SELECT signals.*, candidates.shared_bands FROM (
+                    SELECT signal_id, COUNT(*) AS shared_bands FROM pattern_bands
+                    WHERE band IN ({', '.join('?' for _ in pattern_bands)})
+                    GROUP BY signal_id
+                    HAVING shared_bands >= ?
+                    ORDER BY shared_bands DESC
+                    {'LIMIT ?' if limit else ''}
+                ) AS candidates JOIN signals ON signals.id = candidates.signal_id
+                ORDER BY candidates.shared_bands DESC
+            '''
+            params = list(pattern_bands) + [min_shared]
+            if limit:
+                params.append(limit)
+                
+            self.cursor.execute(query, params)
+            return [self._row_to_dict(row) for row in self.cursor.fetchall()]
+            
+        except Exception as e:
+            print(f"Error finding pattern candidates: {str(e)}")
+            return []
+        finally:
+            self.disconnect()
+            
+    def get_unindexed_signals(self, signal_type='infrared'):
+        """
+        Retrieve the signals that have no similarity index band keys.
+        
+        Args:
+            signal_type: Type of signals to check
+            
+        Returns:
+            List of dictionaries containing signal data
+        """
+        try:
+            self.connect()
+            
+            self.cursor.execute('''
+                SELECT * FROM signals
+                WHERE type = ? AND id NOT IN (SELECT signal_id FROM pattern_bands)
+            ''', (signal_type,))
+            return [self._row_to_dict(row) for row in self.cursor.fetchall()]
+            
+        except Exception as e:
+            print(f"Error getting unindexed signals: {str(e)}")
+            return []
+        finally:
+            self.disconnect()
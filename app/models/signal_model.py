@@ -33,10 +33,20 @@ class SignalModel:
             self.device_name = kwargs.get('device_name', 'Unknown Device')
             self.address = kwargs.get('address', 'Unknown')
             self.rssi = kwargs.get('rssi', 0)
+            self.device_group = kwargs.get('device_group')
+            self.vendor = kwargs.get('vendor')
+            self.identity_id = kwargs.get('identity_id')
+            self.major_class = kwargs.get('major_class')
+            self.minor_class = kwargs.get('minor_class')
+            self.service_bits = kwargs.get('service_bits')
         elif signal_type == 'infrared':
             self.frequency = kwargs.get('frequency', 0)
             self.duration = kwargs.get('duration', 0)
             self.pattern = kwargs.get('pattern', [])
+            self.ir_protocol = kwargs.get('ir_protocol')
+            self.ir_address = kwargs.get('ir_address')
+            self.ir_command = kwargs.get('ir_command')
+            self.ir_repeat = kwargs.get('ir_repeat')
             
     def to_dict(self):
         """
@@ -59,13 +69,23 @@ class SignalModel:
             result.update({
                 'device_name': getattr(self, 'device_name', 'Unknown Device'),
                 'address': getattr(self, 'address', 'Unknown'),
-                'rssi': getattr(self, 'rssi', 0)
+                'rssi': getattr(self, 'rssi', 0),
+                'device_group': getattr(self, 'device_group', None),
+                'vendor': getattr(self, 'vendor', None),
+                'identity_id': getattr(self, 'identity_id', None),
+                'major_class': getattr(self, 'major_class', None),
+                'minor_class': getattr(self, 'minor_class', None),
+                'service_bits': getattr(self, 'service_bits', None)
             })
         elif self.type == 'infrared':
             result.update({
                 'frequency': getattr(self, 'frequency', 0),
                 'duration': getattr(self, 'duration', 0),
-                'pattern': getattr(self, 'pattern', [])
+                'pattern': getattr(self, 'pattern', []),
+                'ir_protocol': getattr(self, 'ir_protocol', None),
+                'ir_address': getattr(self, 'ir_address', None),
+                'ir_command': getattr(self, 'ir_command', None),
+                'ir_repeat': getattr(self, 'ir_repeat', None)
             })
             
         return result
@@ -0,0 +1,462 @@
+"""
+BLE scanner implementation for Signal Catcher app.
+Handles Bluetooth Low Energy advertisement scanning, parsing and batching.
+"""
+import json
+import queue
+import struct
+import threading
+import time
+import uuid
+
+# Scan modes (values match android.bluetooth.le.ScanSettings)
+SCAN_MODE_LOW_POWER = 0
+SCAN_MODE_BALANCED = 1
+SCAN_MODE_LOW_LATENCY = 2
+
+# Radio timing and batching behaviour for each scan mode.
+# Interval and window are in milliseconds, report_delay in seconds.
+SCAN_MODE_SETTINGS = {
+    SCAN_MODE_LOW_POWER: {'interval': 5120, 'window': 512, 'report_delay': 5.0},
+    SCAN_MODE_BALANCED: {'interval': 4096, 'window': 1024, 'report_delay': 1.0},
+    SCAN_MODE_LOW_LATENCY: {'interval': 4096, 'window': 4096, 'report_delay': 0.0}
+}
+
+# Maximum number of devices delivered in a single batch
+DEFAULT_BATCH_SIZE = 32
+
+# How often a running scan checks for cancellation (seconds)
+SCAN_POLL_INTERVAL = 0.1
+
+# Advertising data (AD) structure types
+AD_FLAGS = 0x01
+AD_UUID16_INCOMPLETE = 0x02
+AD_UUID16_COMPLETE = 0x03
+AD_UUID32_INCOMPLETE = 0x04
+AD_UUID32_COMPLETE = 0x05
+AD_UUID128_INCOMPLETE = 0x06
+AD_UUID128_COMPLETE = 0x07
+AD_NAME_SHORT = 0x08
+AD_NAME_COMPLETE = 0x09
+AD_TX_POWER = 0x0A
+AD_SERVICE_DATA16 = 0x16
+AD_MANUFACTURER_DATA = 0xFF
+
+# Bluetooth base UUID used to expand 16 and 32-bit service UUIDs
+BASE_UUID_SUFFIX = '-0000-1000-8000-00805f9b34fb'
+
+
+def parse_advertisement(payload):
+    """
+    Parse a BLE advertisement or scan response payload.
+
+    Args:
+        payload: Raw advertising data as bytes
+
+    Returns:
+        Dictionary with flags, service_uuids, service_data,
+        manufacturer_data, tx_power and local_name entries
+    """
+    result = {
+        'flags': None,
+        'service_uuids': [],
+        'service_data': {},
+        'manufacturer_data': {},
+        'tx_power': None,
+        'local_name': None
+    }
+
+    offset = 0
+    while offset < len(payload):
+        length = payload[offset]
+        if length == 0:
+            # Zero length marks the end of significant data
+            break
+
+        field = payload[offset + 1:offset + 1 + length]
+        offset += 1 + length
+        if len(field) < length:
+            # Truncated structure
+            break
+
+        ad_type = field[0]
+        value = field[1:]
+
+        if ad_type == AD_FLAGS and value:
+            result['flags'] = value[0]
+        elif ad_type in (AD_UUID16_INCOMPLETE, AD_UUID16_COMPLETE):
+            for i in range(0, len(value) - 1, 2):
+                short_uuid = struct.unpack_from('<H', value, i)[0]
+                result['service_uuids'].append(f"{short_uuid:08x}{BASE_UUID_SUFFIX}")
+        elif ad_type in (AD_UUID32_INCOMPLETE, AD_UUID32_COMPLETE):
+            for i in range(0, len(value) - 3, 4):
+                short_uuid = struct.unpack_from('<I', value, i)[0]
+                result['service_uuids'].append(f"{short_uuid:08x}{BASE_UUID_SUFFIX}")
+        elif ad_type in (AD_UUID128_INCOMPLETE, AD_UUID128_COMPLETE):
+            for i in range(0, len(value) - 15, 16):
+                result['service_uuids'].append(str(uuid.UUID(bytes_le=bytes(value[i:i + 16]))))
+        elif ad_type in (AD_NAME_SHORT, AD_NAME_COMPLETE):
+            # Prefer the complete name over a shortened one
+            if ad_type == AD_NAME_COMPLETE or not result['local_name']:
+                result['local_name'] = bytes(value).decode('utf-8', 'replace')
+        elif ad_type == AD_TX_POWER and value:
+            result['tx_power'] = struct.unpack('b', bytes(value[:1]))[0]
+        elif ad_type == AD_SERVICE_DATA16 and len(value) >= 2:
+            short_uuid = struct.unpack_from('<H', value, 0)[0]
+            result['service_data'][f"{short_uuid:08x}{BASE_UUID_SUFFIX}"] = bytes(value[2:]).hex()
+        elif ad_type == AD_MANUFACTURER_DATA and len(value) >= 2:
+            company_id = struct.unpack_from('<H', value, 0)[0]
+            result['manufacturer_data'][company_id] = bytes(value[2:]).hex()
+
+    return result
+
+
+def merge_advertisement(current, update):
+    """
+    Merge a newly parsed advertisement into an earlier one.
+
+    Advertisements and scan responses from the same device carry different
+    fields, so non-empty values from the update are layered on top.
+
+    Args:
+        current: Previously parsed advertisement dictionary
+        update: Newly parsed advertisement dictionary
+
+    Returns:
+        The merged advertisement dictionary
+    """
+    for key, value in update.items():
+        if isinstance(value, list):
+            current[key] = current[key] + [v for v in value if v not in current[key]]
+        elif isinstance(value, dict):
+            current[key].update(value)
+        elif value is not None:
+            current[key] = value
+
+    return current
+
+
+class BLEScanner:
+    """
+    Scanner for BLE advertisements.
+    Receives raw reports from a backend, parses them and groups them into batches.
+    """
+    def __init__(self, backend, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Initialize the BLE scanner.
+
+        Args:
+            backend: Object providing start(mode, callback) and stop()
+            batch_size: Maximum number of devices per batch
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+
+    def iter_batches(self, duration, mode=SCAN_MODE_BALANCED, cancel_event=None):
+        """
+        Scan for advertisements, yielding results in batches.
+
+        Reports from the same address within a batch are merged into a single
+        result. A batch is delivered when it is full or when the report delay
+        of the scan mode has elapsed since its first result.
+
+        Args:
+            duration: Scan duration in seconds
+            mode: One of the SCAN_MODE_* constants
+            cancel_event: Optional threading.Event that stops the scan when set
+
+        Yields:
+            Lists of dictionaries with address, rssi, timestamp and advertisement
+        """
+        reports = queue.Queue()
+        report_delay = SCAN_MODE_SETTINGS[mode]['report_delay']
+
+        def on_report(address, rssi, payload):
+            reports.put((address, rssi, payload, time.time()))
+
+        self.backend.start(mode, on_report)
+        deadline = time.time() + duration
+        batch = {}
+        batch_started = 0
+
+        try:
+            while not (cancel_event and cancel_event.is_set()):
+                now = time.time()
+                if now >= deadline:
+                    break
+
+                timeout = min(deadline - now, SCAN_POLL_INTERVAL)
+                if batch:
+                    timeout = max(0, min(timeout, batch_started + report_delay - now))
+
+                try:
+                    report = reports.get(timeout=timeout)
+                except queue.Empty:
+                    report = None
+
+                # Drain whatever else is already waiting in one go
+                while report is not None:
+                    if not batch:
+                        batch_started = report[3]
+                    self._add_report(batch, *report)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        report = reports.get_nowait()
+                    except queue.Empty:
+                        report = None
+
+                if batch and (len(batch) >= self.batch_size or
+                              time.time() - batch_started >= report_delay):
+                    yield list(batch.values())
+                    batch = {}
+
+        finally:
+            self.backend.stop()
+
+        if batch:
+            yield list(batch.values())
+
+    def _add_report(self, batch, address, rssi, payload, timestamp):
+        """
+        Parse a raw report and merge it into the current batch.
+
+        Args:
+            batch: Dictionary of results keyed by address
+            address: Advertiser address
+            rssi: Received signal strength in dBm
+            payload: Raw advertising data
+            timestamp: Time the report was received
+        """
+        advertisement = parse_advertisement(payload)
+        result = batch.get(address)
+
+        if result is None:
+            batch[address] = {
+                'address': address,
+                'rssi': rssi,
+                'timestamp': timestamp,
+                'advertisement': advertisement
+            }
+        else:
+            result['rssi'] = rssi
+            result['timestamp'] = timestamp
+            merge_advertisement(result['advertisement'], advertisement)
+
+
+class HCIBackend:
+    """
+    BLE scan backend using a raw BlueZ HCI socket (Linux).
+    """
+    def __init__(self, device_id=0):
+        """
+        Initialize the HCI backend.
+
+        Args:
+            device_id: Index of the HCI adapter (0 for hci0)
+        """
+        self.device_id = device_id
+        self.sock = None
+        self.thread = None
+        self.running = False
+
+    def start(self, mode, callback):
+        """
+        Configure the adapter and start LE scanning.
+
+        Args:
+            mode: One of the SCAN_MODE_* constants
+            callback: Function called with (address, rssi, payload) per report
+        """
+        import bluetooth._bluetooth as bluez
+
+        settings = SCAN_MODE_SETTINGS[mode]
+        self.sock = bluez.hci_open_dev(self.device_id)
+
+        # Only receive HCI events
+        hci_filter = bluez.hci_filter_new()
+        bluez.hci_filter_all_events(hci_filter)
+        bluez.hci_filter_set_ptype(hci_filter, bluez.HCI_EVENT_PKT)
+        self.sock.setsockopt(bluez.SOL_HCI, bluez.HCI_FILTER, hci_filter)
+        self.sock.settimeout(SCAN_POLL_INTERVAL)
+
+        # LE Set Scan Parameters: active scan, interval/window in 0.625 ms units
+        parameters = struct.pack(
+            '<BHHBB', 0x01,
+            min(0x4000, int(settings['interval'] / 0.625)),
+            min(0x4000, int(settings['window'] / 0.625)),
+            0x00, 0x00
+        )
+        bluez.hci_send_cmd(self.sock, 0x08, 0x000B, parameters)
+
+        # LE Set Scan Enable without duplicate filtering so RSSI keeps updating
+        bluez.hci_send_cmd(self.sock, 0x08, 0x000C, struct.pack('<BB', 0x01, 0x00))
+
+        self.running = True
+        self.thread = threading.Thread(target=self._read_process, args=(callback,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop LE scanning and release the adapter."""
+        import bluetooth._bluetooth as bluez
+
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+        if self.sock:
+            try:
+                bluez.hci_send_cmd(self.sock, 0x08, 0x000C, struct.pack('<BB', 0x00, 0x00))
+            finally:
+                self.sock.close()
+                self.sock = None
+
+    def _read_process(self, callback):
+        """Background process reading LE advertising reports."""
+        import socket
+
+        while self.running:
+            try:
+                packet = self.sock.recv(258)
+            except socket.timeout:
+                continue
+            except Exception as e:
+                print(f"BLE HCI read error: {str(e)}")
+                break
+
+            # HCI event packet, LE Meta event, LE Advertising Report subevent
+            if len(packet) < 5 or packet[1] != 0x3E or packet[3] != 0x02:
+                continue
+
+            offset = 5
+            for _ in range(packet[4]):
+                if offset + 9 > len(packet):
+                    break
+                address = ':'.join(f"{b:02X}" for b in reversed(packet[offset + 2:offset + 8]))
+                data_length = packet[offset + 8]
+                payload = packet[offset + 9:offset + 9 + data_length]
+                rssi_offset = offset + 9 + data_length
+                if rssi_offset >= len(packet):
+                    break
+                rssi = struct.unpack('b', packet[rssi_offset:rssi_offset + 1])[0]
+                callback(address, rssi, payload)
+                offset = rssi_offset + 1
+
+
+class AndroidBLEBackend:
+    """
+    BLE scan backend using BluetoothAdapter.startLeScan on Android.
+    """
+    def __init__(self, adapter):
+        """
+        Initialize the Android backend.
+
+        Args:
+            adapter: The android.bluetooth.BluetoothAdapter instance
+        """
+        self.adapter = adapter
+        self.scan_callback = None
+
+    def start(self, mode, callback):
+        """
+        Start LE scanning.
+
+        The legacy LeScanCallback API does not take scan settings, so the
+        mode only affects how results are batched.
+
+        Args:
+            mode: One of the SCAN_MODE_* constants
+            callback: Function called with (address, rssi, payload) per report
+        """
+        from jnius import PythonJavaClass, java_method
+
+        class LeScanCallback(PythonJavaClass):
+            __javainterfaces__ = ['android/bluetooth/BluetoothAdapter$LeScanCallback']
+            __javacontext__ = 'app'
+
+            @java_method('(Landroid/bluetooth/BluetoothDevice;I[B)V')
+            def onLeScan(self, device, rssi, scan_record):
+                # Java bytes arrive signed
+                callback(device.getAddress(), rssi, bytes(b & 0xFF for b in scan_record))
+
+        self.scan_callback = LeScanCallback()
+        self.adapter.startLeScan(self.scan_callback)
+
+    def stop(self):
+        """Stop LE scanning."""
+        if self.scan_callback:
+            self.adapter.stopLeScan(self.scan_callback)
+            self.scan_callback = None
+
+
+class RecordedAdvertisementBackend:
+    """
+    BLE scan backend replaying recorded advertisement reports.
+    Used to exercise the scanner without a radio.
+    """
+    def __init__(self, records, realtime=False):
+        """
+        Initialize the replay backend.
+
+        Args:
+            records: List of dictionaries with address, rssi, payload (hex
+                string or bytes) and optional delay in seconds before the report
+            realtime: Whether to honour the recorded delays
+        """
+        self.records = records
+        self.realtime = realtime
+        self.thread = None
+        self.running = False
+
+    @classmethod
+    def from_file(cls, path, realtime=False):
+        """
+        Load recorded reports from a JSON lines file.
+
+        Args:
+            path: Path to a file with one JSON report per line
+            realtime: Whether to honour the recorded delays
+
+        Returns:
+            RecordedAdvertisementBackend instance
+        """
+        with open(path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return cls(records, realtime)
+
+    def start(self, mode, callback):
+        """
+        Start replaying the recorded reports.
+
+        Args:
+            mode: One of the SCAN_MODE_* constants (ignored)
+            callback: Function called with (address, rssi, payload) per report
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self._replay_process, args=(callback,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop replaying."""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def _replay_process(self, callback):
+        """Background process delivering the recorded reports."""
+        for record in self.records:
+            if not self.running:
+                break
+
+            if self.realtime and record.get('delay'):
+                time.sleep(record['delay'])
+
+            payload = record.get('payload', b'')
+            if isinstance(payload, str):
+                payload = bytes.fromhex(payload)
+
+            callback(record['address'], record.get('rssi', 0), payload)
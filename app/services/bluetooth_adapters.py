@@ -0,0 +1,143 @@
+"""
+Bluetooth adapter management for Signal Catcher app.
+Enumerates local adapters and merges parallel scans into one stream.
+"""
+import os
+import queue
+import re
+import threading
+
+# Where Linux lists the local Bluetooth controllers
+SYSFS_BLUETOOTH = '/sys/class/bluetooth'
+
+# Adapter roles: classic inquiry scans or BLE advertisement scans
+ROLE_INQUIRY = 'inquiry'
+ROLE_BLE = 'ble'
+
+ADAPTER_NAME = re.compile(r'^hci(\d+)$')
+
+
+def list_adapters(sysfs_path=SYSFS_BLUETOOTH):
+    """
+    List the local Bluetooth adapters.
+
+    Args:
+        sysfs_path: Directory containing the hciN entries
+
+    Returns:
+        List of dictionaries with name, device_id and address (None if the
+        kernel does not expose it), ordered by device id
+    """
+    try:
+        names = os.listdir(sysfs_path)
+    except OSError:
+        return []
+
+    adapters = []
+    for name in names:
+        # Connection entries such as hci0:11 are skipped
+        match = ADAPTER_NAME.match(name)
+        if not match:
+            continue
+
+        address = None
+        try:
+            with open(os.path.join(sysfs_path, name, 'address')) as f:
+                address = f.read().strip().upper() or None
+        except OSError:
+            pass
+
+        adapters.append({'name': name, 'device_id': int(match.group(1)), 'address': address})
+
+    return sorted(adapters, key=lambda adapter: adapter['device_id'])
+
+
+def assign_roles(adapters, roles=None, split=False):
+    """
+    Choose the scan role of each adapter.
+
+    Args:
+        adapters: List of adapter dictionaries from list_adapters()
+        roles: Optional dictionary mapping adapter names to ROLE_* values
+        split: Whether adapters without an explicit role alternate between
+            inquiry and BLE (hci0 inquiry, hci1 BLE, ...) instead of all
+            running inquiry
+
+    Returns:
+        List of adapter dictionaries with a 'role' entry
+    """
+    roles = roles or {}
+    assigned = []
+
+    for index, adapter in enumerate(adapters):
+        role = roles.get(adapter['name'])
+        if role is None:
+            role = ROLE_BLE if split and index % 2 else ROLE_INQUIRY
+        if role not in (ROLE_INQUIRY, ROLE_BLE):
+            raise ValueError(f"Unknown role {role} for {adapter['name']}")
+        assigned.append(dict(adapter, role=role))
+
+    return assigned
+
+
+def merge_scans(sources, cancel_event, poll_interval=0.1):
+    """
+    Run several scans in parallel and yield their results as one stream.
+
+    Each source runs on its own thread. Every yielded device is tagged with
+    the name of the source that saw it in its 'adapter' entry.
+
+    Args:
+        sources: Dictionary mapping source names to functions that take a
+            threading.Event and return an iterable of device dictionaries;
+            the scan must stop when the event is set
+        cancel_event: threading.Event that stops all scans when set
+        poll_interval: How often to check for cancellation in seconds
+
+    Yields:
+        Device dictionaries in the order they arrive
+    """
+    results = queue.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def scan_process(name, scan):
+        try:
+            for device in scan(stop):
+                if stop.is_set():
+                    break
+                device['adapter'] = name
+                results.put(device)
+        except Exception as e:
+            print(f"Scan error on {name}: {str(e)}")
+        finally:
+            results.put(done)
+
+    threads = []
+    for name, scan in sources.items():
+        thread = threading.Thread(target=scan_process, args=(name, scan))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+
+    running = len(threads)
+    try:
+        while running:
+            if cancel_event.is_set():
+                break
+
+            try:
+                device = results.get(timeout=poll_interval)
+            except queue.Empty:
+                continue
+
+            if device is done:
+                running -= 1
+            else:
+                yield device
+
+    finally:
+        # Also reached when the consumer stops iterating early
+        stop.set()
+        for thread in threads:
+            thread.join()
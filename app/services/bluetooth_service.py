@@ -2,23 +2,115 @@
 Bluetooth service implementation for Signal Catcher app.
 Handles Bluetooth device discovery, recording, and transmission.
 """
+import collections
+import os
+import queue
+import select
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from kivy.utils import platform
 from app.models.signal_model import SignalModel
 from app.services.storage_service import StorageService
+from app.services.ble_scanner import (
+    BLEScanner, HCIBackend, AndroidBLEBackend, SCAN_MODE_BALANCED, DEFAULT_BATCH_SIZE
+)
+from app.services.scan_scheduler import ScanScheduler
+from app.services.sighting_aggregator import SightingAggregator
+from app.services.rssi_tracker import RSSITracker
+from app.services.service_discovery import (
+    ServiceDiscovery, PyBluezSDPBackend, AndroidSDPBackend
+)
+from app.services.name_resolver import NameResolver, PyBluezNameBackend, AndroidNameBackend
+from app.services.simulated_bluetooth import SimulatedBluetoothBackend
+from app.services.oui_lookup import OUIIndex
+from app.services.device_class import decode_class
+from app.services.presence_tracker import PresenceTracker
+from app.services.identity_resolver import IdentityResolver
+from app.services.bluetooth_adapters import list_adapters, assign_roles, merge_scans, ROLE_BLE
+from app.services.connection_pool import (
+    ConnectionPool, RFCOMMTransport, AndroidRFCOMMTransport, DEFAULT_TIMEOUT
+)
+
+# How often a running scan checks for cancellation (seconds)
+SCAN_POLL_INTERVAL = 0.1
+
+# Value Android reports when an inquiry result carries no RSSI
+SHORT_MIN_VALUE = -32768
+
+# Name given to devices whose name is not known (yet)
+UNKNOWN_DEVICE_NAME = "Unknown Device"
+
+# File next to the database holding resolved device names
+NAME_CACHE_FILE = 'device_names.json'
+
+# Number of devices a broadcast sends to at the same time
+DEFAULT_BROADCAST_CONCURRENCY = 4
+
+# Environment variable enabling the simulated radio when PyBluez is missing;
+# its value is the simulation seed
+SIMULATION_ENV = 'SIGNAL_CATCHER_SIMULATE_BLUETOOTH'
 
 class BluetoothService:
     """
     Service for Bluetooth operations.
     Handles device scanning, signal recording, and transmission.
     """
-    def __init__(self):
-        """Initialize the Bluetooth service."""
+    def __init__(self, scan_backend=None, ble_backend=None, sdp_backend=None,
+                 name_backend=None, transport=None, adapter_roles=None, split_roles=False):
+        """
+        Initialize the Bluetooth service.
+        
+        Backends that also provide lookup_name/find_services (such as the
+        simulated backend) are used for name and service discovery too,
+        unless other backends are given.
+        
+        On Linux every local adapter (hci0, hci1, ...) scans in parallel
+        with its own role; see bluetooth_adapters.assign_roles().
+        
+        Args:
+            scan_backend: Optional device scan backend replacing the platform one
+            ble_backend: Optional BLE scan backend replacing the platform one
+            sdp_backend: Optional service discovery backend replacing the platform one
+            name_backend: Optional name lookup backend replacing the platform one
+            transport: Optional connection transport replacing RFCOMM
+            adapter_roles: Optional dictionary mapping adapter names to
+                'inquiry' or 'ble'
+            split_roles: Whether adapters without an explicit role alternate
+                between inquiry and BLE scanning
+        """
         self.initialized = False
         self.available = False
         self.adapter = None
+        self.adapters = []
+        self.adapter_roles = adapter_roles
+        self.split_roles = split_roles
+        self.adapter_sightings = collections.Counter()
         self.storage_service = StorageService()
+        self.scan_backend = scan_backend
+        self.ble_backend = ble_backend
+        self.sdp_backend = sdp_backend
+        self.service_discovery = None
+        self.name_backend = name_backend
+        self.name_resolver = None
+        self.transport = transport
+        self.connection_pool = None
+        self.scheduler = None
+        self.aggregator = None
+        self._monitor_stop = None
+        self.rssi_tracker = RSSITracker()
+        self.vendor_index = OUIIndex()
+        self.identity_resolver = IdentityResolver()
+        self._presence_events = collections.deque()
+        self.presence = PresenceTracker(on_event=self._presence_events.append)
+        self._active_scans = set()
+        self._scans_lock = threading.Lock()
+        
+        if sdp_backend is None and hasattr(scan_backend, 'find_services'):
+            self.sdp_backend = scan_backend
+        if name_backend is None and hasattr(scan_backend, 'lookup_name'):
+            self.name_backend = scan_backend
         
     def initialize(self):
         """Initialize the Bluetooth adapter and check availability."""
@@ -31,6 +123,12 @@ class BluetoothService:
             else:
                 self._initialize_generic_bluetooth()
                 
+            # An injected backend works without a local adapter
+            if any(backend is not None for backend in
+                   (self.scan_backend, self.ble_backend, self.sdp_backend,
+                    self.name_backend, self.transport)):
+                self.available = True
+                
             self.initialized = True
             
         except Exception as e:
@@ -54,12 +152,32 @@ class BluetoothService:
         try:
             import bluetooth
             self.adapter = True  # Just a flag for availability
+            self.adapters = assign_roles(list_adapters(), self.adapter_roles, self.split_roles)
             self.available = True
         except ImportError:
+            if os.environ.get(SIMULATION_ENV) is not None:
+                self._initialize_simulated_bluetooth(int(os.environ[SIMULATION_ENV] or 0))
+                return
+                
             print("PyBluez not available on this platform")
             self.adapter = None
             self.available = False
             
+    def _initialize_simulated_bluetooth(self, seed):
+        """
+        Initialize a simulated radio (for load and scale testing).
+        
+        Args:
+            seed: Simulation random seed
+        """
+        print(f"Using simulated Bluetooth devices (seed {seed})")
+        simulation = SimulatedBluetoothBackend(seed=seed)
+        self.scan_backend = self.scan_backend or simulation
+        self.sdp_backend = self.sdp_backend or simulation
+        self.name_backend = self.name_backend or simulation
+        self.adapter = None
+        self.available = True
+            
     def is_initialized(self):
         """
         Check if the service is initialized.
@@ -78,106 +196,750 @@ class BluetoothService:
         """
         return self.available
         
-    def scan_devices(self, duration=10):
+    def get_adapters(self):
+        """
+        Get the local adapters used for scanning.
+        
+        Returns:
+            List of dictionaries with name, device_id, address, role and
+            the number of sightings the adapter contributed
+        """
+        return [dict(adapter, sightings=self.adapter_sightings[adapter['name']])
+                for adapter in self.adapters]
+        
+    def scan_devices(self, duration=10, callback=None, discover_services=False, on_name=None,
+                     unique=True, cancel_event=None):
         """
         Scan for Bluetooth devices.
         
+        Devices are reported through the callback as soon as they are
+        discovered; the complete list is returned once the scan ends.
+        
         Args:
             duration: Scan duration in seconds
+            callback: Optional function called with each discovered device
+            discover_services: Whether to query each device's services
+                in the background while the scan continues
+            on_name: Optional function called with a device once its name
+                has been resolved in the background
+            unique: Whether to report each device only once per scan
+            cancel_event: Optional threading.Event that stops the scan when set
             
         Returns:
             List of dictionaries containing device information
         """
+        devices = []
+        for device in self.iter_devices(duration, on_name, unique, cancel_event):
+            devices.append(device)
+            if discover_services:
+                self.discover_services(device['address'])
+            if callback:
+                callback(device)
+                
+        return devices
+        
+    def iter_devices(self, duration=10, on_name=None, unique=True, cancel_event=None):
+        """
+        Scan for Bluetooth devices, yielding each one as it is discovered.
+        
+        The scan ends when the duration elapses, the platform reports the
+        end of discovery or its cancel event is set. Each scan has its own
+        cancel event, so cancelling one scan never stops or revives another;
+        cancel_scan() only stops scans started without a cancel_event.
+        Devices are yielded
+        without waiting for their names; unknown names are taken from the
+        name cache or resolved in the background.
+        
+        With several adapters the scans run in parallel and each device
+        records the adapter that saw it in 'adapter'; with unique set, the
+        device reported first also lists every adapter that saw it during
+        the scan in 'adapters'.
+        
+        Args:
+            duration: Scan duration in seconds
+            on_name: Optional function called with a device once its name
+                has been resolved in the background
+            unique: Whether to report each device only once per scan
+            cancel_event: Optional threading.Event that stops the scan when
+                set; a scan whose event is already set ends immediately
+            
+        Yields:
+            Dictionaries containing device information
+        """
         if not self.available:
-            return []
+            return
             
-        devices = []
+        cancel_event = self._start_scan(cancel_event)
+        seen = {}
         
         try:
-            if platform == 'android':
-                devices = self._scan_android_devices(duration)
+            if self.scan_backend is not None:
+                discovered = self.scan_backend.iter_devices(
+                    duration, cancel_event, self._make_device_info)
+            elif platform == 'android':
+                discovered = self._scan_android_devices(duration, cancel_event)
+            elif self.adapters:
+                discovered = self._scan_adapters(duration, cancel_event)
             else:
-                devices = self._scan_generic_devices(duration)
+                discovered = self._scan_generic_devices(duration, cancel_event)
+                
+            for device in discovered:
+                adapter = device.get('adapter')
+                if adapter:
+                    self.adapter_sightings[adapter] += 1
+                    
+                # Inquiry may report the same device several times
+                if unique:
+                    first = seen.get(device['address'])
+                    if first is not None:
+                        if adapter and adapter not in first['adapters']:
+                            first['adapters'].append(adapter)
+                        continue
+                    seen[device['address']] = device
+                    device['adapters'] = [adapter] if adapter else []
+                self._resolve_name(device, on_name)
+                self.identity_resolver.resolve(device)
+                self.presence.observe(device)
+                yield device
                 
         except Exception as e:
             print(f"Bluetooth scan error: {str(e)}")
             
-        return devices
+        finally:
+            self._end_scan(cancel_event)
+            
+    def cancel_scan(self):
+        """Cancel every scan in progress that was started without its own cancel event."""
+        with self._scans_lock:
+            for cancel_event in self._active_scans:
+                cancel_event.set()
+                
+    def _start_scan(self, cancel_event=None):
+        """
+        Get the cancel event of a new scan.
+        
+        Scans without a cancel event owned by the caller get a new one,
+        registered so that cancel_scan() can stop them.
+        
+        Args:
+            cancel_event: Optional threading.Event owned by the caller
+            
+        Returns:
+            threading.Event that stops the scan when set
+        """
+        if cancel_event is not None:
+            return cancel_event
+            
+        cancel_event = threading.Event()
+        with self._scans_lock:
+            self._active_scans.add(cancel_event)
+        return cancel_event
+        
+    def _end_scan(self, cancel_event):
+        """
+        Unregister a scan started with _start_scan().
+        
+        Args:
+            cancel_event: threading.Event of the scan
+        """
+        with self._scans_lock:
+            self._active_scans.discard(cancel_event)
+        
+    def _resolve_name(self, device, on_name=None):
+        """
+        Fill in a device name from the cache or resolve it in the background.
+        
+        Args:
+            device: Dictionary containing device information
+            on_name: Optional function called with the device once resolved
+        """
+        try:
+            resolver = self._get_name_resolver()
+            address = device['address']
+            
+            if device['name'] != UNKNOWN_DEVICE_NAME:
+                resolver.remember(address, device['name'])
+                return
+                
+            cached = resolver.get_cached(address)
+            if cached:
+                device['name'] = cached
+            elif cached is None:
+                def name_resolved(address, name):
+                    if not name:
+                        return
+                    device['name'] = name
+                    self.storage_service.update_device_name(address, name)
+                    if on_name:
+                        on_name(device)
+                        
+                resolver.resolve(address, name_resolved)
+                
+        except Exception as e:
+            print(f"Name resolution error: {str(e)}")
+            
+    def _get_name_resolver(self):
+        """
+        Get the name resolver, creating it on first use.
+        
+        Returns:
+            NameResolver instance
+        """
+        if self.name_resolver is None:
+            backend = self.name_backend
+            if backend is None:
+                if platform == 'android':
+                    backend = AndroidNameBackend(self.adapter)
+                else:
+                    backend = PyBluezNameBackend()
+                    
+            db_dir = os.path.dirname(self.storage_service.database.db_path)
+            self.name_resolver = NameResolver(
+                backend, cache_path=os.path.join(db_dir, NAME_CACHE_FILE))
+                
+        return self.name_resolver
         
-    def _scan_android_devices(self, duration):
+    def _make_device_info(self, name, address, rssi=0, bonded=False, device_class=None):
+        """
+        Build the dictionary describing a discovered device.
+        
+        Args:
+            name: Remote device name, or None if unknown
+            address: Device MAC address
+            rssi: Received signal strength in dBm (0 if not reported)
+            bonded: Whether the device is paired with this adapter
+            device_class: 24-bit Class of Device, or None if not reported
+            
+        Returns:
+            Dictionary containing device information
+        """
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', 'replace')
+            
+        device = {
+            'name': name or UNKNOWN_DEVICE_NAME,
+            'address': address,
+            'vendor': self.vendor_index.lookup(address),
+            'type': 'bluetooth',
+            'rssi': rssi,
+            'bonded': bonded,
+            'timestamp': time.time()
+        }
+        
+        if device_class is not None:
+            device.update(self._decode_device_class(device_class))
+            
+        return device
+        
+    def _decode_device_class(self, device_class):
+        """
+        Decode a Class of Device into device dictionary entries.
+        
+        Args:
+            device_class: 24-bit Class of Device
+            
+        Returns:
+            Dictionary with device_class (the raw value), major_class,
+            minor_class, service_bits and service_classes
+        """
+        decoded = decode_class(device_class)
+        decoded['device_class'] = decoded.pop('cod')
+        return decoded
+        
+    def _scan_android_devices(self, duration, cancel_event):
         """
         Scan for Bluetooth devices on Android.
         
+        Discovered devices are delivered by the ACTION_FOUND broadcast and
+        yielded as they arrive.
+        
         Args:
             duration: Scan duration in seconds
+            cancel_event: threading.Event that stops the scan when set
             
-        Returns:
-            List of dictionaries containing device information
+        Yields:
+            Dictionaries containing device information
         """
-        from jnius import autoclass
-        import time
+        from jnius import autoclass, cast
+        from android.broadcast import BroadcastReceiver
         
+        BluetoothAdapter = autoclass('android.bluetooth.BluetoothAdapter')
         BluetoothDevice = autoclass('android.bluetooth.BluetoothDevice')
         
+        events = queue.Queue()
+        
+        def on_broadcast(context, intent):
+            # Runs on the Android main thread; hand the event to the scanner
+            action = intent.getAction()
+            if action == BluetoothDevice.ACTION_FOUND:
+                device = cast('android.bluetooth.BluetoothDevice',
+                              intent.getParcelableExtra(BluetoothDevice.EXTRA_DEVICE))
+                rssi = intent.getShortExtra(BluetoothDevice.EXTRA_RSSI, SHORT_MIN_VALUE)
+                bluetooth_class = intent.getParcelableExtra(BluetoothDevice.EXTRA_CLASS)
+                events.put(self._make_device_info(
+                    device.getName(),
+                    device.getAddress(),
+                    rssi if rssi != SHORT_MIN_VALUE else 0,
+                    device.getBondState() == BluetoothDevice.BOND_BONDED,
+                    self._android_device_class(bluetooth_class)
+                ))
+            elif action == BluetoothAdapter.ACTION_DISCOVERY_FINISHED:
+                events.put(None)
+                
+        receiver = BroadcastReceiver(on_broadcast, actions=[
+            BluetoothDevice.ACTION_FOUND,
+            BluetoothAdapter.ACTION_DISCOVERY_FINISHED
+        ])
+        receiver.start()
+        
         # Start discovery
         self.adapter.startDiscovery()
+        deadline = time.time() + duration
         
-        # Wait for specified duration
-        time.sleep(duration)
+        try:
+            while not cancel_event.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                    
+                try:
+                    device = events.get(timeout=min(remaining, SCAN_POLL_INTERVAL))
+                except queue.Empty:
+                    continue
+                    
+                if device is None:
+                    break
+                yield device
+                
+        finally:
+            # Stop discovery
+            self.adapter.cancelDiscovery()
+            receiver.stop()
+            
+    def _android_device_class(self, bluetooth_class):
+        """
+        Get the Class of Device from an Android BluetoothClass.
         
-        # Get discovered devices
-        paired_devices = self.adapter.getBondedDevices().toArray()
+        BluetoothClass has no getter for the full value, but toString()
+        returns it in hexadecimal.
         
-        # Stop discovery
-        self.adapter.cancelDiscovery()
+        Args:
+            bluetooth_class: android.bluetooth.BluetoothClass or None
+            
+        Returns:
+            24-bit Class of Device, or None if unavailable
+        """
+        if bluetooth_class is None:
+            return None
+            
+        try:
+            return int(bluetooth_class.toString(), 16)
+        except Exception:
+            return None
+            
+    def _scan_adapters(self, duration, cancel_event):
+        """
+        Scan on every local adapter in parallel according to its role.
         
-        # Convert to device list
-        devices = []
-        for device in paired_devices:
-            devices.append({
-                'name': device.getName() or "Unknown Device",
-                'address': device.getAddress(),
-                'type': 'bluetooth',
-                'rssi': 0,  # RSSI not directly available
-                'bonded': True
-            })
+        Args:
+            duration: Scan duration in seconds
+            cancel_event: threading.Event that stops the scan when set
             
-        return devices
+        Yields:
+            Dictionaries containing device information and the adapter name
+        """
+        sources = {}
+        for adapter in self.adapters:
+            if adapter['role'] == ROLE_BLE:
+                scan = self._scan_adapter_ble
+            else:
+                scan = self._scan_generic_devices
+            sources[adapter['name']] = (
+                lambda cancel_event, scan=scan, device_id=adapter['device_id']:
+                    scan(duration, cancel_event, device_id))
+                    
+        return merge_scans(sources, cancel_event, SCAN_POLL_INTERVAL)
         
-    def _scan_generic_devices(self, duration):
+    def _scan_adapter_ble(self, duration, cancel_event, device_id):
+        """
+        Scan for BLE advertisements on one adapter.
+        
+        Args:
+            duration: Scan duration in seconds
+            cancel_event: threading.Event that stops the scan when set
+            device_id: Index of the HCI adapter
+            
+        Yields:
+            Dictionaries containing device information
+        """
+        scanner = BLEScanner(HCIBackend(device_id))
+        for results in scanner.iter_batches(duration, SCAN_MODE_BALANCED, cancel_event):
+            for result in results:
+                yield self._make_ble_device_info(result)
+                
+    def _scan_generic_devices(self, duration, cancel_event=None, device_id=-1):
         """
         Scan for Bluetooth devices on non-Android platforms.
         
+        Uses PyBluez's asynchronous DeviceDiscoverer so inquiry results
+        (including RSSI) are yielded as soon as the HCI events arrive.
+        
         Args:
             duration: Scan duration in seconds
+            cancel_event: Optional threading.Event that stops the scan when set
+            device_id: Index of the HCI adapter (-1 for the default one)
             
-        Returns:
-            List of dictionaries containing device information
+        Yields:
+            Dictionaries containing device information
         """
         import bluetooth
         
-        # Discover nearby devices
-        nearby_devices = bluetooth.discover_devices(
-            duration=duration,
-            lookup_names=True,
-            lookup_class=False,
-            device_id=-1,
-            scan_type='bredr'
+        cancel_event = cancel_event or threading.Event()
+        found = collections.deque()
+        make_device_info = self._make_device_info
+        
+        class Discoverer(bluetooth.DeviceDiscoverer):
+            def pre_inquiry(self):
+                self.done = False
+                
+            def device_discovered(self, address, device_class, rssi, name):
+                found.append(make_device_info(name, address, rssi or 0,
+                                              device_class=device_class))
+                
+            def inquiry_complete(self):
+                self.done = True
+                
+        discoverer = Discoverer(device_id=device_id)
+        
+        # Inquiry length is expressed in units of 1.28 seconds. Names are not
+        # looked up here: remote name requests would hold back every result
+        # until the inquiry completes.
+        discoverer.find_devices(
+            lookup_names=False,
+            duration=max(1, int(round(duration / 1.28)))
         )
         
-        # Convert to device list
-        devices = []
-        for addr, name in nearby_devices:
-            devices.append({
-                'name': name or "Unknown Device",
-                'address': addr,
-                'type': 'bluetooth',
-                'rssi': 0,  # RSSI not directly available
-                'bonded': False
-            })
+        try:
+            while not discoverer.done and not cancel_event.is_set():
+                readable, _, _ = select.select([discoverer], [], [], SCAN_POLL_INTERVAL)
+                if readable:
+                    discoverer.process_event()
+                    
+                while found:
+                    yield found.popleft()
+                    
+        finally:
+            if not discoverer.done:
+                discoverer.cancel_inquiry()
+                
+    def scan_ble_devices(self, duration=10, callback=None, mode=SCAN_MODE_BALANCED,
+                         batch_size=DEFAULT_BATCH_SIZE, cancel_event=None):
+        """
+        Scan for BLE devices by listening for advertisements.
+        
+        Args:
+            duration: Scan duration in seconds
+            callback: Optional function called with each batch of devices
+            mode: One of the ble_scanner SCAN_MODE_* constants
+            batch_size: Maximum number of devices per batch
+            cancel_event: Optional threading.Event that stops the scan when set
             
-        return devices
+        Returns:
+            List of dictionaries containing device information
+        """
+        if not self.available:
+            return []
+            
+        cancel_event = self._start_scan(cancel_event)
+        devices = {}
+        
+        try:
+            scanner = BLEScanner(self._get_ble_backend(), batch_size)
+            for results in scanner.iter_batches(duration, mode, cancel_event):
+                batch = [self._make_ble_device_info(result) for result in results]
+                for device in batch:
+                    devices[device['address']] = device
+                    self.identity_resolver.resolve(device)
+                self.presence.observe_many(batch)
+                if callback:
+                    callback(batch)
+                    
+        except Exception as e:
+            print(f"BLE scan error: {str(e)}")
+            
+        finally:
+            self._end_scan(cancel_event)
+            
+        return list(devices.values())
+        
+    def _get_ble_backend(self):
+        """
+        Get the backend used for BLE scanning.
+        
+        Returns:
+            The injected backend, or the platform's default backend
+        """
+        if self.ble_backend is not None:
+            return self.ble_backend
+            
+        if platform == 'android':
+            return AndroidBLEBackend(self.adapter)
+            
+        # Prefer an adapter dedicated to BLE scanning
+        for adapter in self.adapters:
+            if adapter['role'] == ROLE_BLE:
+                return HCIBackend(adapter['device_id'])
+        return HCIBackend(self.adapters[0]['device_id'] if self.adapters else 0)
+        
+    def _make_ble_device_info(self, result):
+        """
+        Build the device dictionary for a BLE scan result.
+        
+        Args:
+            result: Scan result produced by BLEScanner
+            
+        Returns:
+            Dictionary containing device information
+        """
+        advertisement = result['advertisement']
+        device = self._make_device_info(
+            advertisement['local_name'], result['address'], result['rssi'])
+        device.update({
+            'protocol': 'ble',
+            'timestamp': result['timestamp'],
+            'tx_power': advertisement['tx_power'],
+            'advertisement': advertisement
+        })
+        return device
+        
+    def discover_services(self, address, callback=None):
+        """
+        Discover the services of a device in the background.
+        
+        Args:
+            address: Device address
+            callback: Optional function called with (address, services)
+            
+        Returns:
+            Future resolving to the list of services, or None if unavailable
+        """
+        if not self.available:
+            return None
+            
+        try:
+            return self._get_service_discovery().discover(address, callback)
+        except Exception as e:
+            print(f"Service discovery error: {str(e)}")
+            return None
+            
+    def _get_service_discovery(self):
+        """
+        Get the service discovery worker pool, creating it on first use.
+        
+        Returns:
+            ServiceDiscovery instance
+        """
+        if self.service_discovery is None:
+            backend = self.sdp_backend
+            if backend is None:
+                if platform == 'android':
+                    backend = AndroidSDPBackend(self.adapter)
+                else:
+                    backend = PyBluezSDPBackend()
+            self.service_discovery = ServiceDiscovery(backend)
+            
+        return self.service_discovery
+        
+    def start_monitoring(self, on_device=None, record_window=60.0, **options):
+        """
+        Start continuous background scanning.
+        
+        Sightings are aggregated and one summary record per device is
+        stored for every record window; the summaries are written by a
+        flush thread rather than the scan thread.
+        
+        Args:
+            on_device: Optional function called with every device sighting
+            record_window: Aggregation window for stored records in seconds
+            **options: ScanScheduler options (scan_window, min_interval, ...)
+            
+        Returns:
+            Boolean indicating if monitoring started successfully
+        """
+        if not self.available or (self.scheduler and self.scheduler.is_running()):
+            return False
+            
+        self.aggregator = SightingAggregator(self.record_device, record_window)
+        aggregator = self.aggregator
+        
+        def handle_device(device):
+            aggregator.add(device)
+            if on_device:
+                on_device(device)
+                
+        self.scheduler = ScanScheduler(self, on_device=handle_device, **options)
+        if not self.scheduler.start():
+            return False
+            
+        self._monitor_stop = threading.Event()
+        flush_thread = threading.Thread(target=self._flush_process,
+                                        args=(aggregator, self._monitor_stop))
+        flush_thread.daemon = True
+        flush_thread.start()
+        
+        return True
+        
+    def _flush_process(self, aggregator, stop_event):
+        """
+        Background process storing the summaries of ended aggregation windows.
+        
+        Args:
+            aggregator: SightingAggregator of the monitoring session
+            stop_event: threading.Event that ends the process when set
+        """
+        while not stop_event.wait(aggregator.window / 2):
+            aggregator.flush_expired()
+        
+    def stop_monitoring(self):
+        """
+        Stop continuous background scanning.
+        
+        Returns:
+            Boolean indicating if monitoring stopped successfully
+        """
+        if not self.scheduler:
+            return False
+            
+        stopped = self.scheduler.stop()
+        if self._monitor_stop:
+            self._monitor_stop.set()
+            self._monitor_stop = None
+            
+        # Persist whatever is still being aggregated
+        if self.aggregator:
+            self.aggregator.flush()
+            
+        return stopped
+        
+    def get_monitoring_metrics(self):
+        """
+        Get the timing decisions and counters of the background scanner.
+        
+        Returns:
+            Dictionary of metrics, or None if monitoring was never started
+        """
+        if not self.scheduler:
+            return None
+            
+        return self.scheduler.get_metrics()
+        
+    def is_monitoring(self):
+        """
+        Check if continuous background scanning is running.
+        
+        Returns:
+            Boolean indicating if the scan scheduler is running
+        """
+        return bool(self.scheduler and self.scheduler.is_running())
+        
+    def track_devices(self, devices):
+        """
+        Update RSSI smoothing and distance estimates for a scan tick.
+        
+        Each device dictionary gains 'rssi_smoothed' and 'distance' entries
+        when it carries an RSSI reading.
         
+        Args:
+            devices: List of device dictionaries seen during the tick
+        """
+        try:
+            self.rssi_tracker.update(devices)
+        except Exception as e:
+            print(f"RSSI tracking error: {str(e)}")
+            
+    def update_presence(self, now=None):
+        """
+        Expire absent devices and store the arrive/depart events since the last call.
+        
+        Only one thread computes presence: the scan scheduler while
+        monitoring, otherwise the thread that ran a scan. Other readers,
+        such as the UI, use get_present_devices().
+        
+        RSSI tracking state is dropped for devices not updated within the
+        absence timeout, so rotating random addresses do not accumulate.
+        
+        Args:
+            now: Current time in seconds (defaults to time.time())
+            
+        Returns:
+            List of presence event dictionaries in the order they occurred
+        """
+        try:
+            self.presence.tick(now)
+            self.rssi_tracker.prune(self.presence.absence_timeout, now)
+            
+            events = []
+            while self._presence_events:
+                events.append(self._presence_events.popleft())
+                
+            if events:
+                self.storage_service.save_presence_events(events)
+            return events
+            
+        except Exception as e:
+            print(f"Presence tracking error: {str(e)}")
+            return []
+            
+    def get_present_devices(self, now=None):
+        """
+        Get a snapshot of the devices currently in range.
+        
+        Devices whose absence timeout has run out are left out even if
+        update_presence() has not expired them yet.
+        
+        Args:
+            now: Current time in seconds (defaults to time.time())
+            
+        Returns:
+            List of dictionaries with address, name, first_seen, last_seen
+            and sightings
+        """
+        if now is None:
+            now = time.time()
+            
+        timeout = self.presence.absence_timeout
+        return [entry for entry in self.presence.get_present()
+                if now - entry['last_seen'] < timeout]
+        
+    def get_occupancy(self):
+        """
+        Count the devices currently in range.
+        
+        Returns:
+            Dictionary with the number of present 'addresses' and of the
+            probable physical 'devices' behind them
+        """
+        addresses = [entry['address'] for entry in self.get_present_devices()]
+        return {
+            'addresses': len(addresses),
+            'devices': self.identity_resolver.count_identities(addresses)
+        }
+        
+    def shutdown(self):
+        """Stop background scanning and worker pools."""
+        self.stop_monitoring()
+        
+        if self.service_discovery:
+            self.service_discovery.shutdown()
+            self.service_discovery = None
+            
+        if self.name_resolver:
+            self.name_resolver.shutdown()
+            self.name_resolver = None
+            
+        if self.connection_pool:
+            self.connection_pool.close_all()
+            
     def record_device(self, device_info):
         """
         Record a Bluetooth device signal.
@@ -192,24 +954,57 @@ class BluetoothService:
             return False
             
         try:
+            # Decode the Class of Device if the scan did not already
+            device_class = device_info.get('device_class')
+            if 'major_class' not in device_info and isinstance(device_class, int):
+                device_info = dict(device_info, **self._decode_device_class(device_class))
+                
             # Create a signal model
             device_data = {
-                'protocol': 'bluetooth',
+                'protocol': device_info.get('protocol', 'bluetooth'),
                 'device_class': device_info.get('device_class', 'unknown'),
-                'services': [],  # Would require further scanning for services
+                'service_classes': device_info.get('service_classes', []),
+                'services': device_info.get('services', []),
                 'metadata': {
                     'scan_time': time.time(),
                     'platform': platform
                 }
             }
             
+            if 'advertisement' in device_info:
+                device_data['advertisement'] = device_info['advertisement']
+                
+            if 'sightings' in device_info:
+                device_data['sightings'] = device_info['sightings']
+                
+            if device_info.get('adapters'):
+                device_data['adapters'] = device_info['adapters']
+                
+            # Merge services found by background discovery
+            if self.service_discovery and not device_data['services']:
+                services = self.service_discovery.get_services(device_info.get('address'))
+                if services:
+                    device_data['services'] = services
+                    
+            tracking = self.rssi_tracker.get(device_info.get('address'))
+            if tracking:
+                device_data['tracking'] = tracking
+            
             signal = SignalModel(
                 signal_type='bluetooth',
                 data=device_data,
-                name=device_info.get('name', 'Unknown Device'),
-                device_name=device_info.get('name', 'Unknown Device'),
+                name=device_info.get('name', UNKNOWN_DEVICE_NAME),
+                device_name=device_info.get('name', UNKNOWN_DEVICE_NAME),
                 address=device_info.get('address', ''),
-                rssi=device_info.get('rssi', 0)
+                rssi=device_info.get('rssi', 0),
+                device_group=device_info.get('device_group'),
+                vendor=device_info.get('vendor') or self.vendor_index.lookup(
+                    device_info.get('address')),
+                identity_id=device_info.get('identity_id') or self.identity_resolver.resolve(
+                    dict(device_info)),
+                major_class=device_info.get('major_class'),
+                minor_class=device_info.get('minor_class'),
+                service_bits=device_info.get('service_bits')
             )
             
             # Save to storage
@@ -219,12 +1014,17 @@ class BluetoothService:
             print(f"Error recording Bluetooth device: {str(e)}")
             return False
             
-    def transmit_signal(self, signal_data):
+    def transmit_signal(self, signal_data, timeout=DEFAULT_TIMEOUT):
         """
-        Transmit a Bluetooth signal (simulated).
+        Transmit a Bluetooth signal.
+        
+        The payload is sent over a pooled connection, so repeated commands
+        to the same device reuse the open connection. A signal without a
+        payload only checks that the device accepts a connection.
         
         Args:
             signal_data: Dictionary containing signal data
+            timeout: Time allowed for connecting and sending in seconds
             
         Returns:
             Boolean indicating success or failure
@@ -233,23 +1033,114 @@ class BluetoothService:
             return False
             
         try:
-            # In a real implementation, this would attempt to connect to
-            # the device and perform some action. Here we'll simulate success.
-            print(f"Simulating transmission to Bluetooth device: {signal_data.get('address')}")
-            
-            # Connect to the device
-            if platform == 'android':
-                # Android Bluetooth connection would be implemented here
-                # This would typically use BluetoothSocket
-                pass
-            else:
-                # Generic Bluetooth connection
-                pass
+            address = signal_data.get('address')
+            if not address:
+                return False
                 
-            # For demo purposes, we'll just return success
-            # In a real app, this would actually send commands to the device
+            self._get_connection_pool().send(address, self.get_payload(signal_data), timeout)
             return True
             
         except Exception as e:
             print(f"Error transmitting Bluetooth signal: {str(e)}")
             return False
+            
+    def broadcast(self, payload, addresses=None, group=None,
+                  max_concurrency=DEFAULT_BROADCAST_CONCURRENCY,
+                  timeout=DEFAULT_TIMEOUT, retries=1):
+        """
+        Send a payload to many devices with bounded concurrency.
+        
+        Args:
+            payload: Bytes or text to send to every device
+            addresses: Optional list of device addresses
+            group: Optional stored device group whose devices are added
+            max_concurrency: Maximum number of devices sent to at once
+            timeout: Time allowed per device in seconds, shared by its attempts
+            retries: Number of extra attempts for a failed device
+            
+        Returns:
+            List of dictionaries with address, success, attempts,
+            latency (seconds) and error for every target device
+        """
+        targets = list(addresses or [])
+        if group:
+            targets += self.storage_service.get_group_addresses(group)
+        targets = list(dict.fromkeys(targets))
+        
+        if not self.available or not targets:
+            return []
+            
+        payload = self.get_payload({'payload': payload})
+        pool = self._get_connection_pool()
+        attempts = max(retries, 0) + 1
+        
+        def send(address):
+            start = time.time()
+            deadline = start + timeout
+            attempt = 0
+            error = "Timed out"
+            while attempt < attempts:
+                # Retries only get what is left of the device's timeout
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                    
+                attempt += 1
+                try:
+                    pool.send(address, payload, remaining)
+                    error = None
+                    break
+                except Exception as e:
+                    error = str(e)
+                    
+            return {
+                'address': address,
+                'success': error is None,
+                'attempts': attempt,
+                'latency': time.time() - start,
+                'error': error
+            }
+            
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency),
+                                thread_name_prefix='broadcast') as executor:
+            return list(executor.map(send, targets))
+            
+    def get_payload(self, signal_data):
+        """
+        Extract the bytes to send from signal data.
+        
+        Args:
+            signal_data: Dictionary containing signal data
+            
+        Returns:
+            Payload bytes (empty if the signal carries none)
+        """
+        payload = signal_data.get('payload')
+        if payload is None:
+            data = signal_data.get('data', {})
+            if isinstance(data, dict):
+                payload = data.get('payload')
+                
+        if payload is None:
+            return b''
+        if isinstance(payload, str):
+            return payload.encode('utf-8')
+        return bytes(payload)
+        
+    def _get_connection_pool(self):
+        """
+        Get the connection pool, creating it on first use.
+        
+        Returns:
+            ConnectionPool instance
+        """
+        if self.connection_pool is None:
+            transport = self.transport
+            if transport is None:
+                if platform == 'android':
+                    transport = AndroidRFCOMMTransport(self.adapter)
+                else:
+                    transport = RFCOMMTransport()
+            self.connection_pool = ConnectionPool(transport)
+            
+        return self.connection_pool
@@ -0,0 +1,177 @@
+"""
+Cache implementation for Signal Catcher app.
+Provides a thread-safe key/value cache with per-entry expiry.
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Thread-safe cache whose entries expire after a time-to-live.
+    The least recently used entry is evicted when the cache is full.
+    """
+    def __init__(self, ttl=600.0, max_size=4096):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Default entry lifetime in seconds
+            max_size: Maximum number of entries
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or the default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, expires = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def __contains__(self, key):
+        """Check whether a key has an unexpired entry."""
+        marker = object()
+        return self.get(key, marker) is not marker
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Optional lifetime in seconds overriding the default
+        """
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove an entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Boolean indicating if an entry was removed
+        """
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def purge(self):
+        """
+        Remove all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+
+        with self._lock:
+            expired = [key for key, (_, expires) in self._entries.items() if expires <= now]
+            for key in expired:
+                del self._entries[key]
+
+        return len(expired)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def save(self, path):
+        """
+        Write the unexpired entries to a JSON file.
+
+        Keys are stored as strings and values must be JSON serializable.
+
+        Args:
+            path: Destination file path
+
+        Returns:
+            Boolean indicating success or failure
+        """
+        now = time.time()
+
+        with self._lock:
+            entries = [[key, value, expires] for key, (value, expires)
+                       in self._entries.items() if expires > now]
+
+        try:
+            # Write to a temporary file first so a crash cannot truncate the cache
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, path)
+            return True
+
+        except Exception as e:
+            print(f"Error saving cache: {str(e)}")
+            return False
+
+    def load(self, path):
+        """
+        Read entries previously written by save().
+
+        Args:
+            path: Source file path
+
+        Returns:
+            Number of unexpired entries loaded
+        """
+        if not os.path.exists(path):
+            return 0
+
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"Error loading cache: {str(e)}")
+            return 0
+
+        now = time.time()
+        loaded = 0
+
+        with self._lock:
+            for key, value, expires in entries:
+                if expires > now:
+                    self._entries[key] = (value, expires)
+                    loaded += 1
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return loaded
+
+    def __len__(self):
+        """Return the number of entries, including expired ones not yet purged."""
+        return len(self._entries)
@@ -0,0 +1,442 @@
+"""
+Connection pool implementation for Signal Catcher app.
+Keeps reusable connections to remote devices keyed by address.
+"""
+import socket
+import threading
+import time
+
+# Maximum number of open connections
+DEFAULT_MAX_SIZE = 8
+
+# Idle time after which a connection is closed (seconds)
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+# Default time allowed for connecting and sending (seconds)
+DEFAULT_TIMEOUT = 10.0
+
+# Serial Port Profile service UUID
+SPP_UUID = '00001101-0000-1000-8000-00805F9B34FB'
+
+
+class ConnectionPool:
+    """
+    Pool of open connections keyed by device address.
+
+    Connections are opened lazily on first use, reused by later sends and
+    closed after being idle for idle_timeout seconds. When max_size
+    connections are open, the least recently used idle one is closed to
+    make room.
+    """
+    def __init__(self, transport, max_size=DEFAULT_MAX_SIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Initialize the connection pool.
+
+        Args:
+            transport: Object providing connect(address, timeout) -> connection
+                with send(data) and close() methods
+            max_size: Maximum number of open connections
+            idle_timeout: Idle time in seconds before a connection is closed
+        """
+        self.transport = transport
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connects = 0
+        self.reuses = 0
+        self.evictions = 0
+
+        self._entries = {}
+        self._condition = threading.Condition()
+        self._reaper = None
+        self._closed = False
+
+    def send(self, address, payload, timeout=DEFAULT_TIMEOUT):
+        """
+        Send a payload to a device, reusing an open connection if possible.
+
+        A reused connection that fails is replaced by a fresh one once.
+
+        Args:
+            address: Device address
+            payload: Bytes to send (empty to only ensure a connection)
+            timeout: Time allowed for acquiring, connecting and sending
+
+        Returns:
+            Boolean indicating if a new connection had to be opened
+        """
+        deadline = time.time() + timeout
+        entry = self._acquire(address, deadline)
+
+        try:
+            with entry['lock']:
+                reused = entry['connection'] is not None
+                for attempt in range(2):
+                    try:
+                        if entry['connection'] is None:
+                            entry['connection'] = self.transport.connect(
+                                address, max(0.1, deadline - time.time()))
+                            self.connects += 1
+                        else:
+                            self.reuses += 1
+
+                        if payload:
+                            entry['connection'].send(payload)
+                        return not reused or attempt > 0
+
+                    except Exception:
+                        self._close_connection(entry)
+                        # Only a stale reused connection is worth retrying
+                        if not reused or attempt > 0 or time.time() >= deadline:
+                            raise
+        finally:
+            self._release(entry)
+
+    def close(self, address):
+        """
+        Close the connection to a device.
+
+        Args:
+            address: Device address
+        """
+        with self._condition:
+            entry = self._entries.get(address)
+            if entry and not entry['in_use']:
+                del self._entries[address]
+                self._close_connection(entry)
+                self._condition.notify_all()
+
+    def close_all(self):
+        """Close every idle connection and stop the idle reaper."""
+        with self._condition:
+            self._closed = True
+            for address in [a for a, e in self._entries.items() if not e['in_use']]:
+                self._close_connection(self._entries.pop(address))
+            self._condition.notify_all()
+
+    def evict_idle(self):
+        """
+        Close connections that have been idle for longer than idle_timeout.
+
+        Returns:
+            Number of connections closed
+        """
+        cutoff = time.time() - self.idle_timeout
+
+        with self._condition:
+            idle = [address for address, entry in self._entries.items()
+                    if not entry['in_use'] and entry['last_used'] < cutoff]
+            for address in idle:
+                self._close_connection(self._entries.pop(address))
+            self.evictions += len(idle)
+            if idle:
+                self._condition.notify_all()
+
+        return len(idle)
+
+    def get_stats(self):
+        """
+        Get pool usage counters.
+
+        Returns:
+            Dictionary with open, connects, reuses and evictions counts
+        """
+        with self._condition:
+            return {
+                'open': sum(1 for e in self._entries.values() if e['connection'] is not None),
+                'connects': self.connects,
+                'reuses': self.reuses,
+                'evictions': self.evictions
+            }
+
+    def _acquire(self, address, deadline):
+        """
+        Reserve the pool entry of an address, making room if needed.
+
+        Args:
+            address: Device address
+            deadline: Time by which the entry must be available
+
+        Returns:
+            Pool entry dictionary
+        """
+        with self._condition:
+            self._closed = False
+
+            while True:
+                entry = self._entries.get(address)
+                if entry is not None:
+                    entry['in_use'] += 1
+                    return entry
+
+                if len(self._entries) < self.max_size or self._evict_lru():
+                    entry = {
+                        'connection': None,
+                        'lock': threading.Lock(),
+                        'in_use': 1,
+                        'last_used': time.time()
+                    }
+                    self._entries[address] = entry
+                    self._start_reaper()
+                    return entry
+
+                # Every connection is busy; wait for one to be released
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError("Connection pool exhausted")
+                self._condition.wait(remaining)
+
+    def _release(self, entry):
+        """
+        Return a pool entry after use.
+
+        Args:
+            entry: Pool entry dictionary
+        """
+        with self._condition:
+            entry['in_use'] -= 1
+            entry['last_used'] = time.time()
+
+            # Drop entries whose connection failed so they do not take a slot
+            if not entry['in_use'] and entry['connection'] is None:
+                for address, current in list(self._entries.items()):
+                    if current is entry:
+                        del self._entries[address]
+
+            self._condition.notify_all()
+
+    def _evict_lru(self):
+        """
+        Close the least recently used idle connection.
+
+        Returns:
+            Boolean indicating if a connection was closed
+        """
+        idle = [(entry['last_used'], address) for address, entry in self._entries.items()
+                if not entry['in_use']]
+        if not idle:
+            return False
+
+        _, address = min(idle)
+        self._close_connection(self._entries.pop(address))
+        self.evictions += 1
+        return True
+
+    def _close_connection(self, entry):
+        """
+        Close the connection held by a pool entry.
+
+        Args:
+            entry: Pool entry dictionary
+        """
+        connection = entry['connection']
+        entry['connection'] = None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception as e:
+                print(f"Error closing connection: {str(e)}")
+
+    def _start_reaper(self):
+        """Start the background thread closing idle connections."""
+        if self._reaper and self._reaper.is_alive():
+            return
+
+        self._reaper = threading.Thread(target=self._reaper_process)
+        self._reaper.daemon = True
+        self._reaper.start()
+
+    def _reaper_process(self):
+        """Background process evicting idle connections."""
+        while True:
+            time.sleep(self.idle_timeout / 2)
+            self.evict_idle()
+
+            with self._condition:
+                if self._closed or not self._entries:
+                    self._reaper = None
+                    return
+
+
+class SocketConnection:
+    """
+    Connection wrapping a Python socket.
+    """
+    def __init__(self, sock):
+        """
+        Initialize the connection.
+
+        Args:
+            sock: Connected socket object
+        """
+        self.sock = sock
+
+    def send(self, data):
+        """
+        Send data over the connection.
+
+        Args:
+            data: Bytes to send
+        """
+        self.sock.sendall(data)
+
+    def close(self):
+        """Close the connection."""
+        self.sock.close()
+
+
+class RFCOMMTransport:
+    """
+    Transport opening RFCOMM connections with PyBluez (non-Android platforms).
+    """
+    def __init__(self, channel=1):
+        """
+        Initialize the RFCOMM transport.
+
+        Args:
+            channel: RFCOMM channel to connect to
+        """
+        self.channel = channel
+
+    def connect(self, address, timeout=DEFAULT_TIMEOUT):
+        """
+        Open a connection to a device.
+
+        Args:
+            address: Device address
+            timeout: Connect and send timeout in seconds
+
+        Returns:
+            SocketConnection instance
+        """
+        import bluetooth
+
+        sock = bluetooth.BluetoothSocket(bluetooth.RFCOMM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect((address, self.channel))
+        except Exception:
+            sock.close()
+            raise
+
+        return SocketConnection(sock)
+
+
+class AndroidRFCOMMConnection:
+    """
+    Connection wrapping an Android BluetoothSocket.
+    """
+    def __init__(self, sock):
+        """
+        Initialize the connection.
+
+        Args:
+            sock: Connected android.bluetooth.BluetoothSocket
+        """
+        self.sock = sock
+        self.output = sock.getOutputStream()
+
+    def send(self, data):
+        """
+        Send data over the connection.
+
+        Args:
+            data: Bytes to send
+        """
+        self.output.write(data)
+        self.output.flush()
+
+    def close(self):
+        """Close the connection."""
+        self.sock.close()
+
+
+class AndroidRFCOMMTransport:
+    """
+    Transport opening RFCOMM connections through the Android Bluetooth API.
+    """
+    def __init__(self, adapter, service_uuid=SPP_UUID):
+        """
+        Initialize the Android transport.
+
+        Args:
+            adapter: The android.bluetooth.BluetoothAdapter instance
+            service_uuid: UUID of the service record to connect to
+        """
+        self.adapter = adapter
+        self.service_uuid = service_uuid
+
+    def connect(self, address, timeout=DEFAULT_TIMEOUT):
+        """
+        Open a connection to a device.
+
+        BluetoothSocket.connect() has no timeout parameter and blocks until
+        it succeeds or fails.
+
+        Args:
+            address: Device address
+            timeout: Unused on Android
+
+        Returns:
+            AndroidRFCOMMConnection instance
+        """
+        from jnius import autoclass
+
+        UUID = autoclass('java.util.UUID')
+
+        device = self.adapter.getRemoteDevice(address)
+        sock = device.createRfcommSocketToServiceRecord(UUID.fromString(self.service_uuid))
+
+        # Discovery slows down connections considerably
+        self.adapter.cancelDiscovery()
+        sock.connect()
+
+        return AndroidRFCOMMConnection(sock)
+
+
+class SocketTransport:
+    """
+    Transport opening local TCP or Unix socket connections.
+    Stands in for RFCOMM when testing without a radio.
+    """
+    def __init__(self, endpoints=None):
+        """
+        Initialize the socket transport.
+
+        Args:
+            endpoints: Optional dictionary mapping device addresses to
+                endpoints; addresses without a mapping are used directly.
+                An endpoint is 'host:port' for TCP or a filesystem path for
+                a Unix socket.
+        """
+        self.endpoints = endpoints or {}
+
+    def connect(self, address, timeout=DEFAULT_TIMEOUT):
+        """
+        Open a connection to the endpoint of a device.
+
+        Args:
+            address: Device address or endpoint
+            timeout: Connect and send timeout in seconds
+
+        Returns:
+            SocketConnection instance
+        """
+        endpoint = self.endpoints.get(address, address)
+
+        if endpoint.startswith('/') or endpoint.startswith('.'):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            target = endpoint
+        else:
+            host, port = endpoint.rsplit(':', 1)
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            target = (host, int(port))
+
+        try:
+            sock.settimeout(timeout)
+            sock.connect(target)
+        except Exception:
+            sock.close()
+            raise
+
+        return SocketConnection(sock)
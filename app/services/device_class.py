@@ -0,0 +1,156 @@
+"""
+Class of Device decoding for Signal Catcher app.
+Decodes the 24-bit Bluetooth Class of Device (CoD) with lookup tables.
+
+CoD layout (Bluetooth Assigned Numbers, Baseband):
+    bits 0-1    format type (always 0)
+    bits 2-7    minor device class (meaning depends on the major class)
+    bits 8-12   major device class
+    bits 13-23  major service classes (one bit each)
+"""
+import functools
+
+MINOR_SHIFT = 2
+MINOR_MASK = 0x3F
+MAJOR_SHIFT = 8
+MAJOR_MASK = 0x1F
+SERVICE_SHIFT = 13
+SERVICE_MASK = 0x7FF
+
+# Major service class names by CoD bit number
+SERVICE_CLASSES = (
+    (13, 'Limited Discoverable'),
+    (14, 'LE Audio'),
+    (16, 'Positioning'),
+    (17, 'Networking'),
+    (18, 'Rendering'),
+    (19, 'Capturing'),
+    (20, 'Object Transfer'),
+    (21, 'Audio'),
+    (22, 'Telephony'),
+    (23, 'Information')
+)
+
+COMPUTER_MINOR = ('Uncategorized', 'Desktop', 'Server', 'Laptop', 'Handheld PC/PDA',
+                  'Palm-size PC/PDA', 'Wearable Computer', 'Tablet')
+
+PHONE_MINOR = ('Uncategorized', 'Cellular', 'Cordless', 'Smartphone',
+               'Modem/Voice Gateway', 'ISDN Access')
+
+NETWORK_LOAD = ('Fully Available', '1-17% Utilized', '17-33% Utilized', '33-50% Utilized',
+                '50-67% Utilized', '67-83% Utilized', '83-99% Utilized', 'No Service Available')
+
+AUDIO_VIDEO_MINOR = ('Uncategorized', 'Headset', 'Hands-free', None, 'Microphone',
+                     'Loudspeaker', 'Headphones', 'Portable Audio', 'Car Audio',
+                     'Set-top Box', 'HiFi Audio', 'VCR', 'Video Camera', 'Camcorder',
+                     'Video Monitor', 'Video Display and Loudspeaker',
+                     'Video Conferencing', None, 'Gaming/Toy')
+
+PERIPHERAL_INPUT = (None, 'Keyboard', 'Pointing Device', 'Keyboard/Pointing Device')
+
+PERIPHERAL_MINOR = (None, 'Joystick', 'Gamepad', 'Remote Control',
+                    'Sensing Device', 'Digitizer Tablet', 'Card Reader', 'Digital Pen',
+                    'Handheld Scanner', 'Gesture Input')
+
+# Imaging minor classes are flags; bit values within the minor field
+IMAGING_FLAGS = ((0x04, 'Display'), (0x08, 'Camera'), (0x10, 'Scanner'), (0x20, 'Printer'))
+
+WEARABLE_MINOR = (None, 'Wristwatch', 'Pager', 'Jacket', 'Helmet', 'Glasses', 'Pin')
+
+TOY_MINOR = (None, 'Robot', 'Vehicle', 'Doll/Action Figure', 'Controller', 'Game')
+
+HEALTH_MINOR = ('Undefined', 'Blood Pressure Monitor', 'Thermometer', 'Weighing Scale',
+                'Glucose Meter', 'Pulse Oximeter', 'Heart Rate Monitor',
+                'Health Data Display', 'Step Counter', 'Body Composition Analyzer',
+                'Peak Flow Monitor', 'Medication Monitor', 'Knee Prosthesis',
+                'Ankle Prosthesis', 'Generic Health Manager', 'Personal Mobility Device')
+
+# Major class number -> (name, minor fields). Each minor field is a
+# (shift, mask, names) entry applied to the 6-bit minor class; the names of
+# all fields are joined. Imaging uses flags instead (names is None).
+MAJOR_CLASSES = {
+    0: ('Miscellaneous', ()),
+    1: ('Computer', ((0, 0x3F, COMPUTER_MINOR),)),
+    2: ('Phone', ((0, 0x3F, PHONE_MINOR),)),
+    3: ('Network Access Point', ((3, 0x07, NETWORK_LOAD),)),
+    4: ('Audio/Video', ((0, 0x3F, AUDIO_VIDEO_MINOR),)),
+    5: ('Peripheral', ((4, 0x03, PERIPHERAL_INPUT), (0, 0x0F, PERIPHERAL_MINOR))),
+    6: ('Imaging', ((0, 0x3F, None),)),
+    7: ('Wearable', ((0, 0x3F, WEARABLE_MINOR),)),
+    8: ('Toy', ((0, 0x3F, TOY_MINOR),)),
+    9: ('Health', ((0, 0x3F, HEALTH_MINOR),)),
+    31: ('Uncategorized', ())
+}
+
+
+def decode_class(cod):
+    """
+    Decode a Class of Device value.
+
+    Args:
+        cod: 24-bit Class of Device integer
+
+    Returns:
+        Dictionary with the raw 'cod', 'major_class' and 'minor_class' names
+        (minor_class is None if not defined), 'service_bits' (the 11 service
+        class bits) and the 'service_classes' names
+    """
+    decoded = _decode_class(int(cod) & 0xFFFFFF)
+    return dict(decoded, service_classes=list(decoded['service_classes']))
+
+
+@functools.lru_cache(maxsize=1024)
+def _decode_class(cod):
+    """
+    Decode a Class of Device value; results are cached since a scan only
+    ever sees a handful of distinct values.
+
+    Args:
+        cod: 24-bit Class of Device integer
+
+    Returns:
+        Decoded class dictionary (shared; see decode_class())
+    """
+    major = (cod >> MAJOR_SHIFT) & MAJOR_MASK
+    minor = (cod >> MINOR_SHIFT) & MINOR_MASK
+
+    major_name, fields = MAJOR_CLASSES.get(major, (f"Reserved ({major})", ()))
+
+    minor_names = []
+    for shift, mask, names in fields:
+        if names is None:
+            minor_names.extend(name for flag, name in IMAGING_FLAGS if minor & flag)
+            continue
+
+        value = (minor >> shift) & mask
+        name = names[value] if value < len(names) else None
+        if name:
+            minor_names.append(name)
+
+    return {
+        'cod': cod,
+        'major_class': major_name,
+        'minor_class': ', '.join(minor_names) or None,
+        'service_bits': (cod >> SERVICE_SHIFT) & SERVICE_MASK,
+        'service_classes': [name for bit, name in SERVICE_CLASSES if cod & (1 << bit)]
+    }
+
+
+def service_mask(*names):
+    """
+    Build a service_bits mask from service class names.
+
+    Args:
+        *names: Names from SERVICE_CLASSES (e.g. 'Audio', 'Telephony')
+
+    Returns:
+        Integer mask matching the 'service_bits' value of decode_class()
+    """
+    bits = dict((name, bit) for bit, name in SERVICE_CLASSES)
+
+    mask = 0
+    for name in names:
+        if name not in bits:
+            raise ValueError(f"Unknown service class {name}")
+        mask |= 1 << (bits[name] - SERVICE_SHIFT)
+    return mask
@@ -0,0 +1,473 @@
+"""
+Identity resolver implementation for Signal Catcher app.
+Groups sightings of rotating random addresses into probable physical devices.
+"""
+import collections
+import threading
+import time
+import uuid
+
+# Longest gap between the last sighting of an old address and the first
+# sighting of its replacement for them to be linked (seconds)
+DEFAULT_MAX_GAP = 180.0
+
+# Shortest time an identity's current address must have gone unseen before
+# another address is linked to it; an address seen more recently belongs to
+# a device that is still active. Should exceed the time between scans.
+DEFAULT_MIN_SILENCE = 30.0
+
+# Largest RSSI jump accepted across an address rotation (dB)
+DEFAULT_RSSI_TOLERANCE = 20.0
+
+# Time after which an address no longer seen is forgotten (seconds)
+DEFAULT_ADDRESS_TTL = 3600.0
+
+# Most identities compared when matching a new address
+MAX_CANDIDATES = 64
+
+# Namespace for identity ids derived from public addresses
+IDENTITY_NAMESPACE = uuid.UUID('8f9a4c52-6d1e-4b7e-9a51-3c2f0b7d9e14')
+
+
+def is_random_address(device):
+    """
+    Check whether a device uses a random (rotating) address.
+
+    An explicit 'address_type' of 'random' or 'public' is trusted. Otherwise
+    BLE addresses whose two most significant bits are 01 are treated as
+    resolvable private addresses; non-resolvable private addresses (00)
+    cannot be told apart from public ones without the address type.
+
+    Args:
+        device: Dictionary containing device information
+
+    Returns:
+        Boolean indicating if the address is random
+    """
+    address_type = device.get('address_type')
+    if address_type:
+        return address_type == 'random'
+
+    if device.get('protocol') != 'ble':
+        return False
+
+    try:
+        return int(device['address'][:2], 16) >> 6 == 0b01
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def fingerprints(device):
+    """
+    Build the advertisement fingerprints of a device.
+
+    The strong fingerprint includes the manufacturer data contents, the
+    weak one only which companies advertise, for devices whose payload
+    changes along with the address.
+
+    Args:
+        device: Dictionary containing device information
+
+    Returns:
+        Tuple of (strong, weak) hashable fingerprints, or None if the
+        device advertises nothing to identify it by
+    """
+    advertisement = device.get('advertisement') or {}
+    name = device.get('name')
+    if name == 'Unknown Device':
+        name = None
+
+    manufacturer_data = advertisement.get('manufacturer_data') or {}
+    services = tuple(sorted(str(uuid) for uuid in advertisement.get('service_uuids') or ()))
+    weak = (
+        name,
+        tuple(sorted(manufacturer_data)),
+        services,
+        device.get('tx_power', advertisement.get('tx_power')),
+        device.get('device_class')
+    )
+
+    if not any(weak):
+        return None
+
+    strong = weak + (tuple(sorted((k, str(v)) for k, v in manufacturer_data.items())),)
+    return strong, weak
+
+
+class IdentityResolver:
+    """
+    Incremental clustering of device sightings into identities.
+
+    Known addresses resolve through an address index. A new random address
+    gets an identity of its own, which is linked to an identity with the
+    same advertisement fingerprint whose current address stopped being seen
+    before the new one appeared, at most max_gap earlier, and has been
+    silent for at least min_silence. Since a rotated address is often seen
+    before the old one counts as silent, linking is retried on later
+    sightings of the new address until max_gap has passed. Among the
+    candidates the closest in time and RSSI wins.
+
+    Each identity keeps the history of its addresses; when an older address
+    is seen again, the links made after it are undone. Fingerprint buckets
+    are kept in last-seen order and trimmed from the stale end, so matching
+    only looks at recent candidates.
+    """
+    def __init__(self, max_gap=DEFAULT_MAX_GAP, rssi_tolerance=DEFAULT_RSSI_TOLERANCE,
+                 address_ttl=DEFAULT_ADDRESS_TTL, min_silence=DEFAULT_MIN_SILENCE):
+        """
+        Initialize the identity resolver.
+
+        Args:
+            max_gap: Longest gap in seconds across which addresses are linked
+            rssi_tolerance: Largest RSSI jump in dB across an address rotation
+            address_ttl: Seconds after which an unseen address is forgotten
+            min_silence: Seconds an identity must have gone unseen before a
+                new address can be linked to it
+        """
+        self.max_gap = max_gap
+        self.min_silence = min_silence
+        self.rssi_tolerance = rssi_tolerance
+        self.address_ttl = address_ttl
+        self.links = 0
+        self.splits = 0
+
+        self._identities = {}
+        self._addresses = collections.OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, device):
+        """
+        Assign an identity to a device sighting.
+
+        Sets device['identity_id'].
+
+        Args:
+            device: Dictionary containing device information
+
+        Returns:
+            The identity id
+        """
+        address = device.get('address')
+        now = device.get('timestamp') or time.time()
+        rssi = device.get('rssi') or None
+
+        with self._lock:
+            identity = self._resolve(device, address, now, rssi)
+            identity['last_seen'] = max(identity['last_seen'], now)
+            identity['address'] = address
+            identity['sightings'] += 1
+            if rssi is not None:
+                identity['rssi'] = rssi
+
+            self._addresses[address] = (identity['id'], now)
+            self._addresses.move_to_end(address)
+            self._touch(identity)
+            self._prune(now)
+
+        device['identity_id'] = identity['id']
+        return identity['id']
+
+    def get_identity(self, address):
+        """
+        Get the identity of a known address.
+
+        Args:
+            address: Device address
+
+        Returns:
+            The identity id or None if the address is unknown
+        """
+        with self._lock:
+            entry = self._addresses.get(address)
+            return entry[0] if entry else None
+
+    def count_identities(self, addresses):
+        """
+        Count the distinct identities behind a set of addresses.
+
+        Args:
+            addresses: Iterable of device addresses
+
+        Returns:
+            Number of distinct identities (unknown addresses count once each)
+        """
+        with self._lock:
+            return len({self._addresses[a][0] if a in self._addresses else a
+                        for a in addresses})
+
+    def get_stats(self):
+        """
+        Get resolver counters.
+
+        Returns:
+            Dictionary with the number of known addresses and identities and
+            the number of address rotations linked and undone
+        """
+        with self._lock:
+            return {
+                'addresses': len(self._addresses),
+                'identities': len(self._identities),
+                'links': self.links,
+                'splits': self.splits
+            }
+
+    def _resolve(self, device, address, now, rssi):
+        """
+        Find or create the identity of a sighting.
+
+        Args:
+            device: Dictionary containing device information
+            address: Device address
+            now: Sighting time
+            rssi: Sighting RSSI or None
+
+        Returns:
+            Identity dictionary
+        """
+        known = self._addresses.get(address)
+        if known:
+            identity = self._identities.get(known[0])
+            if identity is not None:
+                if identity['address'] != address:
+                    # An older address is still active, so the links made
+                    # after it were wrong
+                    return self._split(identity, address, now)
+                if identity['linkable'] and now - identity['first_seen'] <= self.max_gap:
+                    return self._link(identity, now, rssi)
+                return identity
+
+        if not is_random_address(device):
+            return self._create(device, str(uuid.uuid5(IDENTITY_NAMESPACE, address or '')), now)
+
+        keys = fingerprints(device)
+        identity = self._create(device, str(uuid.uuid4()), now, keys)
+        if not keys:
+            return identity
+
+        identity['linkable'] = True
+        return self._link(identity, now, rssi)
+
+    def _link(self, identity, now, rssi):
+        """
+        Link the address of a new identity to an earlier identity.
+
+        Args:
+            identity: Identity dictionary with a single address
+            now: Sighting time
+            rssi: Sighting RSSI or None
+
+        Returns:
+            The earlier identity, now using the address, or the given
+            identity if no earlier one matches
+        """
+        for key in identity['keys']:
+            earlier = self._match(key, identity, now, rssi)
+            if earlier is None:
+                continue
+
+            earlier['address'] = identity['address']
+            earlier['history'].extend(identity['history'])
+            earlier['last_seen'] = max(earlier['last_seen'], identity['last_seen'])
+            earlier['sightings'] += identity['sightings']
+            earlier['linkable'] = False
+            for address in identity['history']:
+                if address in self._addresses:
+                    self._addresses[address] = (earlier['id'], self._addresses[address][1])
+            self._forget(identity)
+            self.links += 1
+            return earlier
+
+        return identity
+
+    def _match(self, key, identity, now, rssi):
+        """
+        Find the best earlier identity in a fingerprint bucket.
+
+        Args:
+            key: Fingerprint
+            identity: Identity dictionary of the new address
+            now: Sighting time
+            rssi: Sighting RSSI or None
+
+        Returns:
+            Identity dictionary or None
+        """
+        bucket = self._buckets.get(key)
+        if not bucket:
+            return None
+
+        candidates = []
+        appeared = []
+
+        # Most recently seen identities first; stop at the first stale one
+        for candidate_id in reversed(bucket):
+            if candidate_id == identity['id']:
+                continue
+
+            candidate = self._identities[candidate_id]
+            gap = identity['first_seen'] - candidate['last_seen']
+            if gap > self.max_gap or len(candidates) >= MAX_CANDIDATES:
+                break
+            if candidate['linkable']:
+                appeared.append(candidate)
+
+            # Seen after the new address appeared: another device
+            if gap <= 0:
+                continue
+
+            # Not silent for long enough to tell whether it is still active;
+            # decide on a later sighting rather than settle for another match
+            if now - candidate['last_seen'] < self.min_silence:
+                if self._rssi_delta(candidate, rssi) <= self.rssi_tolerance:
+                    return None
+                continue
+            candidates.append((candidate, gap))
+
+        best = None
+        best_score = None
+
+        for candidate, gap in candidates:
+            rssi_delta = self._rssi_delta(candidate, rssi)
+            if rssi_delta > self.rssi_tolerance:
+                continue
+
+            # Another unlinked address in range appeared first after the
+            # candidate went silent, so it is more likely the rotation
+            if any(candidate['last_seen'] < other['first_seen'] < identity['first_seen'] and
+                   self._rssi_delta(candidate, other['rssi']) <= self.rssi_tolerance
+                   for other in appeared):
+                continue
+
+            score = gap / self.max_gap + rssi_delta / self.rssi_tolerance
+            if best is None or score < best_score:
+                best = candidate
+                best_score = score
+
+        return best
+
+    def _rssi_delta(self, identity, rssi):
+        """
+        Get the RSSI jump between an identity and a sighting.
+
+        Args:
+            identity: Identity dictionary
+            rssi: Sighting RSSI or None
+
+        Returns:
+            Absolute difference in dB (0 if either RSSI is unknown)
+        """
+        if rssi is None or identity['rssi'] is None:
+            return 0.0
+        return abs(rssi - identity['rssi'])
+
+    def _create(self, device, identity_id, now, keys=None):
+        """
+        Create an identity.
+
+        Args:
+            device: Dictionary containing device information
+            identity_id: Id of the new identity
+            now: Sighting time
+            keys: Fingerprints the identity is indexed under
+
+        Returns:
+            Identity dictionary
+        """
+        identity = self._identities.get(identity_id)
+        if identity is not None:
+            return identity
+
+        identity = {
+            'id': identity_id,
+            'address': device.get('address'),
+            'history': [device.get('address')],
+            'linkable': False,
+            'keys': keys or (),
+            'first_seen': now,
+            'last_seen': now,
+            'rssi': None,
+            'sightings': 0
+        }
+        self._identities[identity_id] = identity
+        return identity
+
+    def _split(self, identity, address, now):
+        """
+        Undo the address links of an identity made after one of its addresses.
+
+        The identity goes back to that address and the newer addresses move
+        to a fresh identity. The fresh identity is not indexed under the
+        fingerprints, so it is never matched against new addresses.
+
+        Args:
+            identity: Identity dictionary whose older address was seen again
+            address: The older address
+            now: Sighting time
+
+        Returns:
+            The identity, now using the older address again
+        """
+        index = identity['history'].index(address)
+        newer = identity['history'][index + 1:]
+
+        split = self._create({'address': newer[-1]}, str(uuid.uuid4()), now)
+        split['history'] = newer
+        split['last_seen'] = identity['last_seen']
+        split['rssi'] = identity['rssi']
+        for moved in newer:
+            if moved in self._addresses:
+                self._addresses[moved] = (split['id'], self._addresses[moved][1])
+
+        identity['address'] = address
+        identity['history'] = identity['history'][:index + 1]
+        self.splits += 1
+        return identity
+
+    def _touch(self, identity):
+        """
+        Move an identity to the recent end of its fingerprint buckets.
+
+        Args:
+            identity: Identity dictionary
+        """
+        for key in identity['keys']:
+            bucket = self._buckets.setdefault(key, collections.OrderedDict())
+            bucket[identity['id']] = True
+            bucket.move_to_end(identity['id'])
+
+    def _prune(self, now):
+        """
+        Forget stale addresses and identities.
+
+        Args:
+            now: Current time
+        """
+        cutoff = now - self.address_ttl
+
+        while self._addresses:
+            address, (identity_id, last_seen) = next(iter(self._addresses.items()))
+            if last_seen >= cutoff:
+                break
+            del self._addresses[address]
+
+            identity = self._identities.get(identity_id)
+            if identity is None or identity['last_seen'] >= cutoff:
+                continue
+
+            self._forget(identity)
+
+    def _forget(self, identity):
+        """
+        Remove an identity and its fingerprint bucket entries.
+
+        Args:
+            identity: Identity dictionary
+        """
+        del self._identities[identity['id']]
+        for key in identity['keys']:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pop(identity['id'], None)
+                if not bucket:
+                    del self._buckets[key]
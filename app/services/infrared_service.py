@@ -2,6 +2,7 @@
 Infrared service implementation for Signal Catcher app.
 Handles infrared signal detection, recording, and transmission.
 """
+import os
 import time
 import random
 import uuid
@@ -11,19 +12,64 @@ from kivy.clock import Clock
 
 from app.models.signal_model import SignalModel
 from app.services.storage_service import StorageService
+from app.services.ir_receiver import IRReceiver
+from app.services import ir_decoder
+from app.services import ir_encoder
+from app.services.ir_normalizer import normalize_pattern
+from app.services.ir_pronto import pattern_to_pronto
+from app.services.ir_transmitter import IRTransmitter, AndroidEmitter, FakeEmitter
+from app.services.ring_buffer import RingBuffer, OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK
+from app.services.ir_collapser import RepeatCollapser, DEFAULT_REPEAT_WINDOW
+
+# Default LIRC receiver device on Linux
+LIRC_DEVICE = '/dev/lirc0'
+
+# Environment variable naming a LIRC device, mode2 capture file or named
+# pipe to receive from instead of the default device
+IR_SOURCE_ENV = 'SIGNAL_CATCHER_IR_SOURCE'
+
+# Captured signals held for consumers draining them (see drain_signals())
+SIGNAL_BUFFER_SIZE = 64
+
+# How often a listener blocked on a full buffer checks for stop (seconds)
+BUFFER_POLL_INTERVAL = 0.1
 
 class InfraredService:
     """
     Service for infrared operations.
     Handles signal detection, recording, and transmission.
     """
-    def __init__(self):
-        """Initialize the infrared service."""
+    def __init__(self, receiver=None, normalize=True, emitter=None,
+                 buffer_size=SIGNAL_BUFFER_SIZE, overflow=OVERFLOW_DROP_OLDEST,
+                 repeat_window=DEFAULT_REPEAT_WINDOW):
+        """
+        Initialize the infrared service.
+        
+        Args:
+            receiver: Optional IRReceiver replacing the platform receiver
+            normalize: Whether captured patterns are normalized (snapped to
+                their timing unit) before they are passed on
+            emitter: Optional emitter replacing the platform IR emitter
+                (e.g. a FakeEmitter in tests)
+            buffer_size: Number of captured signals held for drain_signals()
+            overflow: Policy when the signal buffer is full (see ring_buffer)
+            repeat_window: Longest time in seconds between frames merged into
+                one key press (None to pass on every frame)
+        """
         self.initialized = False
         self.available = False
         self.consumer_ir = None
+        self.receiver = receiver
+        self.normalize = normalize
+        self.emitter = emitter
+        self.transmitter = None
         self.listening = False
         self.listen_thread = None
+        self.listen_callback = None
+        self._listen_stop = threading.Event()
+        self.signal_buffer = RingBuffer(buffer_size, overflow)
+        self.repeat_window = repeat_window
+        self.collapser = None
         self.storage_service = StorageService()
         
     def initialize(self):
@@ -37,6 +83,9 @@ class InfraredService:
             else:
                 self._initialize_generic_ir()
                 
+            if self.emitter is not None:
+                self.transmitter = IRTransmitter(self.emitter)
+                
             self.initialized = True
             
         except Exception as e:
@@ -60,6 +109,8 @@ class InfraredService:
             if has_ir_feature:
                 # Get IR service
                 self.consumer_ir = mActivity.getSystemService(Context.CONSUMER_IR_SERVICE)
+                if self.emitter is None:
+                    self.emitter = AndroidEmitter(self.consumer_ir)
                 self.available = True
             else:
                 self.available = False
@@ -69,9 +120,17 @@ class InfraredService:
             self.available = False
             
     def _initialize_generic_ir(self):
-        """Initialize infrared on non-Android platforms (simulation)."""
-        # For non-Android platforms, we'll simulate IR functionality
+        """Initialize infrared on non-Android platforms."""
+        # Receive from a LIRC device (or a stand-in file or pipe) if present
+        if self.receiver is None:
+            source = os.environ.get(IR_SOURCE_ENV, LIRC_DEVICE)
+            if os.path.exists(source):
+                self.receiver = IRReceiver(source)
+                
+        # Transmission is still simulated on non-Android platforms
         self.consumer_ir = "Simulated IR"
+        if self.emitter is None:
+            self.emitter = FakeEmitter(log=True)
         self.available = True
         
     def is_initialized(self):
@@ -92,12 +151,17 @@ class InfraredService:
         """
         return self.available
         
-    def start_listening(self, callback):
+    def start_listening(self, callback=None):
         """
         Start listening for infrared signals.
         
+        Detected signals are added to the signal buffer for consumers
+        calling drain_signals(), and passed to the callback if one is given.
+        A held button yields one signal per key press, with the number of
+        repeat frames in ir_repeat and the length of the press in duration.
+        
         Args:
-            callback: Function to call when a signal is detected
+            callback: Optional function to call when a signal is detected
             
         Returns:
             Boolean indicating if listening started successfully
@@ -107,9 +171,22 @@ class InfraredService:
             
         self.listening = True
         self.listen_callback = callback
+        self.signal_buffer.clear()
+        
+        # Each session has its own stop event and repeat collapser, so a
+        # thread of a stopped session that ends late cannot end a newer one
+        # or mix its frames into it
+        stop_event = threading.Event()
+        self._listen_stop = stop_event
+        self.collapser = None
+        if self.repeat_window:
+            self.collapser = RepeatCollapser(
+                lambda signal_info: self._deliver_signal(signal_info, stop_event),
+                self.repeat_window)
         
         # Start listening thread
-        self.listen_thread = threading.Thread(target=self._listen_process)
+        self.listen_thread = threading.Thread(target=self._listen_process,
+                                              args=(stop_event, self.collapser))
         self.listen_thread.daemon = True
         self.listen_thread.start()
         
@@ -126,32 +203,215 @@ class InfraredService:
             return False
             
         self.listening = False
+        self._listen_stop.set()
         return True
         
-    def _listen_process(self):
-        """Background process for infrared listening."""
-        try:
-            # In a real implementation, this would connect to the IR receiver
-            # and wait for signals. Here we'll simulate random signal detection.
+    def _listen_process(self, stop_event, collapser):
+        """
+        Background process for infrared listening.
+        
+        Args:
+            stop_event: threading.Event of the listening session
+            collapser: RepeatCollapser of the session, or None
+        """
+        if self.receiver is not None:
+            self._receive_process(stop_event, collapser)
+            return
             
-            while self.listening:
+        try:
+            # Without a receiver, simulate random signal detection
+            while not stop_event.is_set():
                 # Simulate random signal detection (every 2-5 seconds)
-                time.sleep(random.uniform(2, 5))
-                
-                if not self.listening:
+                if stop_event.wait(random.uniform(2, 5)):
                     break
                     
-                # Generate simulated signal
+                # Generate simulated signal; each is a complete key press
                 signal = self._generate_simulated_signal()
                 
-                # Call the callback with the detected signal
-                if self.listen_callback:
-                    self.listen_callback(signal)
+                self._capture_signal(signal, stop_event, collapser)
+                if collapser:
+                    collapser.flush()
                     
         except Exception as e:
             print(f"IR listening error: {str(e)}")
+            self._end_session(stop_event)
+            
+    def _receive_process(self, stop_event, collapser):
+        """
+        Background process passing received frames to the callback.
+        
+        Args:
+            stop_event: threading.Event of the listening session
+            collapser: RepeatCollapser of the session, or None
+        """
+        if collapser:
+            flush_thread = threading.Thread(target=self._flush_process,
+                                            args=(stop_event, collapser))
+            flush_thread.daemon = True
+            flush_thread.start()
+            
+        try:
+            for frame in self.receiver.iter_frames(stop_event):
+                self._capture_signal(self._make_signal_info(frame), stop_event, collapser)
+                    
+        except Exception as e:
+            print(f"IR receiving error: {str(e)}")
+            
+        self._end_session(stop_event)
+        if collapser:
+            collapser.flush()
+            
+    def _end_session(self, stop_event):
+        """
+        End a listening session whose thread stopped on its own.
+        
+        Args:
+            stop_event: threading.Event of the session
+        """
+        stop_event.set()
+        if stop_event is self._listen_stop:
             self.listening = False
             
+    def _flush_process(self, stop_event, collapser):
+        """
+        Background process passing on key presses once they have ended.
+        
+        Args:
+            stop_event: threading.Event of the listening session
+            collapser: RepeatCollapser of the session
+        """
+        while not stop_event.wait(collapser.window / 2):
+            collapser.flush_expired()
+            
+    def _capture_signal(self, signal_info, stop_event, collapser=None):
+        """
+        Pass a captured frame on, merging the repeats of held buttons.
+        
+        Args:
+            signal_info: Dictionary containing signal data
+            stop_event: threading.Event of the listening session
+            collapser: RepeatCollapser of the session, or None
+        """
+        if collapser:
+            collapser.add(signal_info)
+        else:
+            self._deliver_signal(signal_info, stop_event)
+            
+    def _deliver_signal(self, signal_info, stop_event):
+        """
+        Pass a detected signal to the signal buffer and the callback.
+        
+        Args:
+            signal_info: Dictionary containing signal data
+            stop_event: threading.Event of the listening session that
+                captured the signal
+        """
+        # A blocked listener waits in bounded steps and gives up on the
+        # signal once its own session stops
+        while not self.signal_buffer.put(signal_info, BUFFER_POLL_INTERVAL):
+            if (self.signal_buffer.policy != OVERFLOW_BLOCK or
+                    stop_event.is_set()):
+                break
+                
+        if self.listen_callback:
+            self.listen_callback(signal_info)
+            
+    def drain_signals(self, max_signals=None):
+        """
+        Take the detected signals waiting in the signal buffer.
+        
+        Args:
+            max_signals: Most signals taken (None for all)
+            
+        Returns:
+            List of signal dictionaries, oldest first
+        """
+        return self.signal_buffer.drain(max_signals)
+        
+    def get_buffer_stats(self):
+        """
+        Get the signal buffer counters.
+        
+        Returns:
+            Dictionary of counters (see RingBuffer.get_stats())
+        """
+        return self.signal_buffer.get_stats()
+        
+    def _make_signal_info(self, frame):
+        """
+        Build the signal dictionary for a received frame.
+        
+        Args:
+            frame: Frame produced by IRReceiver
+            
+        Returns:
+            Dictionary containing signal data
+        """
+        signal_info = {
+            'type': 'infrared',
+            'timestamp': frame['timestamp'],
+            'frequency': frame['frequency'],
+            'duration': sum(frame['pattern']) / 1000,  # Convert to milliseconds
+            'pattern': frame['pattern'],
+            'name': "IR Signal",
+            'remote_type': 'Unknown'
+        }
+        
+        if self.decode_signal(signal_info):
+            signal_info['name'] = f"{signal_info['ir_protocol']} Signal"
+        self.normalize_signal(signal_info)
+        return signal_info
+        
+    def normalize_signal(self, signal_info):
+        """
+        Normalize the pattern of a captured signal if enabled.
+        
+        Args:
+            signal_info: Dictionary containing signal information
+            
+        Returns:
+            The signal dictionary
+        """
+        if not self.normalize or not signal_info.get('pattern'):
+            return signal_info
+            
+        try:
+            pattern = normalize_pattern(signal_info['pattern'], signal_info.get('frequency'))
+            signal_info['pattern'] = pattern
+            signal_info['duration'] = sum(pattern) / 1000  # Convert to milliseconds
+            
+        except Exception as e:
+            print(f"Error normalizing infrared signal: {str(e)}")
+            
+        return signal_info
+        
+    def decode_signal(self, signal_info):
+        """
+        Decode the protocol of a signal.
+        
+        Sets the ir_protocol, ir_address, ir_command, ir_repeat and
+        ir_toggle entries of the signal if the pattern is recognized.
+        
+        Args:
+            signal_info: Dictionary containing signal information
+            
+        Returns:
+            Dictionary with the decoded protocol, address, command, repeat
+            and toggle, or None if the pattern is not recognized
+        """
+        try:
+            decoded = ir_decoder.decode(signal_info.get('pattern'))
+            if decoded is None:
+                return None
+                
+            for key, value in decoded.items():
+                signal_info[f"ir_{key}"] = value
+            return decoded
+            
+        except Exception as e:
+            print(f"Error decoding infrared signal: {str(e)}")
+            return None
+            
     def _generate_simulated_signal(self):
         """
         Generate a simulated infrared signal.
@@ -159,36 +419,33 @@ class InfraredService:
         Returns:
             Dictionary containing simulated signal data
         """
-        # Common IR remote frequencies
-        frequencies = [36000, 38000, 40000, 56000]
-        
-        # Generate pattern (pairs of on/off times in microseconds)
-        pattern_length = random.randint(10, 30)
-        pattern = []
-        for _ in range(pattern_length):
-            # On time (typically shorter)
-            pattern.append(random.randint(500, 2000))
-            # Off time (typically longer)
-            pattern.append(random.randint(1000, 5000))
-            
-        # Generate signal data
-        frequency = random.choice(frequencies)
-        duration = sum(pattern) / 1000  # Convert to milliseconds
+        # Common remote types and the protocols they use
+        remote_types = {
+            "TV": ('Samsung32', 0x07),
+            "DVD": ('NEC', 0x04),
+            "AC": ('NECext', 0x10E7),
+            "Stereo": ('RC5', 0x14),
+            "Projector": ('SIRC', 0x01)
+        }
+        remote_type = random.choice(list(remote_types))
+        protocol, address = remote_types[remote_type]
         
-        # Common remote types
-        remote_types = ["TV", "DVD", "AC", "Stereo", "Projector"]
-        remote_type = random.choice(remote_types)
+        # Encode a random button, with receiver timing jitter
+        waveform = ir_encoder.encode(protocol, address, random.randint(0, 63))
+        pattern = [duration + random.randint(-60, 60) for duration in waveform['pattern']]
         
         # Create signal object
-        return {
+        signal_info = {
             'type': 'infrared',
             'timestamp': time.time(),
-            'frequency': frequency,
-            'duration': duration,
+            'frequency': waveform['frequency'],
+            'duration': sum(pattern) / 1000,  # Convert to milliseconds
             'pattern': pattern,
             'name': f"{remote_type} Remote Signal",
             'remote_type': remote_type
         }
+        self.decode_signal(signal_info)
+        return self.normalize_signal(signal_info)
         
     def record_signal(self, signal_info):
         """
@@ -201,6 +458,9 @@ class InfraredService:
             Boolean indicating success or failure
         """
         try:
+            if 'ir_protocol' not in signal_info:
+                self.decode_signal(signal_info)
+                
             # Create a signal model
             signal_data = {
                 'protocol': 'infrared',
@@ -209,7 +469,8 @@ class InfraredService:
                 'metadata': {
                     'record_time': time.time(),
                     'platform': platform,
-                    'remote_type': signal_info.get('remote_type', 'Unknown')
+                    'remote_type': signal_info.get('remote_type', 'Unknown'),
+                    'toggle': signal_info.get('ir_toggle')
                 }
             }
             
@@ -219,7 +480,11 @@ class InfraredService:
                 name=signal_info.get('name', 'IR Signal'),
                 frequency=signal_info.get('frequency', 0),
                 duration=signal_info.get('duration', 0),
-                pattern=signal_info.get('pattern', [])
+                pattern=signal_info.get('pattern', []),
+                ir_protocol=signal_info.get('ir_protocol'),
+                ir_address=signal_info.get('ir_address'),
+                ir_command=signal_info.get('ir_command'),
+                ir_repeat=signal_info.get('ir_repeat')
             )
             
             # Save to storage
@@ -229,45 +494,127 @@ class InfraredService:
             print(f"Error recording infrared signal: {str(e)}")
             return False
             
-    def transmit_signal(self, signal_data):
+    def transmit_code(self, protocol, address, command, repeat=0, callback=None):
+        """
+        Queue a code without a recorded pattern for transmission.
+        
+        Args:
+            protocol: Protocol name (e.g. 'NEC', 'RC5', 'SIRC')
+            address: Device address
+            command: Command code
+            repeat: Number of repeat frames, as when the button is held
+            callback: Optional function called with the timing report
+                (called on the transmit thread)
+            
+        Returns:
+            Future resolving to the timing report (see IRTransmitter), or
+            None if the code cannot be transmitted
+        """
+        return self.transmit_signal({
+            'ir_protocol': protocol,
+            'ir_address': address,
+            'ir_command': command,
+            'ir_repeat': repeat
+        }, callback)
+        
+    def transmit_signal(self, signal_data, callback=None):
         """
-        Transmit an infrared signal.
+        Queue an infrared signal for transmission.
+        
+        The signal is sent from the transmit queue; the caller does not wait
+        for it unless it waits on the returned future.
         
         Args:
             signal_data: Dictionary containing signal data
+            callback: Optional function called with the timing report
+                (called on the transmit thread)
             
         Returns:
-            Boolean indicating success or failure
+            Future resolving to the timing report (see IRTransmitter), or
+            None if the signal cannot be transmitted
         """
-        if not self.available:
-            return False
+        return self.transmit_macro([{'signal': signal_data}], callback)
+        
+    def transmit_macro(self, steps, callback=None):
+        """
+        Queue a sequence of infrared signals for transmission.
+        
+        Args:
+            steps: List of step dictionaries with the 'signal' to send and
+                optional 'repeat' (times sent), 'interval' (space between
+                repeats in microseconds) and 'delay' (microseconds to wait
+                before the next step), e.g. power, wait for the device to
+                start, then input and volume steps
+            callback: Optional function called with the timing report
+                (called on the transmit thread)
+            
+        Returns:
+            Future resolving to the timing report (see IRTransmitter), or
+            None if the signals cannot be transmitted
+        """
+        if not self.available or self.transmitter is None:
+            return None
             
         try:
-            frequency = signal_data.get('frequency', 0)
-            pattern = signal_data.get('pattern', [])
-            
-            if not frequency or not pattern:
-                # Try to get pattern from the data field
-                data = signal_data.get('data', {})
-                if isinstance(data, dict):
-                    frequency = data.get('frequency', frequency)
-                    pattern = data.get('pattern', pattern)
-            
-            if platform == 'android' and self.consumer_ir:
-                # Transmit on Android
-                if self.consumer_ir.hasIrEmitter():
-                    # Convert pattern to int array if it's not already
-                    if pattern and isinstance(pattern, list):
-                        # Ensure the pattern is a list of integers
-                        pattern = [int(p) for p in pattern]
-                        self.consumer_ir.transmit(frequency, pattern)
-                        return True
-                return False
-            else:
-                # Simulate transmission on other platforms
-                print(f"Simulating IR transmission: Frequency={frequency}Hz, Pattern={pattern}")
-                return True
+            macro = []
+            for step in steps:
+                frequency, pattern = self._get_waveform(step['signal'])
+                if not pattern:
+                    raise ValueError(f"No pattern to transmit for {step['signal'].get('name', 'signal')}")
+                macro.append(dict(step, frequency=frequency, pattern=pattern))
                 
+            return self.transmitter.submit(macro, callback)
+            
         except Exception as e:
             print(f"Error transmitting infrared signal: {str(e)}")
-            return False
+            return None
+            
+    def get_pronto_code(self, signal_data):
+        """
+        Get the Pronto hex code of a signal, e.g. for sharing.
+        
+        Args:
+            signal_data: Dictionary containing signal data
+            
+        Returns:
+            Pronto hex string, or None if the signal has no waveform
+        """
+        try:
+            frequency, pattern = self._get_waveform(signal_data)
+            return pattern_to_pronto(frequency, pattern) if pattern else None
+            
+        except Exception as e:
+            print(f"Error converting infrared signal: {str(e)}")
+            return None
+            
+    def _get_waveform(self, signal_data):
+        """
+        Get the waveform to send for a signal.
+        
+        Args:
+            signal_data: Dictionary containing signal data
+            
+        Returns:
+            Tuple of (frequency, pattern)
+        """
+        frequency = signal_data.get('frequency', 0)
+        pattern = signal_data.get('pattern', [])
+        
+        if not frequency or not pattern:
+            # Try to get pattern from the data field
+            data = signal_data.get('data', {})
+            if isinstance(data, dict):
+                frequency = data.get('frequency', frequency)
+                pattern = data.get('pattern', pattern)
+                
+        if not pattern and signal_data.get('ir_command') is not None:
+            # Synthesize the waveform from the decoded code
+            waveform = ir_encoder.encode(signal_data['ir_protocol'],
+                                         signal_data.get('ir_address'),
+                                         signal_data['ir_command'],
+                                         signal_data.get('ir_repeat') or 0,
+                                         signal_data.get('ir_toggle') or 0)
+            frequency = waveform['frequency']
+            pattern = waveform['pattern']
+            
+        return frequency, pattern
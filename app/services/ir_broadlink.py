@@ -0,0 +1,156 @@
+"""
+Broadlink codec for Signal Catcher app.
+Converts between Broadlink IR packets (base64, as used by the Broadlink
+apps and Home Assistant) and raw patterns.
+
+A packet is a type byte (0x26 for IR), a repeat count, the little-endian
+length of the timing data and the timing data itself: each duration in
+ticks of 269/8192 ms, as one byte, or as a zero byte followed by two
+big-endian bytes when longer than 255 ticks. Packets are zero-padded to a
+multiple of 16 bytes. The carrier frequency is not carried.
+"""
+import base64
+
+# Packet type of infrared codes (0xB2 and 0xD7 are radio codes)
+PACKET_IR = 0x26
+
+# Length of one tick in microseconds
+TICK = 269 / 8192 * 1000
+
+# Gap Broadlink ends codes with, in ticks (about 110 ms)
+END_GAP_TICKS = 0x0D05
+
+# Carrier assumed for Broadlink codes (Hz)
+BROADLINK_FREQUENCY = 38000
+
+# Packets are padded to a multiple of this many bytes
+PACKET_ALIGN = 16
+
+# Longest duration a packet can hold, in ticks
+MAX_TICKS = 0xFFFF
+
+
+def pattern_to_broadlink(pattern, repeat=0):
+    """
+    Convert a raw pattern to a Broadlink packet.
+
+    Args:
+        pattern: Alternating mark/space durations in microseconds
+        repeat: Number of times the device sends the code again
+
+    Returns:
+        Base64 string of the packet
+    """
+    durations = [int(duration) for duration in pattern or ()]
+    if not durations:
+        raise ValueError("No pattern to convert")
+    if not 0 <= repeat <= 0xFF:
+        raise ValueError(f"Repeat count {repeat} does not fit a Broadlink packet")
+
+    data = bytearray()
+    for duration in durations:
+        ticks = min(max(int(round(duration / TICK)), 1), MAX_TICKS)
+        if ticks < 0x100:
+            data.append(ticks)
+        else:
+            data += bytes((0, ticks >> 8, ticks & 0xFF))
+
+    # A pattern ending with a mark gets Broadlink's usual closing gap
+    if len(durations) % 2:
+        data += bytes((0, END_GAP_TICKS >> 8, END_GAP_TICKS & 0xFF))
+
+    packet = bytearray((PACKET_IR, repeat)) + len(data).to_bytes(2, 'little') + data
+    packet += bytes(-len(packet) % PACKET_ALIGN)
+    return base64.b64encode(bytes(packet)).decode('ascii')
+
+
+def broadlink_to_pattern(code):
+    """
+    Convert a Broadlink packet to a raw pattern.
+
+    Args:
+        code: Base64 string of the packet
+
+    Returns:
+        Dictionary with the assumed carrier 'frequency' in Hz, the 'pattern'
+        of alternating mark/space durations in microseconds (without the
+        closing gap), the 'gap' that ends it and the 'repeat' count
+    """
+    try:
+        packet = base64.b64decode(code.strip(), validate=True)
+    except ValueError:
+        raise ValueError("Broadlink code is not valid base64")
+
+    if len(packet) < 4:
+        raise ValueError("Broadlink packet is too short")
+    if packet[0] != PACKET_IR:
+        raise ValueError(f"Broadlink packet type {packet[0]:02X} is not infrared")
+
+    length = int.from_bytes(packet[2:4], 'little')
+    data = packet[4:4 + length]
+    if len(data) != length:
+        raise ValueError("Broadlink packet is truncated")
+
+    durations = []
+    index = 0
+    while index < length:
+        ticks = data[index]
+        index += 1
+        if ticks == 0:
+            if index + 2 > length:
+                break  # Padding inside the declared length
+            ticks = data[index] << 8 | data[index + 1]
+            index += 2
+        durations.append(int(round(ticks * TICK)))
+
+    gap = 0
+    if len(durations) % 2 == 0 and durations:
+        gap = durations.pop()
+
+    return {
+        'frequency': BROADLINK_FREQUENCY,
+        'pattern': durations,
+        'gap': gap,
+        'repeat': packet[1]
+    }
+
+
+def broadlink_to_patterns(codes):
+    """
+    Convert a batch of Broadlink packets.
+
+    Args:
+        codes: List of base64 strings
+
+    Returns:
+        List of pattern dictionaries (see broadlink_to_pattern()), with
+        None for codes that cannot be converted
+    """
+    results = []
+    for code in codes:
+        try:
+            results.append(broadlink_to_pattern(code))
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def patterns_to_broadlink(patterns):
+    """
+    Convert a batch of raw patterns to Broadlink packets.
+
+    Args:
+        patterns: List of patterns (alternating mark/space durations in
+            microseconds)
+
+    Returns:
+        List of base64 strings, with None for patterns that cannot be
+        converted
+    """
+    results = []
+    for pattern in patterns:
+        try:
+            results.append(pattern_to_broadlink(pattern))
+        except ValueError:
+            results.append(None)
+    return results
@@ -0,0 +1,177 @@
+"""
+Infrared repeat collapsing for Signal Catcher app.
+Merges the frames sent while a remote button is held into one signal per key press.
+
+A held button sends its frame followed either by short repeat codes (NEC)
+or by the same frame again (most other protocols). Frames arriving within
+the repeat window of the previous frame of the same press are counted into
+that press instead of being passed on, and the press is emitted once it
+has ended.
+"""
+import threading
+import time
+
+from app.services.ir_decoder import PROTOCOLS
+from app.services.ir_similarity import compare
+
+# Longest time between the starts of two frames of one key press (seconds).
+# Held buttons resend every 45 ms (SIRC) to 114 ms (RC5); releasing and
+# pressing again takes longer.
+DEFAULT_REPEAT_WINDOW = 0.2
+
+
+class RepeatCollapser:
+    """
+    Collapser sitting between signal capture and its consumers.
+
+    Frames are added as they are captured and a single signal per key
+    press, carrying the number of repeats in ir_repeat and the duration of
+    the whole press, is handed to the sink.
+    """
+    def __init__(self, sink, window=DEFAULT_REPEAT_WINDOW):
+        """
+        Initialize the repeat collapser.
+
+        Args:
+            sink: Function called with each collapsed signal
+            window: Longest time between frames of one key press in seconds
+        """
+        self.sink = sink
+        self.window = window
+        self.frames_received = 0
+        self.signals_emitted = 0
+        self._press = None
+        self._lock = threading.Lock()
+
+    def add(self, signal_info):
+        """
+        Add a captured frame.
+
+        Args:
+            signal_info: Dictionary containing signal data, with the
+                start of the frame as 'timestamp' in seconds
+        """
+        timestamp = signal_info.get('timestamp') or time.time()
+        ready = None
+
+        with self._lock:
+            self.frames_received += 1
+            press = self._press
+
+            if press and self._continues(press, signal_info, timestamp):
+                press['repeats'] += 1
+                press['frame_durations'] += signal_info.get('duration') or 0
+                if timestamp >= press['last_seen']:
+                    press['last_seen'] = timestamp
+                    press['last_duration'] = signal_info.get('duration') or 0
+            else:
+                ready = press
+                self._press = {
+                    'signal': signal_info,
+                    'repeats': 0,
+                    'frame_durations': signal_info.get('duration') or 0,
+                    'first_seen': timestamp,
+                    'last_seen': timestamp,
+                    'last_duration': signal_info.get('duration') or 0
+                }
+
+        self._emit(ready)
+
+    def flush_expired(self, now=None):
+        """
+        Emit the pending key press if no frame has continued it within the window.
+
+        Args:
+            now: Current time in seconds (defaults to time.time())
+        """
+        now = now or time.time()
+        with self._lock:
+            press = self._press
+            if press and now - press['last_seen'] > self.window:
+                self._press = None
+            else:
+                press = None
+
+        self._emit(press)
+
+    def flush(self):
+        """Emit the pending key press, e.g. when capture stops."""
+        with self._lock:
+            press = self._press
+            self._press = None
+
+        self._emit(press)
+
+    def _continues(self, press, signal_info, timestamp):
+        """
+        Check whether a frame is a repeat of the pending key press.
+
+        Args:
+            press: Pending key press entry
+            signal_info: Dictionary containing signal data of the frame
+            timestamp: Start time of the frame in seconds
+
+        Returns:
+            Boolean indicating if the frame belongs to the key press
+        """
+        if timestamp - press['last_seen'] > self.window:
+            return False
+
+        first = press['signal']
+        protocol = signal_info.get('ir_protocol')
+
+        # Repeat codes carry no command; they continue any frame of a
+        # protocol using them, and a run of repeats whose frame was missed
+        if protocol and signal_info.get('ir_command') is None:
+            return protocol in (first.get('ir_protocol'), _repeat_code(first.get('ir_protocol')))
+
+        # Decoded frames must carry the same code; a toggle bit flips
+        # between key presses
+        if protocol or first.get('ir_protocol'):
+            return all(signal_info.get(key) == first.get(key) for key in
+                       ('ir_protocol', 'ir_address', 'ir_command', 'ir_toggle'))
+
+        result = compare(signal_info.get('pattern'), first.get('pattern'))
+        return result is not None and result[0] == 0
+
+    def _emit(self, press):
+        """
+        Pass a completed key press to the sink.
+
+        Args:
+            press: Key press entry, or None
+        """
+        if press is None:
+            return
+
+        signal_info = dict(press['signal'])
+        if press['repeats']:
+            signal_info['ir_repeat'] = (signal_info.get('ir_repeat') or 0) + press['repeats']
+
+            # From the start of the first frame to the end of the last;
+            # start times may be unreliable (e.g. frames from other
+            # sources), in which case the frames alone are counted
+            elapsed = (press['last_seen'] - press['first_seen']) * 1000 + press['last_duration']
+            signal_info['duration'] = max(elapsed, press['frame_durations'])
+
+        try:
+            self.sink(signal_info)
+            self.signals_emitted += 1
+        except Exception as e:
+            print(f"Error emitting infrared signal: {str(e)}")
+
+
+def _repeat_code(protocol_name):
+    """
+    Get the repeat code a protocol sends while its button is held.
+
+    Args:
+        protocol_name: Protocol name
+
+    Returns:
+        Name of the repeat code protocol, or None
+    """
+    for protocol in PROTOCOLS:
+        if protocol['name'] == protocol_name and not protocol.get('repeat'):
+            return protocol.get('repeat_code')
+    return None
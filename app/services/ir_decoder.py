@@ -0,0 +1,449 @@
+"""
+Infrared protocol decoding for Signal Catcher app.
+Recognizes common remote control protocols in raw pulse/space timings.
+
+Protocols are described by table entries rather than code, so a new
+protocol is usually a new entry in PROTOCOLS (or a register_protocol()
+call). Protocol names follow the Flipper Zero naming.
+"""
+
+# Relative timing error accepted on each edge, and the smallest absolute
+# error accepted (receivers lengthen pulses by up to ~100 us)
+DEFAULT_TOLERANCE = 0.3
+MIN_TOLERANCE = 150
+
+# Bit encodings
+ENCODING_PULSE = 'pulse'    # each bit is a (mark, space) pair of given lengths
+ENCODING_BIPHASE = 'biphase'    # Manchester coding on a fixed unit
+
+# Protocol table entries:
+#   name        protocol name
+#   frequency   carrier frequency in Hz
+#   encoding    ENCODING_PULSE or ENCODING_BIPHASE
+#   header      (mark, space) before the bits, or None
+#   one, zero   pulse: (mark, space) of a bit; biphase: (first, second) half levels
+#   unit        biphase: half-bit length in microseconds
+#   wide_bits   biphase: indexes of bits twice as long as the others
+#   trailer     pulse: stop mark after the last bit, or None (the last
+#               bit's space then merges into the inter-frame gap)
+#   msb_first   whether field values are sent most significant bit first
+#   layout      fields in transmit order as (field, shift, width, inverted);
+#               bits go to field bits shift..shift+width-1 and must agree
+#               with bits of the same field sent earlier. A field of None is
+#               a constant whose value is given in place of the shift.
+#   period      time from the start of one frame to the start of the next
+#               when a button is held, in microseconds
+#   repeat      whether the frame is a repeat code without address or command
+#   repeat_code name of the repeat code entry sent while the button is held,
+#               or None if the whole frame is sent again
+PROTOCOLS = [
+    {
+        'name': 'NEC',
+        'frequency': 38000,
+        'period': 108000,
+        'encoding': ENCODING_PULSE,
+        'header': (9000, 4500),
+        'one': (560, 1690),
+        'zero': (560, 560),
+        'trailer': 560,
+        'msb_first': False,
+        'layout': (('address', 0, 8, False), ('address', 0, 8, True),
+                   ('command', 0, 8, False), ('command', 0, 8, True)),
+        'repeat_code': 'NEC'
+    },
+    {
+        'name': 'NECext',
+        'frequency': 38000,
+        'period': 108000,
+        'encoding': ENCODING_PULSE,
+        'header': (9000, 4500),
+        'one': (560, 1690),
+        'zero': (560, 560),
+        'trailer': 560,
+        'msb_first': False,
+        'layout': (('address', 0, 16, False), ('command', 0, 16, False)),
+        'repeat_code': 'NEC'
+    },
+    {
+        'name': 'NEC',
+        'frequency': 38000,
+        'period': 108000,
+        'encoding': ENCODING_PULSE,
+        'header': (9000, 2250),
+        'one': (560, 1690),
+        'zero': (560, 560),
+        'trailer': 560,
+        'msb_first': False,
+        'layout': (),
+        'repeat': True
+    },
+    {
+        'name': 'Samsung32',
+        'frequency': 38000,
+        'period': 108000,
+        'encoding': ENCODING_PULSE,
+        'header': (4500, 4500),
+        'one': (560, 1690),
+        'zero': (560, 560),
+        'trailer': 560,
+        'msb_first': False,
+        'layout': (('address', 0, 8, False), ('address', 0, 8, False),
+                   ('command', 0, 8, False), ('command', 0, 8, True))
+    },
+    {
+        'name': 'SIRC',
+        'frequency': 40000,
+        'period': 45000,
+        'encoding': ENCODING_PULSE,
+        'header': (2400, 600),
+        'one': (1200, 600),
+        'zero': (600, 600),
+        'trailer': None,
+        'msb_first': False,
+        'layout': (('command', 0, 7, False), ('address', 0, 5, False))
+    },
+    {
+        'name': 'SIRC15',
+        'frequency': 40000,
+        'period': 45000,
+        'encoding': ENCODING_PULSE,
+        'header': (2400, 600),
+        'one': (1200, 600),
+        'zero': (600, 600),
+        'trailer': None,
+        'msb_first': False,
+        'layout': (('command', 0, 7, False), ('address', 0, 8, False))
+    },
+    {
+        'name': 'SIRC20',
+        'frequency': 40000,
+        'period': 45000,
+        'encoding': ENCODING_PULSE,
+        'header': (2400, 600),
+        'one': (1200, 600),
+        'zero': (600, 600),
+        'trailer': None,
+        'msb_first': False,
+        'layout': (('command', 0, 7, False), ('address', 0, 5, False),
+                   ('address', 5, 8, False))
+    },
+    {
+        'name': 'RC5',
+        'frequency': 36000,
+        'period': 113778,
+        'encoding': ENCODING_BIPHASE,
+        'header': None,
+        'unit': 889,
+        'one': (0, 1),
+        'zero': (1, 0),
+        'msb_first': True,
+        'layout': ((None, 1, 1, False), (None, 1, 1, False), ('toggle', 0, 1, False),
+                   ('address', 0, 5, False), ('command', 0, 6, False))
+    },
+    {
+        'name': 'RC5X',
+        'frequency': 36000,
+        'period': 113778,
+        'encoding': ENCODING_BIPHASE,
+        'header': None,
+        'unit': 889,
+        'one': (0, 1),
+        'zero': (1, 0),
+        'msb_first': True,
+        # The second start bit is the inverted bit 6 of a 7-bit command;
+        # commands below 64 leave it set and are sent as plain RC5
+        'layout': ((None, 1, 1, False), ('command', 6, 1, True), ('toggle', 0, 1, False),
+                   ('address', 0, 5, False), ('command', 0, 6, False))
+    },
+    {
+        'name': 'RC6',
+        'frequency': 36000,
+        'period': 106667,
+        'encoding': ENCODING_BIPHASE,
+        'header': (2664, 888),
+        'unit': 444,
+        'one': (1, 0),
+        'zero': (0, 1),
+        'wide_bits': (4,),
+        'msb_first': True,
+        'layout': ((None, 1, 1, False), (None, 0, 3, False), ('toggle', 0, 1, False),
+                   ('address', 0, 8, False), ('command', 0, 8, False))
+    }
+]
+
+
+def register_protocol(protocol, first=False):
+    """
+    Add a protocol to the decoding table.
+
+    Args:
+        protocol: Protocol table entry (see PROTOCOLS)
+        first: Whether to try the protocol before the built-in ones
+
+    Returns:
+        The protocol entry
+    """
+    for key in ('name', 'encoding', 'layout'):
+        if key not in protocol:
+            raise ValueError(f"Protocol entry is missing {key}")
+    if protocol['encoding'] not in (ENCODING_PULSE, ENCODING_BIPHASE):
+        raise ValueError(f"Unknown encoding {protocol['encoding']}")
+
+    if first:
+        PROTOCOLS.insert(0, protocol)
+    else:
+        PROTOCOLS.append(protocol)
+    return protocol
+
+
+def decode(pattern, tolerance=DEFAULT_TOLERANCE, protocols=None):
+    """
+    Decode a raw frame.
+
+    Args:
+        pattern: Alternating mark/space durations in microseconds,
+            starting with a mark
+        tolerance: Relative timing error accepted on each edge
+        protocols: Protocol table entries to try, in order (default PROTOCOLS)
+
+    Returns:
+        Dictionary with protocol, address, command, repeat (number of repeat
+        frames, i.e. 1 for a repeat code and 0 otherwise) and toggle, or None
+        if no protocol matches
+    """
+    if not pattern:
+        return None
+
+    pattern = [int(duration) for duration in pattern]
+
+    for protocol in protocols or PROTOCOLS:
+        if protocol['encoding'] == ENCODING_PULSE:
+            bits = _pulse_bits(pattern, protocol, tolerance)
+        else:
+            bits = _biphase_bits(pattern, protocol, tolerance)
+        if bits is None:
+            continue
+
+        fields = _unpack(bits, protocol)
+        if fields is None:
+            continue
+
+        return {
+            'protocol': protocol['name'],
+            'address': fields.get('address'),
+            'command': fields.get('command'),
+            'repeat': 1 if protocol.get('repeat') else 0,
+            'toggle': fields.get('toggle')
+        }
+
+    return None
+
+
+def _matches(duration, expected, tolerance):
+    """
+    Check a measured duration against the expected one.
+
+    Args:
+        duration: Measured duration in microseconds
+        expected: Expected duration in microseconds
+        tolerance: Relative timing error accepted
+
+    Returns:
+        Boolean indicating if the duration matches
+    """
+    return abs(duration - expected) <= max(expected * tolerance, MIN_TOLERANCE)
+
+
+def _layout_width(protocol):
+    """
+    Count the bits of a protocol frame.
+
+    Args:
+        protocol: Protocol table entry
+
+    Returns:
+        Number of bits
+    """
+    return sum(width for _, _, width, _ in protocol['layout'])
+
+
+def _pulse_bits(pattern, protocol, tolerance):
+    """
+    Read the bits of a pulse-coded frame.
+
+    Args:
+        pattern: Mark/space durations
+        protocol: Protocol table entry
+        tolerance: Relative timing error accepted
+
+    Returns:
+        List of bits, or None if the frame does not match
+    """
+    count = _layout_width(protocol)
+    header = protocol.get('header')
+    trailer = protocol.get('trailer')
+
+    # Pulse-coded frames have a fixed number of edges
+    expected = (2 if header else 0) + 2 * count + (1 if trailer else -1)
+    if len(pattern) != expected:
+        return None
+
+    position = 0
+    if header:
+        if not (_matches(pattern[0], header[0], tolerance) and
+                _matches(pattern[1], header[1], tolerance)):
+            return None
+        position = 2
+
+    one_mark, one_space = protocol['one']
+    zero_mark, zero_space = protocol['zero']
+
+    bits = []
+    for index in range(count):
+        mark = pattern[position]
+        # Without a trailer the last space is part of the gap
+        space = pattern[position + 1] if position + 1 < len(pattern) else None
+        position += 2
+
+        if (_matches(mark, one_mark, tolerance) and
+                (space is None or _matches(space, one_space, tolerance))):
+            bits.append(1)
+        elif (_matches(mark, zero_mark, tolerance) and
+                (space is None or _matches(space, zero_space, tolerance))):
+            bits.append(0)
+        else:
+            return None
+
+    if trailer and not _matches(pattern[-1], trailer, tolerance):
+        return None
+    return bits
+
+
+def _biphase_bits(pattern, protocol, tolerance):
+    """
+    Read the bits of a Manchester-coded frame.
+
+    The frame is expanded into half-bit levels (1 for mark, 0 for space),
+    which are then read in pairs.
+
+    Args:
+        pattern: Mark/space durations
+        protocol: Protocol table entry
+        tolerance: Relative timing error accepted
+
+    Returns:
+        List of bits, or None if the frame does not match
+    """
+    unit = protocol['unit']
+    header = protocol.get('header')
+    wide_bits = protocol.get('wide_bits', ())
+
+    position = 0
+    if header:
+        if len(pattern) < 2 or not (_matches(pattern[0], header[0], tolerance) and
+                                    _matches(pattern[1], header[1], tolerance)):
+            return None
+        position = 2
+
+    # Without a header the first bit starts with a space, which is the
+    # idle time before the frame and never shows up in the pattern
+    levels = [] if header else [0]
+    for index in range(position, len(pattern)):
+        units = int(round(pattern[index] / unit))
+        if units < 1 or not _matches(pattern[index], units * unit, tolerance):
+            return None
+        levels.extend([1 - index % 2] * units)
+
+    offset = 0
+    bits = []
+    for index in range(_layout_width(protocol)):
+        width = 2 if index in wide_bits else 1
+        first = levels[offset:offset + width]
+        second = levels[offset + width:offset + 2 * width]
+        offset += 2 * width
+
+        # The last half-bit may be lost in the gap if it is a space
+        second = second + [0] * (width - len(second))
+        if len(first) != width or len(set(first)) != 1 or len(set(second)) != 1:
+            return None
+
+        halves = (first[0], second[0])
+        if halves == protocol['one']:
+            bits.append(1)
+        elif halves == protocol['zero']:
+            bits.append(0)
+        else:
+            return None
+
+    # Anything left over must be the trailing space
+    if any(levels[offset:]):
+        return None
+    return bits
+
+
+def _unpack(bits, protocol):
+    """
+    Split frame bits into fields.
+
+    Args:
+        bits: List of bits in transmit order
+        protocol: Protocol table entry
+
+    Returns:
+        Dictionary of field values, or None if a constant or a repeated
+        field does not match
+    """
+    msb_first = protocol.get('msb_first', False)
+    fields = {}
+    assigned = {}
+    position = 0
+
+    for field, shift, width, inverted in protocol['layout']:
+        chunk = bits[position:position + width]
+        position += width
+
+        value = 0
+        for bit in (chunk if msb_first else reversed(chunk)):
+            value = (value << 1) | bit
+        if inverted:
+            value ^= (1 << width) - 1
+
+        if field is None:
+            if value != shift:
+                return None
+            continue
+
+        mask = ((1 << width) - 1) << shift
+        value <<= shift
+        known = assigned.get(field, 0)
+        if fields.get(field, 0) & known & mask != value & known & mask:
+            return None
+
+        fields[field] = fields.get(field, 0) | value
+        assigned[field] = known | mask
+
+    return fields
+
+
+def format_code(signal):
+    """
+    Format the decoded code of a signal for display.
+
+    Args:
+        signal: Signal or record dictionary with ir_protocol, ir_address,
+            ir_command and ir_repeat entries
+
+    Returns:
+        String such as "NEC 0x04:0x08", or "Unknown" if not decoded
+    """
+    protocol = signal.get('ir_protocol')
+    if not protocol:
+        return "Unknown"
+
+    if signal.get('ir_command') is None:
+        return f"{protocol} repeat"
+
+    text = f"{protocol} 0x{signal.get('ir_address') or 0:02X}:0x{signal['ir_command']:02X}"
+    if signal.get('ir_repeat'):
+        text += f" (x{signal['ir_repeat'] + 1})"
+    return text
@@ -0,0 +1,196 @@
+"""
+Infrared protocol encoding for Signal Catcher app.
+Synthesizes transmit waveforms from decoded (protocol, address, command) codes.
+
+Encoding is driven by the same protocol table as decoding (see
+ir_decoder.PROTOCOLS), so every decodable protocol can also be sent.
+"""
+import functools
+
+from app.services.ir_decoder import PROTOCOLS, ENCODING_PULSE
+
+# Number of encoded waveforms kept ready to send
+ENCODE_CACHE_SIZE = 256
+
+# Shortest space between repeated frames (microseconds)
+MIN_FRAME_GAP = 5000
+
+
+def encode(protocol, address, command, repeat=0, toggle=0):
+    """
+    Encode a code into a transmit waveform.
+
+    Args:
+        protocol: Protocol name (e.g. 'NEC', 'RC5', 'SIRC')
+        address: Device address
+        command: Command code
+        repeat: Number of repeat frames sent after the first frame, as when
+            the button is held
+        toggle: Toggle bit value for protocols that have one (RC5, RC6)
+
+    Returns:
+        Dictionary with the carrier 'frequency' in Hz and the 'pattern' of
+        alternating mark/space durations in microseconds
+    """
+    frequency, pattern = _encode(protocol, int(address or 0), int(command),
+                                 int(repeat or 0), int(toggle or 0))
+    return {'frequency': frequency, 'pattern': list(pattern)}
+
+
+def cache_info():
+    """
+    Get the waveform cache statistics.
+
+    Returns:
+        functools cache info with hits, misses, maxsize and currsize
+    """
+    return _encode.cache_info()
+
+
+def clear_cache():
+    """Discard the cached waveforms, e.g. after changing the protocol table."""
+    _encode.cache_clear()
+
+
+@functools.lru_cache(maxsize=ENCODE_CACHE_SIZE)
+def _encode(name, address, command, repeat, toggle):
+    """
+    Encode a code; results are cached since a remote sends the same few
+    buttons over and over.
+
+    Args:
+        name: Protocol name
+        address: Device address
+        command: Command code
+        repeat: Number of repeat frames
+        toggle: Toggle bit value
+
+    Returns:
+        Tuple of (frequency, pattern tuple)
+    """
+    protocol = _find_protocol(name)
+    values = {'address': address, 'command': command, 'toggle': toggle}
+
+    first = _frame(protocol, _pack(protocol, values))
+
+    # Held buttons send a repeat code, or the whole frame again
+    if protocol.get('repeat_code'):
+        repeat_protocol = _find_protocol(protocol['repeat_code'], repeat=True)
+        following = _frame(repeat_protocol, [])
+    else:
+        repeat_protocol = protocol
+        following = first
+
+    pattern = list(first)
+    duration = sum(first)
+    period = protocol['period']
+    for _ in range(repeat):
+        # Space from the end of the previous frame to the start of the next
+        pattern.append(max(period - duration, MIN_FRAME_GAP))
+        pattern.extend(following)
+        duration = sum(following)
+        period = repeat_protocol['period']
+
+    return protocol['frequency'], tuple(pattern)
+
+
+def _find_protocol(name, repeat=False):
+    """
+    Find the table entry of a protocol.
+
+    Args:
+        name: Protocol name
+        repeat: Whether to find the repeat code entry instead of the frame
+
+    Returns:
+        Protocol table entry
+    """
+    for protocol in PROTOCOLS:
+        if protocol['name'] == name and bool(protocol.get('repeat')) == repeat:
+            return protocol
+    raise ValueError(f"Unknown IR protocol {name}")
+
+
+def _pack(protocol, values):
+    """
+    Lay out field values as frame bits.
+
+    Args:
+        protocol: Protocol table entry
+        values: Dictionary of field values
+
+    Returns:
+        List of bits in transmit order
+    """
+    # Reject values that do not fit the fields of the protocol
+    widths = {}
+    for field, shift, width, _ in protocol['layout']:
+        if field is not None:
+            widths[field] = max(widths.get(field, 0), shift + width)
+    for field, width in widths.items():
+        if not 0 <= values.get(field, 0) < 1 << width:
+            raise ValueError(f"{field} {values.get(field)} does not fit {protocol['name']}")
+
+    msb_first = protocol.get('msb_first', False)
+    bits = []
+    for field, shift, width, inverted in protocol['layout']:
+        mask = (1 << width) - 1
+        value = shift if field is None else (values.get(field, 0) >> shift) & mask
+        if inverted:
+            value ^= mask
+
+        chunk = [(value >> index) & 1 for index in range(width)]
+        bits.extend(reversed(chunk) if msb_first else chunk)
+
+    return bits
+
+
+def _frame(protocol, bits):
+    """
+    Build the mark/space pattern of one frame.
+
+    Args:
+        protocol: Protocol table entry
+        bits: List of bits in transmit order
+
+    Returns:
+        List of durations in microseconds, starting and ending with a mark
+    """
+    if protocol['encoding'] == ENCODING_PULSE:
+        pattern = list(protocol.get('header') or ())
+        for bit in bits:
+            pattern.extend(protocol['one'] if bit else protocol['zero'])
+
+        if protocol.get('trailer'):
+            pattern.append(protocol['trailer'])
+        else:
+            pattern.pop()  # The last space is part of the gap
+        return pattern
+
+    # Manchester coding: expand into half-bit levels, then merge runs
+    wide_bits = protocol.get('wide_bits', ())
+    levels = []
+    for index, bit in enumerate(bits):
+        width = 2 if index in wide_bits else 1
+        first, second = protocol['one'] if bit else protocol['zero']
+        levels.extend([first] * width + [second] * width)
+
+    # Leading (without a header) and trailing spaces are idle time
+    header = protocol.get('header')
+    while not header and levels and levels[0] == 0:
+        levels.pop(0)
+    while levels and levels[-1] == 0:
+        levels.pop()
+
+    pattern = list(header or ())
+
+    unit = protocol['unit']
+    previous = None
+    for level in levels:
+        if level == previous:
+            pattern[-1] += unit
+        else:
+            pattern.append(unit)
+            previous = level
+
+    return pattern
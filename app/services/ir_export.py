@@ -0,0 +1,100 @@
+"""
+Infrared code library export for Signal Catcher app.
+Writes signal records as Pronto hex lists, Flipper Zero .ir files or
+Broadlink code lists, which ir_import reads back.
+
+Usage as a batch job over the stored library:
+    python -m app.services.ir_export FILE [pronto|flipper|broadlink]
+"""
+import sys
+
+from app.services import ir_flipper
+from app.services.ir_broadlink import pattern_to_broadlink
+from app.services.ir_import import FORMAT_PRONTO, FORMAT_FLIPPER, FORMAT_BROADLINK, guess_format
+from app.services.ir_pronto import pattern_to_pronto
+
+
+def write_file(path, records, target_format='auto'):
+    """
+    Write signal records to a code library file.
+
+    Args:
+        path: Path of the file
+        records: Iterable of record dictionaries with name, frequency and
+            pattern (and optionally ir_protocol, ir_address, ir_command)
+        target_format: FORMAT_PRONTO, FORMAT_FLIPPER, FORMAT_BROADLINK or
+            'auto' (guessed from the file name as for importing)
+
+    Returns:
+        Number of records written
+    """
+    if target_format == 'auto':
+        target_format = guess_format(path)
+
+    formatters = {
+        FORMAT_PRONTO: format_pronto,
+        FORMAT_BROADLINK: format_broadlink
+    }
+    if target_format != FORMAT_FLIPPER and target_format not in formatters:
+        raise ValueError(f"Unknown code library format {target_format}")
+
+    with open(path, 'w', encoding='utf-8') as file:
+        if target_format == FORMAT_FLIPPER:
+            return ir_flipper.write_signals(file, records)
+        return write_code_lines(file, records, formatters[target_format])
+
+
+def write_code_lines(file, records, formatter):
+    """
+    Write records as "name: code" lines.
+
+    Args:
+        file: Writable text file
+        records: Iterable of record dictionaries
+        formatter: Function converting a record to its code
+
+    Returns:
+        Number of records written
+    """
+    written = 0
+    for record in records:
+        name = ' '.join(str(record.get('name') or 'Signal').split())
+        try:
+            file.write(f"{name}: {formatter(record)}\n")
+            written += 1
+        except ValueError as e:
+            print(f"Skipping {name}: {str(e)}")
+    return written
+
+
+def format_pronto(record):
+    """
+    Get the Pronto hex code of a record.
+
+    Args:
+        record: Record dictionary with frequency and pattern
+
+    Returns:
+        Pronto hex string
+    """
+    return pattern_to_pronto(record.get('frequency'), record.get('pattern'))
+
+
+def format_broadlink(record):
+    """
+    Get the Broadlink code of a record.
+
+    Args:
+        record: Record dictionary with a pattern
+
+    Returns:
+        Base64 string of the Broadlink packet
+    """
+    return pattern_to_broadlink(record.get('pattern'))
+
+
+if __name__ == '__main__':
+    from app.services.storage_service import StorageService
+
+    target_format = sys.argv[2] if len(sys.argv) > 2 else 'auto'
+    print(f"Exported {StorageService().export_file(sys.argv[1], target_format)} infrared records")
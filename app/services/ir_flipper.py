@@ -0,0 +1,198 @@
+"""
+Flipper Zero .ir file codec for Signal Catcher app.
+Reads and writes the IR signal files of the Flipper Zero.
+
+A file is a header followed by one block per signal. Parsed signals carry
+a protocol, address and command (protocol names are shared with the
+decoder table); raw signals carry a carrier frequency and the durations:
+
+    Filetype: IR signals file
+    Version: 1
+    #
+    name: Power
+    type: parsed
+    protocol: NEC
+    address: 04 00 00 00
+    command: 08 00 00 00
+    #
+    name: Input
+    type: raw
+    frequency: 38000
+    duty_cycle: 0.330000
+    data: 9024 4512 564 564 ...
+"""
+from app.services import ir_encoder
+
+FILE_TYPE = 'IR signals file'
+FILE_VERSION = 1
+
+# Duty cycle written for raw signals
+DEFAULT_DUTY_CYCLE = 0.33
+
+# Width of the address and command fields in bytes (little endian)
+FIELD_BYTES = 4
+
+
+def iter_entries(lines):
+    """
+    Read the signal blocks of a .ir file.
+
+    Args:
+        lines: Iterable of text lines
+
+    Yields:
+        Dictionaries of the keys and values of each block (a block's
+        'data' lines are joined)
+    """
+    entry = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        key, _, value = line.partition(':')
+        key = key.strip().lower()
+        value = value.strip()
+
+        if key == 'name':
+            if entry:
+                yield entry
+            entry = {'name': value}
+        elif entry is None:
+            continue  # File header
+        elif key == 'data' and 'data' in entry:
+            entry['data'] += ' ' + value
+        else:
+            entry[key] = value
+
+    if entry:
+        yield entry
+
+
+def entry_to_signal(entry):
+    """
+    Convert a .ir signal block to a signal.
+
+    Args:
+        entry: Dictionary of the block's keys and values
+
+    Returns:
+        Dictionary with name, frequency, pattern and, for parsed signals,
+        ir_protocol, ir_address and ir_command (the pattern is encoded from
+        the code)
+    """
+    signal_type = entry.get('type')
+    if signal_type == 'parsed':
+        protocol = entry.get('protocol')
+        address = _parse_field(entry.get('address', ''))
+        command = _parse_field(entry.get('command', ''))
+        waveform = ir_encoder.encode(protocol, address, command)
+        return {
+            'name': entry['name'],
+            'frequency': waveform['frequency'],
+            'pattern': waveform['pattern'],
+            'ir_protocol': protocol,
+            'ir_address': address,
+            'ir_command': command
+        }
+
+    if signal_type == 'raw':
+        try:
+            pattern = [int(value) for value in entry.get('data', '').split()]
+            frequency = int(entry.get('frequency') or 0)
+        except ValueError:
+            raise ValueError(f"Raw signal {entry['name']} has invalid data")
+        if not pattern:
+            raise ValueError(f"Raw signal {entry['name']} has no data")
+        return {'name': entry['name'], 'frequency': frequency, 'pattern': pattern}
+
+    raise ValueError(f"Unknown signal type {signal_type}")
+
+
+def signal_to_entry(signal):
+    """
+    Format a signal as a .ir signal block.
+
+    Signals with a decoded code are written as parsed, others as raw.
+
+    Args:
+        signal: Signal or record dictionary with name, frequency and
+            pattern, and optionally ir_protocol, ir_address and ir_command
+
+    Returns:
+        Block text, starting with its '#' separator line
+    """
+    name = ' '.join(str(signal.get('name') or 'Signal').split())
+    lines = ['#', f"name: {name}"]
+
+    if signal.get('ir_protocol') and signal.get('ir_command') is not None:
+        lines += [
+            'type: parsed',
+            f"protocol: {signal['ir_protocol']}",
+            f"address: {_format_field(signal.get('ir_address') or 0)}",
+            f"command: {_format_field(signal['ir_command'])}"
+        ]
+    else:
+        pattern = [int(duration) for duration in signal.get('pattern') or ()]
+        if not pattern:
+            raise ValueError(f"Signal {name} has no pattern")
+        lines += [
+            'type: raw',
+            f"frequency: {int(signal.get('frequency') or 0)}",
+            f"duty_cycle: {DEFAULT_DUTY_CYCLE:.6f}",
+            f"data: {' '.join(str(duration) for duration in pattern)}"
+        ]
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_signals(file, signals):
+    """
+    Write a .ir file.
+
+    Args:
+        file: Writable text file
+        signals: Iterable of signal dictionaries (see signal_to_entry());
+            signals that cannot be written are skipped
+
+    Returns:
+        Number of signals written
+    """
+    file.write(f"Filetype: {FILE_TYPE}\nVersion: {FILE_VERSION}\n")
+    written = 0
+    for signal in signals:
+        try:
+            file.write(signal_to_entry(signal))
+            written += 1
+        except ValueError as e:
+            print(f"Skipping signal: {str(e)}")
+    return written
+
+
+def _parse_field(text):
+    """
+    Parse an address or command field.
+
+    Args:
+        text: Hex bytes, least significant first (e.g. "04 00 00 00")
+
+    Returns:
+        Integer value
+    """
+    try:
+        return int.from_bytes(bytes.fromhex(text), 'little')
+    except ValueError:
+        raise ValueError(f"Invalid field value {text}")
+
+
+def _format_field(value):
+    """
+    Format an address or command field.
+
+    Args:
+        value: Integer value
+
+    Returns:
+        Hex bytes, least significant first (e.g. "04 00 00 00")
+    """
+    return ' '.join(f"{byte:02X}" for byte in int(value).to_bytes(FIELD_BYTES, 'little'))
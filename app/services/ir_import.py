@@ -0,0 +1,550 @@
+"""
+Infrared code library import for Signal Catcher app.
+Stream-parses LIRC lircd.conf files, Pronto hex lists, IRDB CSV files,
+Flipper Zero .ir files and Broadlink code lists into signal records.
+
+Parsers read their source line by line and yield one record at a time, so
+libraries of any size are imported in constant memory (see
+StorageService.import_records() for the batched, deduplicating writes).
+
+Usage as a batch job:
+    python -m app.services.ir_import FILE [lirc|pronto|irdb|flipper|broadlink]
+"""
+import csv
+import os
+import re
+import sys
+import time
+
+from app.models.signal_model import SignalModel
+from app.services import ir_decoder
+from app.services import ir_encoder
+from app.services import ir_flipper
+from app.services.ir_broadlink import broadlink_to_pattern
+from app.services.ir_pronto import pronto_to_pattern
+
+# Source formats
+FORMAT_LIRC = 'lirc'
+FORMAT_PRONTO = 'pronto'
+FORMAT_IRDB = 'irdb'
+FORMAT_FLIPPER = 'flipper'
+FORMAT_BROADLINK = 'broadlink'
+
+# Carrier assumed by LIRC when a remote does not give one (Hz)
+LIRC_DEFAULT_FREQUENCY = 38000
+
+# Four or more hex words in a row: the start of a Pronto code
+PRONTO_CODE = re.compile(r'(?:\b[0-9A-Fa-f]{4}\s+){3,}[0-9A-Fa-f]{4}\b')
+
+# Separators between a code name and its Pronto or Broadlink code
+NAME_SEPARATORS = ' \t:,;="'
+
+# A Broadlink infrared packet in base64 (starts with the 0x26 type byte)
+BROADLINK_CODE = re.compile(r'\bJg[A-Za-z0-9+/]{6,}={0,2}')
+
+# IRDB protocol names (IrpTransmogrifier naming) of the protocols in the
+# decoder table; the device/subdevice/function mapping is in _irdb_code()
+IRDB_PROTOCOLS = {
+    'nec': 'NEC',
+    'nec1': 'NEC',
+    'nec2': 'NEC',
+    'necx1': 'Samsung32',
+    'necx2': 'Samsung32',
+    'samsung32': 'Samsung32',
+    'sony12': 'SIRC',
+    'sony15': 'SIRC15',
+    'sony20': 'SIRC20',
+    'rc5': 'RC5',
+    'rc6': 'RC6'
+}
+
+
+def iter_file(path, source_format='auto', stats=None):
+    """
+    Read the records of a code library file.
+
+    Args:
+        path: Path of the file
+        source_format: FORMAT_LIRC, FORMAT_PRONTO, FORMAT_IRDB,
+            FORMAT_FLIPPER, FORMAT_BROADLINK or 'auto' (guessed from the
+            file name)
+        stats: Optional dictionary whose 'skipped' count is increased for
+            each entry that cannot be read
+
+    Yields:
+        Signal record dictionaries
+    """
+    if source_format == 'auto':
+        source_format = guess_format(path)
+
+    parsers = {
+        FORMAT_LIRC: iter_lircd_conf,
+        FORMAT_PRONTO: iter_pronto,
+        FORMAT_IRDB: iter_irdb_csv,
+        FORMAT_FLIPPER: iter_flipper_ir,
+        FORMAT_BROADLINK: iter_broadlink
+    }
+    if source_format not in parsers:
+        raise ValueError(f"Unknown code library format {source_format}")
+
+    with open(path, encoding='utf-8', errors='replace', newline='') as lines:
+        yield from parsers[source_format](lines, os.path.basename(path), stats)
+
+
+def guess_format(path):
+    """
+    Guess the format of a code library file from its name.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        FORMAT_LIRC, FORMAT_PRONTO, FORMAT_IRDB, FORMAT_FLIPPER or
+        FORMAT_BROADLINK
+    """
+    name = os.path.basename(path).lower()
+    if name.endswith('.csv'):
+        return FORMAT_IRDB
+    if name.endswith('.ir'):
+        return FORMAT_FLIPPER
+    if 'broadlink' in name:
+        return FORMAT_BROADLINK
+    if name.endswith(('.conf', '.lircd', '.lirc')) or 'lircd' in name:
+        return FORMAT_LIRC
+    return FORMAT_PRONTO
+
+
+def iter_lircd_conf(lines, source_name='lircd.conf', stats=None):
+    """
+    Parse a LIRC remote definition file.
+
+    Codes of remotes using space (pulse distance), RC5/shift and RC6
+    encodings are synthesized from the remote's timings; raw codes are
+    used as they are.
+
+    Args:
+        lines: Iterable of text lines
+        source_name: Name of the source, stored with each record
+        stats: Optional dictionary counting 'skipped' entries
+
+    Yields:
+        Signal record dictionaries
+    """
+    remote = None
+    section = None
+    raw_name = None
+    raw_pattern = []
+
+    for line in lines:
+        tokens = line.split('#', 1)[0].split()
+        if not tokens:
+            continue
+        keyword = tokens[0].lower()
+
+        if keyword in ('begin', 'end') and len(tokens) > 1:
+            block = tokens[1].lower()
+            if section == 'raw_codes' and raw_name:
+                # A raw code ends where the next block marker starts
+                yield from _lirc_raw_record(remote, raw_name, raw_pattern, source_name, stats)
+                raw_name = None
+
+            if block == 'remote':
+                remote = {} if keyword == 'begin' else None
+                section = None
+            elif remote is not None:
+                section = block if keyword == 'begin' else None
+            continue
+
+        if remote is None:
+            continue
+
+        if section == 'codes':
+            try:
+                pattern = _lirc_pattern(remote, _lirc_number(tokens[1]))
+                yield _make_record(_lirc_name(remote, tokens[0]), _lirc_frequency(remote),
+                                   pattern, FORMAT_LIRC, source_name, remote.get('name', [''])[0])
+            except (IndexError, KeyError, ValueError) as e:
+                _skip(stats, f"LIRC code {tokens[0]}", e)
+
+        elif section == 'raw_codes':
+            if keyword == 'name':
+                if raw_name:
+                    yield from _lirc_raw_record(remote, raw_name, raw_pattern, source_name, stats)
+                raw_name = tokens[1] if len(tokens) > 1 else 'Unnamed'
+                raw_pattern = []
+            elif raw_name:
+                raw_pattern.extend(tokens)
+
+        else:
+            remote[keyword] = tokens[1:]
+
+
+def iter_pronto(lines, source_name='pronto.txt', stats=None):
+    """
+    Parse a list of Pronto hex codes, one per line, each optionally
+    preceded by its name (e.g. "Power: 0000 006D 0022 0002 ...").
+
+    Args:
+        lines: Iterable of text lines
+        source_name: Name of the source, stored with each record
+        stats: Optional dictionary counting 'skipped' entries
+
+    Yields:
+        Signal record dictionaries
+    """
+    remote = os.path.splitext(source_name)[0]
+    for number, line in enumerate(lines, 1):
+        match = PRONTO_CODE.search(line)
+        if not match:
+            continue
+
+        name = line[:match.start()].strip(NAME_SEPARATORS) or f"Code {number}"
+        try:
+            code = pronto_to_pattern(line[match.start():])
+            yield _make_record(f"{remote} {name}", code['frequency'], code['pattern'],
+                               FORMAT_PRONTO, source_name, remote)
+        except ValueError as e:
+            _skip(stats, f"Pronto code on line {number}", e)
+
+
+def iter_irdb_csv(lines, source_name='irdb.csv', stats=None):
+    """
+    Parse an IRDB code file: CSV with functionname, protocol, device,
+    subdevice and function columns.
+
+    Args:
+        lines: Iterable of text lines
+        source_name: Name of the source, stored with each record
+        stats: Optional dictionary counting 'skipped' entries
+
+    Yields:
+        Signal record dictionaries
+    """
+    remote = os.path.splitext(source_name)[0]
+    for row in csv.DictReader(lines):
+        name = (row.get('functionname') or '').strip() or 'Unnamed'
+        try:
+            protocol, address, command = _irdb_code(row)
+            waveform = ir_encoder.encode(protocol, address, command)
+            yield _make_record(f"{remote} {name}", waveform['frequency'], waveform['pattern'],
+                               FORMAT_IRDB, source_name, remote,
+                               {'protocol': protocol, 'address': address,
+                                'command': command, 'repeat': 0, 'toggle': 0})
+        except (KeyError, TypeError, ValueError) as e:
+            _skip(stats, f"IRDB code {name}", e)
+
+
+def iter_flipper_ir(lines, source_name='remote.ir', stats=None):
+    """
+    Parse a Flipper Zero .ir file.
+
+    Args:
+        lines: Iterable of text lines
+        source_name: Name of the source, stored with each record
+        stats: Optional dictionary counting 'skipped' entries
+
+    Yields:
+        Signal record dictionaries
+    """
+    remote = os.path.splitext(source_name)[0]
+    for entry in ir_flipper.iter_entries(lines):
+        try:
+            signal = ir_flipper.entry_to_signal(entry)
+            decoded = None
+            if signal.get('ir_protocol'):
+                decoded = {'protocol': signal['ir_protocol'], 'address': signal['ir_address'],
+                           'command': signal['ir_command'], 'repeat': 0, 'toggle': 0}
+            yield _make_record(f"{remote} {signal['name']}", signal['frequency'],
+                               signal['pattern'], FORMAT_FLIPPER, source_name, remote, decoded)
+        except ValueError as e:
+            _skip(stats, f"Flipper signal {entry.get('name')}", e)
+
+
+def iter_broadlink(lines, source_name='broadlink.txt', stats=None):
+    """
+    Parse a list of Broadlink base64 codes, one per line, each optionally
+    preceded by its name (e.g. "Power: JgBQAAABK5QSExI3...").
+
+    Args:
+        lines: Iterable of text lines
+        source_name: Name of the source, stored with each record
+        stats: Optional dictionary counting 'skipped' entries
+
+    Yields:
+        Signal record dictionaries
+    """
+    remote = os.path.splitext(source_name)[0]
+    for number, line in enumerate(lines, 1):
+        match = BROADLINK_CODE.search(line)
+        if not match:
+            continue
+
+        name = line[:match.start()].strip(NAME_SEPARATORS) or f"Code {number}"
+        try:
+            code = broadlink_to_pattern(match.group())
+            yield _make_record(f"{remote} {name}", code['frequency'], code['pattern'],
+                               FORMAT_BROADLINK, source_name, remote)
+        except ValueError as e:
+            _skip(stats, f"Broadlink code on line {number}", e)
+
+
+def _irdb_code(row):
+    """
+    Map an IRDB (protocol, device, subdevice, function) row to a code of
+    the decoder table.
+
+    Args:
+        row: CSV row dictionary
+
+    Returns:
+        Tuple of (protocol name, address, command)
+    """
+    name = (row.get('protocol') or '').strip()
+    protocol = IRDB_PROTOCOLS.get(name.lower())
+    if protocol is None:
+        raise ValueError(f"Unsupported protocol {name}")
+
+    device = int(row['device'])
+    subdevice = int(row.get('subdevice') or -1)
+    function = int(row['function'])
+
+    if protocol == 'NEC':
+        # A subdevice other than the inverted device makes it extended NEC
+        if subdevice < 0 or subdevice == device ^ 0xFF:
+            return 'NEC', device, function
+        return 'NECext', device | subdevice << 8, function | (function ^ 0xFF) << 8
+
+    if protocol == 'Samsung32':
+        if subdevice >= 0 and subdevice != device:
+            raise ValueError(f"Subdevice {subdevice} differs from device {device}")
+        return protocol, device, function
+
+    if protocol == 'SIRC20':
+        return protocol, device | max(subdevice, 0) << 5, function
+
+    if protocol == 'RC5' and function >= 64:
+        # The inverted second start bit extends RC5 commands to 7 bits
+        return 'RC5X', device, function
+
+    return protocol, device, function
+
+
+def _lirc_raw_record(remote, name, tokens, source_name, stats):
+    """
+    Build the record of a LIRC raw code.
+
+    Args:
+        remote: Remote definition dictionary
+        name: Code name
+        tokens: Durations as text
+        source_name: Name of the source
+        stats: Optional dictionary counting 'skipped' entries
+
+    Yields:
+        The signal record dictionary, if the code is valid
+    """
+    try:
+        pattern = [int(token) for token in tokens]
+        if not pattern:
+            raise ValueError("No durations")
+        yield _make_record(_lirc_name(remote, name), _lirc_frequency(remote), pattern,
+                           FORMAT_LIRC, source_name, remote.get('name', [''])[0])
+    except ValueError as e:
+        _skip(stats, f"LIRC raw code {name}", e)
+
+
+def _lirc_pattern(remote, code):
+    """
+    Synthesize the pattern of a LIRC code from its remote's timings.
+
+    Args:
+        remote: Remote definition dictionary (keyword to value tokens)
+        code: Code value
+
+    Returns:
+        List of durations in microseconds, starting and ending with a mark
+    """
+    flags = set(remote.get('flags', [''])[0].upper().split('|'))
+    if 'RAW_CODES' in flags:
+        raise ValueError("Remote only has raw codes")
+
+    def timing(key, count=2):
+        values = [_lirc_number(value) for value in remote.get(key, [])[:count]]
+        return values + [0] * (count - len(values))
+
+    def field(key_data, key_bits):
+        bits = _lirc_number(remote.get(key_bits, ['0'])[0])
+        return _lirc_number(remote.get(key_data, ['0'])[0]), bits
+
+    one = timing('one')
+    zero = timing('zero')
+    biphase = flags & {'RC5', 'SHIFT_ENC', 'RC6'}
+    rc6 = 'RC6' in flags
+    rc6_mask = _lirc_number(remote.get('rc6_mask', ['0'])[0])
+    reverse = 'REVERSE' in flags
+
+    fields = [field('pre_data', 'pre_data_bits'), (code, _lirc_number(remote['bits'][0])),
+              field('post_data', 'post_data_bits')]
+    total = sum(width for _, width in fields)
+
+    # (level, duration) runs: 1 for a mark, 0 for a space
+    runs = []
+    header = timing('header')
+    if header[0] and header[1]:
+        runs += [(1, header[0]), (0, header[1])]
+    runs.append((1, timing('plead', 1)[0]))
+
+    position = total
+    for index, (value, width) in enumerate(fields):
+        if index == 1 and any(timing('pre')):
+            runs += [(1, timing('pre')[0]), (0, timing('pre')[1])]
+        if index == 2 and any(timing('post')):
+            runs += [(1, timing('post')[0]), (0, timing('post')[1])]
+
+        order = range(width) if reverse else range(width - 1, -1, -1)
+        for bit_index in order:
+            position -= 1
+            bit = (value >> bit_index) & 1
+            first, second = one if bit else zero
+            if not biphase:
+                runs += [(1, first), (0, second)]
+                continue
+
+            # Manchester coding: RC6 sends a one as mark-space, RC5 as space-mark
+            scale = 2 if rc6 and rc6_mask >> position & 1 else 1
+            mark_first = bool(bit) if rc6 else not bit
+            runs += [(1 if mark_first else 0, first * scale),
+                     (0 if mark_first else 1, second * scale)]
+
+    runs.append((1, timing('ptrail', 1)[0]))
+
+    # Merge runs of the same level; leading and trailing spaces are idle time
+    pattern = []
+    level = 0
+    for run_level, duration in runs:
+        if duration <= 0:
+            continue
+        if pattern and run_level == level:
+            pattern[-1] += duration
+        elif pattern or run_level == 1:
+            pattern.append(duration)
+            level = run_level
+    if pattern and level == 0:
+        pattern.pop()
+
+    if not pattern:
+        raise ValueError("Remote has no timings")
+    return pattern
+
+
+def _lirc_number(text):
+    """
+    Parse a LIRC number (decimal, or hexadecimal with 0x).
+
+    Args:
+        text: Number as text
+
+    Returns:
+        Integer value
+    """
+    if text.lower().startswith('0x'):
+        return int(text, 16)
+    return int(text, 10)
+
+
+def _lirc_frequency(remote):
+    """
+    Get the carrier frequency of a LIRC remote in Hz.
+
+    Args:
+        remote: Remote definition dictionary
+
+    Returns:
+        Frequency in Hz
+    """
+    return _lirc_number(remote.get('frequency', [str(LIRC_DEFAULT_FREQUENCY)])[0])
+
+
+def _lirc_name(remote, code_name):
+    """
+    Build a record name from a LIRC remote and code name.
+
+    Args:
+        remote: Remote definition dictionary
+        code_name: Code name (e.g. KEY_POWER)
+
+    Returns:
+        Record name
+    """
+    remote_name = remote.get('name', [''])[0]
+    return f"{remote_name} {code_name}" if remote_name else code_name
+
+
+def _make_record(name, frequency, pattern, source_format, source_name, remote, decoded=None):
+    """
+    Build a signal record for an imported code.
+
+    Args:
+        name: Record name
+        frequency: Carrier frequency in Hz
+        pattern: Alternating mark/space durations in microseconds
+        source_format: Format of the library
+        source_name: Name of the library
+        remote: Name of the remote
+        decoded: Decoded code if known, otherwise the pattern is decoded
+
+    Returns:
+        Dictionary in the format of recorded signals
+    """
+    if decoded is None:
+        decoded = ir_decoder.decode(pattern) or {}
+
+    signal_data = {
+        'protocol': 'infrared',
+        'frequency': frequency,
+        'pattern': pattern,
+        'metadata': {
+            'record_time': time.time(),
+            'source': source_format,
+            'library': source_name,
+            'remote_type': remote or 'Unknown',
+            'toggle': decoded.get('toggle')
+        }
+    }
+
+    return SignalModel(
+        signal_type='infrared',
+        data=signal_data,
+        name=name,
+        frequency=frequency,
+        duration=sum(pattern) / 1000,  # Convert to milliseconds
+        pattern=pattern,
+        ir_protocol=decoded.get('protocol'),
+        ir_address=decoded.get('address'),
+        ir_command=decoded.get('command'),
+        ir_repeat=decoded.get('repeat')
+    ).to_dict()
+
+
+def _skip(stats, entry, error):
+    """
+    Count an entry that cannot be read.
+
+    Args:
+        stats: Optional dictionary counting 'skipped' entries
+        entry: Description of the entry
+        error: Exception raised while reading it
+    """
+    if stats is not None:
+        stats['skipped'] = stats.get('skipped', 0) + 1
+    else:
+        print(f"Skipping {entry}: {str(error)}")
+
+
+if __name__ == '__main__':
+    from app.services.storage_service import StorageService
+
+    source_format = sys.argv[2] if len(sys.argv) > 2 else 'auto'
+    result = StorageService().import_file(sys.argv[1], source_format)
+    print(f"Imported {result['imported']} of {result['read']} codes "
+          f"({result['duplicates']} duplicates, {result['skipped']} unreadable)")
@@ -0,0 +1,141 @@
+"""
+Infrared pattern normalization for Signal Catcher app.
+Removes capture jitter from batches of raw patterns with NumPy.
+
+Usage as a batch job over the stored library:
+    python -m app.services.ir_normalizer [carrier|unit]
+"""
+import itertools
+import sys
+
+import numpy as np
+
+# Carrier assumed for patterns without a known frequency (Hz)
+DEFAULT_CARRIER = 38000
+
+# Snapping modes: whole carrier periods, or multiples of the pattern's base
+# unit (itself a whole number of carrier periods). Carrier periods keep the
+# timing closest to the capture; units remove practically all jitter, so
+# captures of one button normalize to the same pattern.
+SNAP_CARRIER = 'carrier'
+SNAP_UNIT = 'unit'
+
+
+def normalize_pattern(pattern, frequency=None, snap=SNAP_UNIT):
+    """
+    Normalize a single pattern.
+
+    Args:
+        pattern: Alternating mark/space durations in microseconds
+        frequency: Carrier frequency in Hz
+        snap: SNAP_UNIT or SNAP_CARRIER
+
+    Returns:
+        Normalized pattern as a list of integers
+    """
+    return normalize_patterns([pattern], [frequency], snap)[0]
+
+
+def normalize_patterns(patterns, frequencies=None, snap=SNAP_UNIT):
+    """
+    Normalize a batch of patterns in one vectorized pass.
+
+    Each pattern is canonicalized to start with a mark (a leading empty
+    mark and the space after it are dropped) and to end with a mark (a
+    trailing gap is dropped), then every duration is snapped.
+
+    Args:
+        patterns: List of patterns (alternating mark/space durations in
+            microseconds, starting with a mark)
+        frequencies: Optional list of carrier frequencies in Hz, one per
+            pattern (None or 0 for DEFAULT_CARRIER)
+        snap: SNAP_UNIT or SNAP_CARRIER
+
+    Returns:
+        List of normalized patterns as lists of integers
+    """
+    if snap not in (SNAP_UNIT, SNAP_CARRIER):
+        raise ValueError(f"Unknown snap mode {snap}")
+
+    count = len(patterns)
+    if not count:
+        return []
+
+    # Flatten the batch; seg maps each duration to its pattern
+    lengths = np.fromiter((len(pattern or ()) for pattern in patterns),
+                          dtype=np.intp, count=count)
+    values = np.fromiter(itertools.chain.from_iterable(pattern or () for pattern in patterns),
+                         dtype=np.float64, count=int(lengths.sum()))
+    seg = np.repeat(np.arange(count), lengths)
+    starts = np.cumsum(lengths) - lengths
+    position = np.arange(len(values)) - starts[seg]
+
+    carrier = np.full(count, float(DEFAULT_CARRIER))
+    if frequencies is not None:
+        carrier = np.fromiter((frequency or DEFAULT_CARRIER for frequency in frequencies),
+                              dtype=np.float64, count=count)
+    period = 1e6 / carrier
+
+    # Lead-in: an empty first mark means the pattern starts with a space
+    leading = np.zeros(count, dtype=bool)
+    present = lengths > 0
+    leading[present] = values[starts[present]] <= 0
+    keep = ~(leading[seg] & (position < 2))
+
+    # Trailing gap: an even number of durations ends with a space
+    trailing = (lengths - 2 * leading) % 2 == 0
+    keep &= ~(trailing[seg] & (position == lengths[seg] - 1))
+
+    values = np.maximum(values[keep], 0.0)
+    seg = seg[keep]
+    lengths = np.bincount(seg, minlength=count)
+
+    if snap == SNAP_CARRIER:
+        step = period[seg]
+    else:
+        step = _base_units(values, seg, lengths, period)[seg]
+    snapped = np.maximum(np.rint(values / step), 1) * step
+
+    result = np.rint(snapped).astype(np.int64)
+    return [chunk.tolist() for chunk in np.split(result, np.cumsum(lengths)[:-1])]
+
+
+def _base_units(values, seg, lengths, period):
+    """
+    Estimate the base unit of each pattern.
+
+    The unit is the mean of the durations near the pattern's lower
+    quartile (the short mark or space of practically every protocol),
+    rounded to whole carrier periods.
+
+    Args:
+        values: Flat array of durations
+        seg: Pattern index of each duration
+        lengths: Number of durations of each pattern
+        period: Carrier period of each pattern in microseconds
+
+    Returns:
+        Array of base units in microseconds, one per pattern
+    """
+    count = len(lengths)
+    starts = np.cumsum(lengths) - lengths
+
+    # Sort durations within each pattern to find the lower quartiles
+    ordered = values[np.lexsort((values, seg))]
+    quartile = np.ones(count)
+    present = lengths > 0
+    quartile[present] = ordered[starts[present] + lengths[present] // 4]
+
+    near = (values >= quartile[seg] / 2) & (values <= quartile[seg] * 1.5)
+    total = np.bincount(seg, weights=values * near, minlength=count)
+    samples = np.bincount(seg, weights=near, minlength=count)
+    unit = np.where(samples > 0, total / np.maximum(samples, 1), quartile)
+
+    return np.maximum(np.rint(unit / period), 1) * period
+
+
+if __name__ == '__main__':
+    from app.services.storage_service import StorageService
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else SNAP_UNIT
+    print(f"Normalized {StorageService().normalize_records(mode)} infrared records")
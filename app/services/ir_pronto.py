@@ -0,0 +1,154 @@
+"""
+Pronto hex codec for Signal Catcher app.
+Converts between Pronto (Philips ProntoEdit) hex codes and raw patterns.
+
+A learned Pronto code is a list of 16-bit hex words: the format (0000 for
+a modulated carrier, 0100 for none), the carrier period in units of the
+Pronto clock, the number of burst pairs sent once and the number repeated
+while the button is held, then the burst pairs themselves, each a mark and
+a space counted in carrier periods.
+"""
+from app.services.ir_transmitter import DEFAULT_REPEAT_GAP
+
+# Length of one unit of the carrier period word in microseconds
+PRONTO_CLOCK = 0.241246
+
+# Learned code formats
+FORMAT_LEARNED = 0x0000
+FORMAT_UNMODULATED = 0x0100
+
+# Carrier period word written for unmodulated codes (about 38 kHz)
+UNMODULATED_PERIOD_WORD = 0x006D
+
+# Largest burst length a word can hold
+MAX_WORD = 0xFFFF
+
+
+def pronto_to_pattern(code):
+    """
+    Convert a Pronto hex code to a raw pattern.
+
+    Args:
+        code: Pronto hex string (words separated by whitespace)
+
+    Returns:
+        Dictionary with the carrier 'frequency' in Hz (0 if unmodulated),
+        the 'pattern' of alternating mark/space durations in microseconds
+        (the burst pairs sent once, or the repeated ones if there are none,
+        without the final gap), the 'gap' that ends it in microseconds and
+        the 'repeat_pattern' sent while the button is held (empty if none)
+    """
+    try:
+        words = [int(word, 16) for word in code.split()]
+    except ValueError:
+        raise ValueError("Pronto code contains a word that is not hex")
+
+    if len(words) < 4:
+        raise ValueError("Pronto code is too short")
+
+    code_format, period_word, once_pairs, repeat_pairs = words[:4]
+    if code_format not in (FORMAT_LEARNED, FORMAT_UNMODULATED):
+        raise ValueError(f"Unsupported Pronto format {code_format:04X}")
+    if not period_word:
+        raise ValueError("Pronto code has no carrier period")
+    if len(words) != 4 + 2 * (once_pairs + repeat_pairs):
+        raise ValueError("Pronto code length does not match its burst pair counts")
+
+    period = period_word * PRONTO_CLOCK
+    durations = [int(round(count * period)) for count in words[4:]]
+    once = durations[:2 * once_pairs]
+    repeat = durations[2 * once_pairs:]
+
+    frequency = 0
+    if code_format == FORMAT_LEARNED:
+        frequency = int(round(1e6 / period))
+
+    sequence = once or repeat
+    return {
+        'frequency': frequency,
+        'pattern': sequence[:-1],
+        'gap': sequence[-1] if sequence else 0,
+        'repeat_pattern': repeat[:-1]
+    }
+
+
+def pattern_to_pronto(frequency, pattern, repeat_pattern=None, gap=DEFAULT_REPEAT_GAP):
+    """
+    Convert a raw pattern to a Pronto hex code.
+
+    Args:
+        frequency: Carrier frequency in Hz (0 or None for unmodulated)
+        pattern: Alternating mark/space durations in microseconds sent once
+        repeat_pattern: Optional durations sent while the button is held
+        gap: Space in microseconds ending a sequence whose pattern ends
+            with a mark
+
+    Returns:
+        Pronto hex string
+    """
+    if frequency:
+        code_format = FORMAT_LEARNED
+        period_word = int(round(1e6 / (frequency * PRONTO_CLOCK)))
+    else:
+        code_format = FORMAT_UNMODULATED
+        period_word = UNMODULATED_PERIOD_WORD
+    if not 0 < period_word <= MAX_WORD:
+        raise ValueError(f"Carrier frequency {frequency} Hz cannot be represented")
+    period = period_word * PRONTO_CLOCK
+
+    sequences = []
+    for sequence in (pattern, repeat_pattern):
+        sequence = [int(duration) for duration in sequence or ()]
+        if len(sequence) % 2:
+            sequence.append(gap)
+        sequences.append([min(max(int(round(duration / period)), 1), MAX_WORD)
+                          for duration in sequence])
+
+    once, repeat = sequences
+    if not once and not repeat:
+        raise ValueError("No pattern to convert")
+
+    words = [code_format, period_word, len(once) // 2, len(repeat) // 2] + once + repeat
+    return ' '.join(f"{word:04X}" for word in words)
+
+
+def pronto_to_patterns(codes):
+    """
+    Convert a batch of Pronto hex codes.
+
+    Args:
+        codes: List of Pronto hex strings
+
+    Returns:
+        List of pattern dictionaries (see pronto_to_pattern()), with None
+        for codes that cannot be converted
+    """
+    results = []
+    for code in codes:
+        try:
+            results.append(pronto_to_pattern(code))
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def patterns_to_pronto(frequencies, patterns):
+    """
+    Convert a batch of raw patterns to Pronto hex codes.
+
+    Args:
+        frequencies: List of carrier frequencies in Hz, one per pattern
+        patterns: List of patterns (alternating mark/space durations in
+            microseconds)
+
+    Returns:
+        List of Pronto hex strings, with None for patterns that cannot be
+        converted
+    """
+    results = []
+    for frequency, pattern in zip(frequencies, patterns):
+        try:
+            results.append(pattern_to_pronto(frequency, pattern))
+        except ValueError:
+            results.append(None)
+    return results
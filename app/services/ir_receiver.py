@@ -0,0 +1,411 @@
+"""
+Infrared receiver implementation for Signal Catcher app.
+Reads raw mode2 pulse/space timings from LIRC devices, files or pipes.
+"""
+import array
+import os
+import queue
+import re
+import select
+import stat
+import struct
+import threading
+import time
+
+# mode2 sample types (upper byte of each 32-bit binary sample)
+LIRC_MODE2_SPACE = 0x00
+LIRC_MODE2_PULSE = 0x01
+LIRC_MODE2_FREQUENCY = 0x02
+LIRC_MODE2_TIMEOUT = 0x03
+LIRC_MODE2_OVERFLOW = 0x04
+LIRC_VALUE_MASK = 0x00FFFFFF
+
+# ioctl selecting mode2 reception: _IOW('i', 0x12, __u32) and LIRC_MODE_MODE2
+LIRC_SET_REC_MODE = 0x40046912
+LIRC_MODE_MODE2 = 0x00000004
+
+# Space that ends a frame; longer than any space inside common protocols
+# (the NEC header space is 4.5 ms) but shorter than inter-frame gaps (microseconds)
+DEFAULT_FRAME_GAP = 15000
+
+# Frames with fewer edges are noise; an NEC repeat frame has 3
+DEFAULT_MIN_EDGES = 3
+
+# Frames are cut after this many edges even without a gap
+DEFAULT_MAX_EDGES = 1024
+
+# Carrier assumed until the receiver reports one (Hz)
+DEFAULT_CARRIER = 38000
+
+# How often a blocked read checks for cancellation (seconds)
+READ_POLL_INTERVAL = 0.1
+
+READ_SIZE = 4096
+
+# Text mode2 lines as printed by the LIRC mode2 tool ("pulse 560", "space 1690",
+# "timeout 125000", "carrier 38000") or signed durations ("+560 -1690")
+TEXT_SAMPLE = re.compile(r'(pulse|space|timeout|carrier|frequency)\s+(\d+)|([+-])(\d+)')
+
+
+class FrameSegmenter:
+    """
+    Streaming segmentation of pulse/space timings into frames.
+
+    Samples are fed one at a time. A space of at least gap microseconds, a
+    receiver timeout or the end of the stream completes the current frame,
+    so frames are emitted as soon as they end without buffering the stream.
+    """
+    def __init__(self, gap=DEFAULT_FRAME_GAP, min_edges=DEFAULT_MIN_EDGES,
+                 max_edges=DEFAULT_MAX_EDGES, carrier=DEFAULT_CARRIER):
+        """
+        Initialize the segmenter.
+
+        Args:
+            gap: Shortest space in microseconds that separates frames
+            min_edges: Minimum number of pulses and spaces in a frame
+            max_edges: Maximum number of pulses and spaces in a frame
+            carrier: Carrier frequency in Hz until one is reported
+        """
+        self.gap = gap
+        self.min_edges = min_edges
+        self.max_edges = max_edges
+        self.carrier = carrier
+        self.frames = 0
+        self.noise = 0
+
+        self._pattern = []
+        self._clock = 0  # Stream time fed so far in microseconds
+        self._start = 0  # Stream time of the current frame's first pulse
+        self._origin = None  # Wall-clock time of stream time 0
+
+    def feed(self, pulse, duration):
+        """
+        Add one pulse or space.
+
+        Args:
+            pulse: True for a pulse, False for a space
+            duration: Duration in microseconds
+
+        Returns:
+            A completed frame dictionary, or None
+        """
+        pattern = self._pattern
+        start = self._clock
+        self._clock += duration
+
+        if not pulse:
+            if not pattern:
+                return None  # Idle time before the first pulse
+            if duration >= self.gap:
+                return self._complete(duration)
+
+        if not pattern:
+            self._start = start
+
+        # Consecutive samples of the same kind are one longer edge
+        if pattern and (len(pattern) % 2 == 1) == pulse:
+            pattern[-1] += duration
+        else:
+            pattern.append(duration)
+
+        if len(pattern) >= self.max_edges:
+            return self._complete(0)
+        return None
+
+    def set_carrier(self, frequency):
+        """
+        Set the carrier frequency of the following frames.
+
+        Args:
+            frequency: Carrier frequency in Hz
+        """
+        if frequency:
+            self.carrier = frequency
+
+    def flush(self, gap=0):
+        """
+        Complete the current frame, e.g. on a receiver timeout or end of stream.
+
+        Args:
+            gap: Time since the last edge in microseconds, if known
+
+        Returns:
+            A completed frame dictionary, or None
+        """
+        self._clock += gap
+        if not self._pattern:
+            return None
+        return self._complete(gap)
+
+    def _complete(self, gap):
+        """
+        Finish the current frame.
+
+        Args:
+            gap: Space that followed the frame in microseconds
+
+        Returns:
+            Frame dictionary, or None if the frame was noise
+        """
+        pattern = self._pattern
+        self._pattern = []
+
+        # Frames are stamped with their start in stream time, so replayed
+        # files keep their spacing. Stream time is pulled forward to the
+        # wall clock whenever it falls behind, e.g. when a device drops
+        # the idle time between frames.
+        origin = time.time() - self._clock / 1000000.0
+        if self._origin is None or origin > self._origin:
+            self._origin = origin
+
+        # A frame ends with a pulse; drop a trailing partial space
+        if len(pattern) % 2 == 0:
+            pattern.pop()
+
+        if len(pattern) < self.min_edges:
+            self.noise += 1
+            return None
+
+        self.frames += 1
+        return {
+            'pattern': pattern,
+            'frequency': self.carrier,
+            'gap': gap,
+            'timestamp': self._origin + self._start / 1000000.0
+        }
+
+
+class IRReceiver:
+    """
+    Receiver reading mode2 timings from a LIRC device, file or pipe.
+
+    Binary sources carry 32-bit mode2 samples as produced by /dev/lircN;
+    text sources carry the output of the LIRC mode2 tool. A reader thread
+    drains the source continuously into a queue, so a slow consumer does
+    not let the kernel buffer overflow.
+    """
+    def __init__(self, path, source_format='auto', gap=DEFAULT_FRAME_GAP,
+                 min_edges=DEFAULT_MIN_EDGES, max_edges=DEFAULT_MAX_EDGES):
+        """
+        Initialize the receiver.
+
+        Args:
+            path: LIRC device (/dev/lirc0), capture file or named pipe
+            source_format: 'binary', 'text' or 'auto' (binary for character
+                devices, otherwise detected from the first bytes)
+            gap: Shortest space in microseconds that separates frames
+            min_edges: Minimum number of pulses and spaces in a frame
+            max_edges: Maximum number of pulses and spaces in a frame
+        """
+        self.path = path
+        self.source_format = source_format
+        self.gap = gap
+        self.min_edges = min_edges
+        self.max_edges = max_edges
+        self.overflows = 0
+
+    def iter_frames(self, cancel_event):
+        """
+        Read frames until cancelled or the source ends.
+
+        Args:
+            cancel_event: threading.Event that stops reading when set
+
+        Yields:
+            Frame dictionaries with pattern (alternating pulse/space
+            durations in microseconds, starting and ending with a pulse),
+            frequency, gap and timestamp (start of the frame in seconds)
+        """
+        frames = queue.Queue()
+        done = object()
+
+        # Each reader segments with its own state, so overlapping reads
+        # (e.g. a stopped session still draining) do not mix their frames
+        segmenter = FrameSegmenter(self.gap, self.min_edges, self.max_edges)
+
+        def read_process():
+            try:
+                self._read(cancel_event, segmenter, frames.put)
+            except Exception as e:
+                print(f"IR receiver error: {str(e)}")
+            finally:
+                frames.put(done)
+
+        reader = threading.Thread(target=read_process)
+        reader.daemon = True
+        reader.start()
+
+        while True:
+            try:
+                frame = frames.get(timeout=READ_POLL_INTERVAL)
+            except queue.Empty:
+                if cancel_event.is_set():
+                    break
+                continue
+
+            if frame is done:
+                break
+            yield frame
+
+    def _read(self, cancel_event, segmenter, emit):
+        """
+        Read and segment the source.
+
+        Args:
+            cancel_event: threading.Event that stops reading when set
+            segmenter: FrameSegmenter of this read
+            emit: Function called with each completed frame
+        """
+        fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            # A pipe reads as ended until its writer connects
+            waiting_for_writer = stat.S_ISFIFO(os.fstat(fd).st_mode)
+
+            source_format = self.source_format
+            if source_format == 'auto':
+                source_format = self._detect_format(fd)
+            if source_format == 'binary':
+                self._set_mode2(fd)
+
+            parse = self._parse_binary if source_format == 'binary' else self._parse_text
+            pending = b''
+
+            while not cancel_event.is_set():
+                readable, _, _ = select.select([fd], [], [], READ_POLL_INTERVAL)
+                if not readable:
+                    continue
+
+                try:
+                    chunk = os.read(fd, READ_SIZE)
+                except BlockingIOError:
+                    continue
+
+                if not chunk:
+                    if waiting_for_writer:
+                        time.sleep(READ_POLL_INTERVAL)
+                        continue
+                    break  # End of file, or the pipe writer closed
+
+                waiting_for_writer = False
+                pending = parse(pending + chunk, segmenter, emit)
+
+            if source_format == 'text' and pending:
+                parse(pending + b'\n', segmenter, emit)
+
+            frame = segmenter.flush()
+            if frame:
+                emit(frame)
+
+        finally:
+            os.close(fd)
+
+    def _detect_format(self, fd):
+        """
+        Guess the format of a source.
+
+        Args:
+            fd: Open file descriptor
+
+        Returns:
+            'binary' or 'text'
+        """
+        if stat.S_ISCHR(os.fstat(fd).st_mode):
+            return 'binary'
+
+        # Peek without consuming; only possible for regular files
+        if stat.S_ISREG(os.fstat(fd).st_mode):
+            head = os.pread(fd, 64, 0)
+            if head and all(32 <= b < 127 or b in b'\r\n\t' for b in head):
+                return 'text'
+            return 'binary'
+
+        return 'text'
+
+    def _set_mode2(self, fd):
+        """
+        Switch a LIRC device to mode2 reception.
+
+        Args:
+            fd: Open file descriptor
+        """
+        import fcntl
+
+        if not stat.S_ISCHR(os.fstat(fd).st_mode):
+            return
+
+        try:
+            fcntl.ioctl(fd, LIRC_SET_REC_MODE, struct.pack('I', LIRC_MODE_MODE2))
+        except OSError as e:
+            print(f"Could not set LIRC mode2: {str(e)}")
+
+    def _parse_binary(self, data, segmenter, emit):
+        """
+        Parse 32-bit mode2 samples.
+
+        Args:
+            data: Bytes to parse
+            segmenter: FrameSegmenter of the read
+            emit: Function called with each completed frame
+
+        Returns:
+            Trailing bytes of an incomplete sample
+        """
+        usable = len(data) - len(data) % 4
+        samples = array.array('I')
+        samples.frombytes(data[:usable])
+
+        for sample in samples:
+            kind = sample >> 24
+            value = sample & LIRC_VALUE_MASK
+
+            if kind == LIRC_MODE2_PULSE or kind == LIRC_MODE2_SPACE:
+                frame = segmenter.feed(kind == LIRC_MODE2_PULSE, value)
+            elif kind == LIRC_MODE2_TIMEOUT:
+                frame = segmenter.flush(value)
+            elif kind == LIRC_MODE2_FREQUENCY:
+                segmenter.set_carrier(value)
+                frame = None
+            else:
+                # The receiver lost samples; the current frame is unusable
+                self.overflows += 1
+                segmenter.flush()
+                frame = None
+
+            if frame:
+                emit(frame)
+
+        return data[usable:]
+
+    def _parse_text(self, data, segmenter, emit):
+        """
+        Parse text mode2 lines.
+
+        Args:
+            data: Bytes to parse
+            segmenter: FrameSegmenter of the read
+            emit: Function called with each completed frame
+
+        Returns:
+            Trailing bytes of an incomplete line
+        """
+        lines = data.split(b'\n')
+        pending = lines.pop()
+
+        for line in lines:
+            for match in TEXT_SAMPLE.finditer(line.decode('ascii', 'ignore')):
+                kind, value, sign, signed_value = match.groups()
+
+                if kind == 'pulse' or sign == '+':
+                    frame = segmenter.feed(True, int(value or signed_value))
+                elif kind == 'space' or sign == '-':
+                    frame = segmenter.feed(False, int(value or signed_value))
+                elif kind == 'timeout':
+                    frame = segmenter.flush(int(value))
+                else:
+                    segmenter.set_carrier(int(value))
+                    frame = None
+
+                if frame:
+                    emit(frame)
+
+        return pending
@@ -0,0 +1,179 @@
+"""
+Infrared pattern similarity for Signal Catcher app.
+Quantized timing signatures and locality-sensitive hashing of raw patterns.
+
+A pattern is reduced to a signature of small integers (each duration as a
+multiple of the pattern's own base unit, so carrier and receiver timing
+offsets cancel out). Bit-sampling LSH then hashes fixed subsets of
+signature positions into band keys: patterns differing in a few symbols
+still share most bands, so a handful of indexed band lookups finds the
+candidates that compare() verifies against the actual timings.
+"""
+import functools
+import hashlib
+import math
+import random
+
+from app.services.ir_decoder import DEFAULT_TOLERANCE, MIN_TOLERANCE
+
+# Number of band keys per pattern, and signature positions hashed per band.
+# Frames of one protocol agree on most positions (all the marks, the
+# header), so bands need many rows to keep different codes apart.
+BANDS = 8
+ROWS = 16
+
+# Durations up to this many base units are kept exact; longer ones (headers,
+# gaps) are quantized on a half-octave scale
+LINEAR_UNITS = 4
+
+# Fixed seed so band positions, and therefore stored keys, never change
+BAND_SEED = 0x5C1F
+
+# Both patterns carry receiver timing errors, so the smallest absolute error
+# accepted between two captures is twice that accepted against a protocol
+MATCH_MIN_TOLERANCE = 2 * MIN_TOLERANCE
+
+# Number of recent signatures kept, so hashing and indexing one pattern
+# quantizes it only once
+SIGNATURE_CACHE_SIZE = 1024
+
+# Signature positions of each band, as fractions of the signature length
+_random = random.Random(BAND_SEED)
+_BAND_POSITIONS = [[_random.random() for _ in range(ROWS)] for _ in range(BANDS)]
+
+
+def signature(pattern):
+    """
+    Quantize a pattern into a timing signature.
+
+    Args:
+        pattern: Alternating mark/space durations in microseconds
+
+    Returns:
+        Tuple of small integers, one per duration (empty for no pattern)
+    """
+    return _signature(tuple(int(duration) for duration in pattern or ()))
+
+
+@functools.lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _signature(pattern):
+    """
+    Quantize a pattern; results are cached since a pattern is usually
+    both hashed and indexed.
+
+    Args:
+        pattern: Tuple of durations in microseconds
+
+    Returns:
+        Tuple of small integers
+    """
+    durations = [duration for duration in pattern if duration > 0]
+    if not durations:
+        return ()
+
+    # The lower quartile is the base unit of practically every protocol;
+    # averaging the durations near it keeps jitter out of the estimate
+    quartile = sorted(durations)[len(durations) // 4]
+    near = [duration for duration in durations if quartile / 2 <= duration <= quartile * 1.5]
+    unit = sum(near) / len(near)
+
+    symbols = []
+    for duration in durations:
+        units = duration / unit
+        if units < LINEAR_UNITS + 0.5:
+            symbols.append(max(int(round(units)), 1))
+        else:
+            symbols.append(LINEAR_UNITS + int(round(2 * math.log2(units / LINEAR_UNITS))))
+    return tuple(symbols)
+
+
+def band_keys(pattern):
+    """
+    Compute the LSH band keys of a pattern.
+
+    Args:
+        pattern: Alternating mark/space durations in microseconds
+
+    Returns:
+        List of BANDS signed 64-bit integer keys (empty for no pattern)
+    """
+    symbols = signature(pattern)
+    length = len(symbols)
+    if not length:
+        return []
+
+    texts = [str(symbol) for symbol in symbols]
+    keys = []
+    for band, indexes in enumerate(_band_indexes(length)):
+        sample = ','.join([texts[index] for index in indexes])
+        digest = hashlib.blake2b(f"{length}:{band}:{sample}".encode(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def pattern_hash(pattern):
+    """
+    Compute an identity hash of a pattern for finding duplicates.
+
+    The hash covers the timing signature, so captures of one button
+    usually hash alike despite receiver jitter; a trailing gap is ignored.
+
+    Args:
+        pattern: Alternating mark/space durations in microseconds
+
+    Returns:
+        Hexadecimal hash string, or None for no pattern
+    """
+    pattern = list(pattern or ())
+    if len(pattern) % 2 == 0:
+        pattern = pattern[:-1]
+    symbols = signature(pattern)
+    if not symbols:
+        return None
+    return hashlib.blake2b(','.join(str(symbol) for symbol in symbols).encode(),
+                           digest_size=8).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _band_indexes(length):
+    """
+    Get the signature indexes sampled by each band.
+
+    Args:
+        length: Signature length
+
+    Returns:
+        Tuple of BANDS tuples of ROWS indexes
+    """
+    return tuple(tuple(int(position * length) for position in positions)
+                 for positions in _BAND_POSITIONS)
+
+
+def compare(pattern, other, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare two patterns edge by edge.
+
+    Args:
+        pattern: Alternating mark/space durations in microseconds
+        other: Pattern to compare with
+        tolerance: Relative timing error accepted on each edge
+
+    Returns:
+        Tuple of (mismatches, distance) where mismatches is the number of
+        edges outside the tolerance and distance the mean relative timing
+        difference, or None if the patterns have different lengths
+    """
+    if not pattern or not other or len(pattern) != len(other):
+        return None
+
+    mismatches = 0
+    total = 0.0
+    for duration, expected in zip(pattern, other):
+        duration = int(duration)
+        expected = int(expected)
+        difference = abs(duration - expected)
+        if difference > max(expected * tolerance, MATCH_MIN_TOLERANCE):
+            mismatches += 1
+        total += difference / max(duration, expected, 1)
+
+    return mismatches, total / len(pattern)
@@ -0,0 +1,389 @@
+"""
+Infrared transmit scheduling for Signal Catcher app.
+Sends signals and macros from a queue on a dedicated worker thread.
+
+A macro is an ordered list of steps, each a waveform sent one or more
+times followed by a delay. Before sending, a macro is compiled into bursts
+(single emitter calls): adjacent frames on the same carrier are coalesced
+into one burst, with the gap between them sent as a space so the emitter
+hardware times it, and frames longer than the emitter allows are split at
+spaces. Bursts are then started at their scheduled offsets and the actual
+timing is reported alongside the requested timing.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Android's ConsumerIrManager rejects patterns longer than two seconds
+ANDROID_MAX_DURATION = 2000000
+
+# Default space between repeats of a raw pattern (microseconds)
+DEFAULT_REPEAT_GAP = 50000
+
+# Longest gap sent as a space inside a coalesced burst (microseconds);
+# longer delays are waited out between emitter calls
+DEFAULT_MAX_COALESCE_GAP = 250000
+
+
+class AndroidEmitter:
+    """
+    Emitter sending through Android's ConsumerIrManager.
+    """
+    max_duration = ANDROID_MAX_DURATION
+    max_length = None
+
+    def __init__(self, consumer_ir):
+        """
+        Initialize the emitter.
+
+        Args:
+            consumer_ir: ConsumerIrManager instance
+        """
+        self.consumer_ir = consumer_ir
+
+    def transmit(self, frequency, pattern):
+        """
+        Send a pattern; blocks until it has been sent.
+
+        Args:
+            frequency: Carrier frequency in Hz
+            pattern: Alternating mark/space durations in microseconds
+        """
+        if not self.consumer_ir.hasIrEmitter():
+            raise RuntimeError("Device has no IR emitter")
+        self.consumer_ir.transmit(int(frequency), [int(duration) for duration in pattern])
+
+
+class FakeEmitter:
+    """
+    Emitter recording what it is asked to send, for tests and platforms
+    without IR hardware.
+    """
+    def __init__(self, max_duration=ANDROID_MAX_DURATION, max_length=None,
+                 realtime=True, log=False):
+        """
+        Initialize the emitter.
+
+        Args:
+            max_duration: Longest pattern accepted in microseconds (None for no limit)
+            max_length: Most durations accepted in one pattern (None for no limit)
+            realtime: Whether transmit() blocks for the duration of the pattern
+                like real hardware
+            log: Whether to print each transmission
+        """
+        self.max_duration = max_duration
+        self.max_length = max_length
+        self.realtime = realtime
+        self.log = log
+        self.fail = False
+        self.calls = []
+
+    def transmit(self, frequency, pattern):
+        """
+        Record a pattern, enforcing the same limits as real hardware.
+
+        Args:
+            frequency: Carrier frequency in Hz
+            pattern: Alternating mark/space durations in microseconds
+        """
+        duration = sum(pattern)
+        if self.fail:
+            raise RuntimeError("Emitter failure")
+        if self.max_duration and duration > self.max_duration:
+            raise ValueError(f"Pattern of {duration} us exceeds {self.max_duration} us")
+        if self.max_length and len(pattern) > self.max_length:
+            raise ValueError(f"Pattern of {len(pattern)} durations exceeds {self.max_length}")
+
+        self.calls.append({'time': time.monotonic(), 'frequency': frequency,
+                           'pattern': list(pattern)})
+        if self.log:
+            print(f"Simulating IR transmission: Frequency={frequency}Hz, Pattern={pattern}")
+        if self.realtime:
+            time.sleep(duration / 1e6)
+
+
+def compile_bursts(steps, max_duration=None, max_length=None, coalesce=True,
+                   max_coalesce_gap=DEFAULT_MAX_COALESCE_GAP):
+    """
+    Compile macro steps into emitter calls.
+
+    Args:
+        steps: List of step dictionaries with 'frequency' (Hz), 'pattern'
+            (microseconds), optional 'repeat' (times sent, default 1),
+            'interval' (space between repeats in microseconds), 'delay'
+            (wait after the step in microseconds) and 'coalesce' (False to
+            keep the step in emitter calls of its own)
+        max_duration: Longest emitter call in microseconds, or None
+        max_length: Most durations in an emitter call, or None
+        coalesce: Whether adjacent frames may share an emitter call
+        max_coalesce_gap: Longest gap in microseconds sent as a space
+
+    Returns:
+        List of burst dictionaries with 'offset' (scheduled start in seconds
+        from the start of the macro), 'frequency', 'pattern' and 'frames'
+    """
+    # Flatten into frames with the gap that follows each
+    frames = []
+    for step in steps:
+        pattern = [int(duration) for duration in step['pattern']]
+        if len(pattern) % 2 == 0:
+            pattern = pattern[:-1]  # Trailing space is part of the gap
+        if not pattern:
+            continue
+
+        repeat = max(int(step.get('repeat') or 1), 1)
+        interval = int(step.get('interval') or DEFAULT_REPEAT_GAP)
+        for index in range(repeat):
+            gap = interval if index < repeat - 1 else int(step.get('delay') or 0)
+            for piece, piece_gap in _split(pattern, gap, max_duration, max_length):
+                frames.append({
+                    'frequency': step['frequency'],
+                    'pattern': piece,
+                    'gap': piece_gap,
+                    'coalesce': coalesce and step.get('coalesce', True)
+                })
+
+    bursts = []
+    offset = 0
+    current = None
+    for frame in frames:
+        if current is not None:
+            gap = current['gap']
+            combined = len(current['pattern']) + 1 + len(frame['pattern'])
+            duration = sum(current['pattern']) + gap + sum(frame['pattern'])
+            if (current['coalesce'] and frame['coalesce'] and
+                    frame['frequency'] == current['frequency'] and
+                    gap <= max_coalesce_gap and
+                    (not max_duration or duration <= max_duration) and
+                    (not max_length or combined <= max_length)):
+                current['pattern'].extend([gap] + frame['pattern'])
+                current['gap'] = frame['gap']
+                current['frames'] += 1
+                continue
+
+            offset += sum(current['pattern']) + current['gap']
+
+        current = dict(frame, pattern=list(frame['pattern']), frames=1)
+        current['offset'] = offset / 1e6
+        bursts.append(current)
+
+    for burst in bursts:
+        del burst['gap'], burst['coalesce']
+    return bursts
+
+
+def _split(pattern, gap, max_duration, max_length):
+    """
+    Split a frame that exceeds the emitter limits at its spaces.
+
+    Args:
+        pattern: Mark/space durations ending with a mark
+        gap: Gap after the frame in microseconds
+        max_duration: Longest emitter call in microseconds, or None
+        max_length: Most durations in an emitter call, or None
+
+    Returns:
+        List of (pattern, gap) pieces; the space at each cut becomes the
+        gap after the piece
+    """
+    if ((not max_duration or sum(pattern) <= max_duration) and
+            (not max_length or len(pattern) <= max_length)):
+        return [(pattern, gap)]
+
+    pieces = []
+    start = 0
+    duration = 0
+    for index in range(0, len(pattern), 2):
+        mark = pattern[index]
+        if max_duration and mark > max_duration:
+            raise ValueError(f"Mark of {mark} us exceeds the emitter limit")
+
+        # Cut before this mark if adding it would exceed a limit
+        length = index - start + 1
+        if index > start and ((max_duration and duration + mark > max_duration) or
+                              (max_length and length > max_length)):
+            pieces.append((pattern[start:index - 1], pattern[index - 1]))
+            start = index
+            duration = 0
+
+        duration += mark
+        if index + 1 < len(pattern):
+            duration += pattern[index + 1]
+
+    pieces.append((pattern[start:], gap))
+    return pieces
+
+
+class IRTransmitter:
+    """
+    Transmit queue sending macros one after another on a worker thread.
+    """
+    def __init__(self, emitter, coalesce=True, max_coalesce_gap=DEFAULT_MAX_COALESCE_GAP):
+        """
+        Initialize the transmitter.
+
+        Args:
+            emitter: Object with transmit(frequency, pattern) and optional
+                max_duration and max_length limits (see FakeEmitter)
+            coalesce: Whether adjacent frames may share an emitter call
+            max_coalesce_gap: Longest gap in microseconds sent as a space
+        """
+        self.emitter = emitter
+        self.coalesce = coalesce
+        self.max_coalesce_gap = max_coalesce_gap
+
+        self.jobs = 0
+        self.failures = 0
+        self.bursts = 0
+        self.frames = 0
+        self.max_late = 0.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, steps, callback=None):
+        """
+        Queue a macro for sending.
+
+        Args:
+            steps: List of step dictionaries (see compile_bursts())
+            callback: Optional function called with the timing report
+
+        Returns:
+            Future resolving to the timing report (see _run())
+        """
+        future = Future()
+        if callback:
+            future.add_done_callback(lambda f: None if f.cancelled() else callback(f.result()))
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name='ir-transmit')
+                self._thread.daemon = True
+                self._thread.start()
+
+        self._queue.put((steps, future))
+        return future
+
+    def pending(self):
+        """
+        Get the number of queued macros not yet started.
+
+        Returns:
+            Number of queued macros
+        """
+        return self._queue.qsize()
+
+    def cancel_all(self):
+        """
+        Cancel all queued macros that have not started.
+
+        Returns:
+            Number of macros cancelled
+        """
+        cancelled = 0
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                return cancelled
+            if future.cancel():
+                cancelled += 1
+
+    def get_stats(self):
+        """
+        Get transmitter counters.
+
+        Returns:
+            Dictionary with jobs, failures, bursts (emitter calls), frames
+            and max_late (worst lateness of a burst start in seconds)
+        """
+        return {
+            'jobs': self.jobs,
+            'failures': self.failures,
+            'bursts': self.bursts,
+            'frames': self.frames,
+            'max_late': self.max_late,
+            'pending': self.pending()
+        }
+
+    def _worker(self):
+        """Worker loop sending queued macros in order."""
+        while True:
+            steps, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self._run(steps))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run(self, steps):
+        """
+        Send one macro.
+
+        Args:
+            steps: List of step dictionaries
+
+        Returns:
+            Timing report dictionary with success, error, frames, requested
+            and actual total durations in seconds, max_late (worst lateness
+            of a burst start in seconds) and per-burst 'bursts' entries with
+            requested and actual start offsets and durations
+        """
+        report = {'success': True, 'error': None, 'frames': 0, 'bursts': [],
+                  'requested_duration': 0.0, 'actual_duration': 0.0, 'max_late': 0.0}
+
+        try:
+            bursts = compile_bursts(steps, getattr(self.emitter, 'max_duration', None),
+                                    getattr(self.emitter, 'max_length', None),
+                                    self.coalesce, self.max_coalesce_gap)
+        except Exception as e:
+            print(f"IR macro error: {str(e)}")
+            report.update(success=False, error=str(e))
+            self.failures += 1
+            return report
+
+        start = time.monotonic()
+        for burst in bursts:
+            # Wait for the scheduled start of the burst
+            delay = start + burst['offset'] - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            sent_at = time.monotonic()
+            try:
+                self.emitter.transmit(burst['frequency'], burst['pattern'])
+            except Exception as e:
+                print(f"IR transmit error: {str(e)}")
+                report.update(success=False, error=str(e))
+                break
+            finished_at = time.monotonic()
+
+            late = max(sent_at - start - burst['offset'], 0.0)
+            report['bursts'].append({
+                'frequency': burst['frequency'],
+                'frames': burst['frames'],
+                'requested_start': burst['offset'],
+                'actual_start': sent_at - start,
+                'requested_duration': sum(burst['pattern']) / 1e6,
+                'actual_duration': finished_at - sent_at
+            })
+            report['frames'] += burst['frames']
+            report['max_late'] = max(report['max_late'], late)
+
+        if bursts:
+            last = bursts[-1]
+            report['requested_duration'] = last['offset'] + sum(last['pattern']) / 1e6
+        report['actual_duration'] = time.monotonic() - start
+
+        self.jobs += 1
+        self.bursts += len(report['bursts'])
+        self.frames += report['frames']
+        self.max_late = max(self.max_late, report['max_late'])
+        if not report['success']:
+            self.failures += 1
+        return report
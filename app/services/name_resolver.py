@@ -0,0 +1,236 @@
+"""
+Name resolver implementation for Signal Catcher app.
+Resolves remote device names asynchronously against a persistent cache.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.services.cache import TTLCache
+
+# Number of concurrent remote name requests
+DEFAULT_MAX_WORKERS = 2
+
+# How long a resolved name is trusted (seconds)
+DEFAULT_NAME_TTL = 7 * 24 * 3600.0
+
+# How long a failed lookup suppresses new requests for the address (seconds)
+DEFAULT_NEGATIVE_TTL = 300.0
+
+# Minimum time between writes of the cache file (seconds)
+SAVE_INTERVAL = 30.0
+
+# Cached value recording that a lookup failed
+NO_NAME = ''
+
+
+class NameResolver:
+    """
+    Asynchronous remote name resolution with bounded concurrency.
+
+    Resolved names are kept in an address -> name cache that is persisted
+    to disk. Failed lookups are cached for a shorter time so unreachable
+    devices are not queried on every sighting.
+    """
+    def __init__(self, backend, max_workers=DEFAULT_MAX_WORKERS, ttl=DEFAULT_NAME_TTL,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL, cache_path=None):
+        """
+        Initialize the name resolver.
+
+        Args:
+            backend: Object providing lookup_name(address) -> name or None
+            max_workers: Maximum number of concurrent lookups
+            ttl: Lifetime of resolved names in seconds
+            negative_ttl: Lifetime of failed lookups in seconds
+            cache_path: Optional file used to persist the cache
+        """
+        self.backend = backend
+        self.negative_ttl = negative_ttl
+        self.cache_path = cache_path
+        self.cache = TTLCache(ttl, max_size=16384)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='name')
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.time()
+
+        if cache_path:
+            self.cache.load(cache_path)
+
+    def get_cached(self, address):
+        """
+        Get the cached name of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            The name, NO_NAME if the last lookup failed, or None if unknown
+        """
+        return self.cache.get(address)
+
+    def remember(self, address, name):
+        """
+        Store a name reported by the platform during discovery.
+
+        Args:
+            address: Device address
+            name: Device name
+        """
+        if name and self.cache.get(address) != name:
+            self.cache.set(address, name)
+            self._mark_dirty()
+
+    def resolve(self, address, callback=None):
+        """
+        Resolve the name of a device in the background.
+
+        Args:
+            address: Device address
+            callback: Optional function called with (address, name), where
+                name is None if it could not be resolved
+
+        Returns:
+            Future resolving to the name or None
+        """
+        cached = self.cache.get(address)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached or None)
+            if callback:
+                callback(address, future.result())
+            return future
+
+        with self._lock:
+            future = self._pending.get(address)
+            started = future is None
+            if started:
+                future = self.executor.submit(self._lookup, address)
+                self._pending[address] = future
+
+        # Registered outside the lock: a lookup that already finished runs
+        # the callback immediately, and _finish() takes the lock itself
+        if started:
+            future.add_done_callback(lambda f: self._finish(address))
+
+        if callback:
+            future.add_done_callback(lambda f: callback(address, f.result()))
+
+        return future
+
+    def save(self):
+        """
+        Persist the cache if it changed.
+
+        Returns:
+            Boolean indicating if the cache was written
+        """
+        if not self.cache_path or not self._dirty:
+            return False
+
+        self._dirty = False
+        self._last_save = time.time()
+        return self.cache.save(self.cache_path)
+
+    def shutdown(self, wait=False):
+        """
+        Stop the worker pool and persist the cache.
+
+        Args:
+            wait: Whether to wait for running lookups to finish
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+        self.save()
+
+    def _lookup(self, address):
+        """
+        Request the name of a device from the backend.
+
+        Args:
+            address: Device address
+
+        Returns:
+            The name or None
+        """
+        try:
+            name = self.backend.lookup_name(address)
+        except Exception as e:
+            print(f"Name lookup error for {address}: {str(e)}")
+            name = None
+
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', 'replace')
+
+        if name:
+            self.cache.set(address, name)
+        else:
+            self.cache.set(address, NO_NAME, self.negative_ttl)
+        self._mark_dirty()
+
+        return name or None
+
+    def _mark_dirty(self):
+        """Flag the cache as changed and save it if the last save is old enough."""
+        self._dirty = True
+        if time.time() - self._last_save >= SAVE_INTERVAL:
+            self.save()
+
+    def _finish(self, address):
+        """Forget the in-flight lookup of an address."""
+        with self._lock:
+            self._pending.pop(address, None)
+
+
+class PyBluezNameBackend:
+    """
+    Name lookup backend using PyBluez (non-Android platforms).
+    """
+    def __init__(self, timeout=10):
+        """
+        Initialize the PyBluez backend.
+
+        Args:
+            timeout: Remote name request timeout in seconds
+        """
+        self.timeout = timeout
+
+    def lookup_name(self, address):
+        """
+        Request the remote name of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            The name or None
+        """
+        import bluetooth
+
+        return bluetooth.lookup_name(address, timeout=self.timeout)
+
+
+class AndroidNameBackend:
+    """
+    Name lookup backend reading the name cached by the Android stack.
+    """
+    def __init__(self, adapter):
+        """
+        Initialize the Android backend.
+
+        Args:
+            adapter: The android.bluetooth.BluetoothAdapter instance
+        """
+        self.adapter = adapter
+
+    def lookup_name(self, address):
+        """
+        Get the name of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            The name or None
+        """
+        return self.adapter.getRemoteDevice(address).getName()
@@ -0,0 +1,253 @@
+"""
+OUI vendor lookup implementation for Signal Catcher app.
+Resolves device vendors from a memory-mapped, sorted binary OUI table.
+
+The table is not kept in the repository; it is built from the IEEE MA-L
+registry text file (oui.txt) before packaging the app with:
+
+    python -m app.services.oui_lookup
+
+which downloads the registry and writes app/data/oui.bin, or from a local
+copy with:
+
+    python -m app.services.oui_lookup oui.txt app/data/oui.bin
+"""
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import urllib.request
+
+# File identifying the table format
+OUI_MAGIC = b'SCOUI001'
+
+# Header: magic, record count, record size
+HEADER_FORMAT = '>8sIH2x'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Record: 3-byte OUI followed by the NUL padded UTF-8 vendor name
+OUI_SIZE = 3
+DEFAULT_RECORD_SIZE = 48
+
+# Default location of the table shipped with the app
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'oui.bin')
+
+# IEEE MA-L registry in text form
+REGISTRY_URL = 'https://standards-oui.ieee.org/oui/oui.txt'
+
+# Registry lines such as "00-1A-7D   (hex)   cyber-blue(HK)Ltd"
+REGISTRY_LINE = re.compile(
+    r'^\s*([0-9A-Fa-f]{2})[-:]?([0-9A-Fa-f]{2})[-:]?([0-9A-Fa-f]{2})\s+'
+    r'\((?:hex|base 16)\)\s*(.*?)\s*$')
+
+
+def parse_oui(address):
+    """
+    Get the OUI of a MAC address.
+
+    Args:
+        address: Address such as 'AA:BB:CC:DD:EE:FF' or 'AA-BB-CC'
+
+    Returns:
+        The OUI as 3 bytes, or None if the address is invalid or locally
+        administered (randomized addresses carry no vendor)
+    """
+    digits = re.sub(r'[^0-9A-Fa-f]', '', address or '')[:6]
+    if len(digits) < 6:
+        return None
+
+    oui = bytes.fromhex(digits)
+    if oui[0] & 0x02:
+        return None
+
+    return oui
+
+
+class OUIIndex:
+    """
+    Vendor lookup over a memory-mapped OUI table.
+
+    The table holds fixed-width records sorted by OUI, so a lookup is a
+    binary search over the mapped file; only the pages touched are read
+    and no per-entry objects are created.
+    """
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        """
+        Initialize the index.
+
+        Args:
+            path: Table file written by build_index()
+        """
+        self.path = path
+        self.count = 0
+        self.record_size = DEFAULT_RECORD_SIZE
+        self.available = None
+        self._file = None
+        self._map = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        """
+        Map the table file.
+
+        Returns:
+            Boolean indicating if the table is usable
+        """
+        with self._lock:
+            if self._map is not None:
+                return True
+
+            try:
+                self._file = open(self.path, 'rb')
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+                magic, count, record_size = struct.unpack_from(HEADER_FORMAT, self._map)
+                if magic != OUI_MAGIC or len(self._map) < HEADER_SIZE + count * record_size:
+                    raise ValueError(f"Invalid OUI table {self.path}")
+
+                self.count = count
+                self.record_size = record_size
+                self.available = True
+                return True
+
+            except Exception as e:
+                print(f"Error opening OUI table: {str(e)}")
+                self._close()
+                self.available = False
+                return False
+
+    def close(self):
+        """Unmap the table file."""
+        with self._lock:
+            self._close()
+
+    def lookup(self, address):
+        """
+        Get the vendor of a device.
+
+        Args:
+            address: Device MAC address
+
+        Returns:
+            The vendor name or None if unknown
+        """
+        oui = parse_oui(address)
+        if oui is None:
+            return None
+
+        # A missing table is only reported once rather than on every sighting
+        if self._map is None and (self.available is False or not self.open()):
+            return None
+
+        data = self._map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER_SIZE + middle * self.record_size
+            key = data[offset:offset + OUI_SIZE]
+
+            if key < oui:
+                low = middle + 1
+            elif key > oui:
+                high = middle
+            else:
+                name = data[offset + OUI_SIZE:offset + self.record_size]
+                return name.rstrip(b'\0').decode('utf-8', 'replace') or None
+
+        return None
+
+    def __len__(self):
+        """Return the number of vendors in the table."""
+        if self._map is None and self.available is not False:
+            self.open()
+        return self.count
+
+    def _close(self):
+        """Release the mapping and file."""
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = None
+        self._file = None
+        self.count = 0
+
+
+def build_index(source_path, output_path, record_size=DEFAULT_RECORD_SIZE):
+    """
+    Convert the IEEE registry text file into an OUI table.
+
+    Vendor names longer than the record are truncated on a character
+    boundary. When an OUI is listed twice the first entry is kept.
+
+    Args:
+        source_path: IEEE oui.txt file
+        output_path: Destination table file
+        record_size: Size of each record in bytes
+
+    Returns:
+        Number of vendors written
+    """
+    vendors = {}
+    with open(source_path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = REGISTRY_LINE.match(line)
+            if match and match.group(4):
+                oui = bytes.fromhex(''.join(match.group(1, 2, 3)))
+                vendors.setdefault(oui, match.group(4))
+
+    name_size = record_size - OUI_SIZE
+
+    # Write to a temporary file first so a reader never maps a partial table
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, OUI_MAGIC, len(vendors), record_size))
+        for oui in sorted(vendors):
+            name = vendors[oui].encode('utf-8')[:name_size]
+            name = name.decode('utf-8', 'ignore').encode('utf-8')
+            f.write(oui + name.ljust(name_size, b'\0'))
+    os.replace(temp_path, output_path)
+
+    return len(vendors)
+
+
+def fetch_registry(output_path, url=REGISTRY_URL, timeout=60):
+    """
+    Download the IEEE registry text file.
+
+    Args:
+        output_path: Destination file
+        url: Registry URL
+        timeout: Network timeout in seconds
+    """
+    request = urllib.request.Request(url, headers={'User-Agent': 'SignalCatcher'})
+    with urllib.request.urlopen(request, timeout=timeout) as response, \
+            open(output_path, 'wb') as f:
+        shutil.copyfileobj(response, f)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (1, 3):
+        print("Usage: python -m app.services.oui_lookup [<oui.txt or URL> <oui.bin>]")
+        sys.exit(1)
+
+    source, output = (sys.argv[1], sys.argv[2]) if len(sys.argv) == 3 else \
+        (REGISTRY_URL, DEFAULT_INDEX_PATH)
+
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if source.startswith(('http://', 'https://')):
+            print(f"Downloading {source}")
+            path = os.path.join(temp_dir, 'oui.txt')
+            fetch_registry(path, source)
+            source = path
+
+        print(f"Wrote {build_index(source, output)} vendors to {output}")
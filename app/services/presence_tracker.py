@@ -0,0 +1,362 @@
+"""
+Presence tracker implementation for Signal Catcher app.
+Tracks which devices are in range and expires absent ones with a timing wheel.
+"""
+import math
+import threading
+import time
+
+# Default time without sightings after which a device counts as departed (seconds)
+DEFAULT_ABSENCE_TIMEOUT = 300.0
+
+# Default granularity of departure times (seconds)
+DEFAULT_RESOLUTION = 1.0
+
+# Timing wheel shape; 4 levels of 64 slots cover 64^4 ticks (194 days at 1 s)
+WHEEL_SLOTS = 64
+WHEEL_LEVELS = 4
+
+EVENT_ARRIVE = 'arrive'
+EVENT_DEPART = 'depart'
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel.
+
+    Timers are placed in the slot of the coarsest level whose span covers
+    them and move down a level each time their slot comes around, so
+    scheduling, cancelling and expiring a timer are O(1) regardless of the
+    number of timers. Timers too far in the future wait in the top level
+    and are re-placed when their slot comes around.
+    """
+    def __init__(self, resolution=DEFAULT_RESOLUTION, slots=WHEEL_SLOTS,
+                 levels=WHEEL_LEVELS, start=None):
+        """
+        Initialize the timing wheel.
+
+        Args:
+            resolution: Duration of one tick in seconds
+            slots: Number of slots per level
+            levels: Number of levels
+            start: Current time in seconds (defaults to time.time())
+        """
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.current = self._to_tick(time.time() if start is None else start)
+
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._locations = {}
+
+    def schedule(self, key, deadline):
+        """
+        Schedule a timer, replacing any timer already set for the key.
+
+        Args:
+            key: Hashable timer key
+            deadline: Expiry time in seconds
+        """
+        self.cancel(key)
+        self._insert(key, max(math.ceil(deadline / self.resolution), self.current + 1))
+
+    def cancel(self, key):
+        """
+        Cancel a timer.
+
+        Args:
+            key: Timer key
+
+        Returns:
+            Boolean indicating if a timer was cancelled
+        """
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+
+        level, slot = location
+        del self._wheels[level][slot][key]
+        return True
+
+    def advance(self, now):
+        """
+        Move the wheel forward and collect the timers that expired.
+
+        Args:
+            now: Current time in seconds
+
+        Returns:
+            List of expired timer keys
+        """
+        target = self._to_tick(now)
+        expired = []
+
+        while self.current < target:
+            # Nothing to expire; jump straight to the target
+            if not self._locations:
+                self.current = target
+                break
+
+            self.current += 1
+
+            # Bring timers down from the coarser levels whose slot came around
+            for level in range(self.levels - 1, 0, -1):
+                span = self.slots ** level
+                if self.current % span == 0:
+                    self._cascade(level, (self.current // span) % self.slots)
+
+            bucket = self._wheels[0][self.current % self.slots]
+            if bucket:
+                self._wheels[0][self.current % self.slots] = {}
+                for key, tick in bucket.items():
+                    del self._locations[key]
+                    if tick <= self.current:
+                        expired.append(key)
+                    else:
+                        self._insert(key, tick)
+
+        return expired
+
+    def __contains__(self, key):
+        """Check whether a timer is set for a key."""
+        return key in self._locations
+
+    def __len__(self):
+        """Return the number of pending timers."""
+        return len(self._locations)
+
+    def _to_tick(self, seconds):
+        """Convert a time in seconds to a tick number."""
+        return int(seconds // self.resolution)
+
+    def _insert(self, key, tick):
+        """
+        Place a timer in the slot matching its distance from the current tick.
+
+        Args:
+            key: Timer key
+            tick: Expiry tick
+        """
+        delta = tick - self.current
+        position = tick
+
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1):
+                break
+        else:
+            # Beyond the wheel's range; park it in the farthest top-level slot
+            level = self.levels - 1
+            position = self.current + self.slots ** self.levels - 1
+
+        slot = (position // self.slots ** level) % self.slots
+        self._wheels[level][slot][key] = tick
+        self._locations[key] = (level, slot)
+
+    def _cascade(self, level, slot):
+        """
+        Re-place the timers of a slot into finer levels.
+
+        Args:
+            level: Level of the slot
+            slot: Slot index
+        """
+        bucket = self._wheels[level][slot]
+        if not bucket:
+            return
+
+        self._wheels[level][slot] = {}
+        for key, tick in bucket.items():
+            del self._locations[key]
+            self._insert(key, tick)
+
+
+class PresenceTracker:
+    """
+    Tracker of the devices currently in range.
+
+    Sightings update each device's first-seen/last-seen times. Every present
+    device has one departure timer on a TimingWheel; sightings do not touch
+    the timer, and when it fires a device seen in the meantime is simply
+    rescheduled, so the cost per tick depends on the departures due rather
+    than on the number of tracked devices.
+    """
+    def __init__(self, absence_timeout=DEFAULT_ABSENCE_TIMEOUT, resolution=DEFAULT_RESOLUTION,
+                 on_event=None, start=None):
+        """
+        Initialize the presence tracker.
+
+        Args:
+            absence_timeout: Seconds without sightings before a device departs
+            resolution: Granularity of departure times in seconds
+            on_event: Optional function called with each arrive/depart event
+            start: Current time in seconds (defaults to time.time())
+        """
+        self.absence_timeout = absence_timeout
+        self.on_event = on_event
+        self.arrivals = 0
+        self.departures = 0
+
+        self._devices = {}
+        self._wheel = TimingWheel(resolution, start=start)
+        self._lock = threading.Lock()
+
+    def observe(self, device, now=None):
+        """
+        Record a device sighting.
+
+        Args:
+            device: Dictionary containing device information
+            now: Sighting time (defaults to the device timestamp or time.time())
+
+        Returns:
+            Boolean indicating if the device just arrived
+        """
+        address = device.get('address')
+        if not address:
+            return False
+
+        if now is None:
+            now = device.get('timestamp') or time.time()
+
+        with self._lock:
+            entry = self._devices.get(address)
+            if entry is not None:
+                entry['last_seen'] = max(entry['last_seen'], now)
+                entry['sightings'] += 1
+                if device.get('name'):
+                    entry['name'] = device['name']
+                return False
+
+            entry = {
+                'address': address,
+                'name': device.get('name'),
+                'first_seen': now,
+                'last_seen': now,
+                'sightings': 1
+            }
+            self._devices[address] = entry
+            self._wheel.schedule(address, now + self.absence_timeout)
+            self.arrivals += 1
+            event = self._make_event(EVENT_ARRIVE, entry, now)
+
+        self._emit([event])
+        return True
+
+    def observe_many(self, devices, now=None):
+        """
+        Record the sightings of a scan tick.
+
+        Args:
+            devices: List of device dictionaries
+            now: Optional sighting time applied to all devices
+
+        Returns:
+            Number of devices that just arrived
+        """
+        return sum(1 for device in devices if self.observe(device, now))
+
+    def tick(self, now=None):
+        """
+        Expire the devices whose absence timeout has passed.
+
+        Args:
+            now: Current time in seconds (defaults to time.time())
+
+        Returns:
+            List of depart events
+        """
+        if now is None:
+            now = time.time()
+
+        events = []
+        with self._lock:
+            for address in self._wheel.advance(now):
+                entry = self._devices[address]
+                deadline = entry['last_seen'] + self.absence_timeout
+
+                if deadline > now:
+                    # Seen again since the timer was set
+                    self._wheel.schedule(address, deadline)
+                    continue
+
+                del self._devices[address]
+                self.departures += 1
+                events.append(self._make_event(EVENT_DEPART, entry, deadline))
+
+        self._emit(events)
+        return events
+
+    def is_present(self, address):
+        """
+        Check whether a device is in range.
+
+        Args:
+            address: Device address
+
+        Returns:
+            Boolean indicating if the device is present
+        """
+        with self._lock:
+            return address in self._devices
+
+    def get(self, address):
+        """
+        Get the presence entry of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            Dictionary with address, name, first_seen, last_seen and
+            sightings, or None if the device is not present
+        """
+        with self._lock:
+            entry = self._devices.get(address)
+            return dict(entry) if entry else None
+
+    def get_present(self):
+        """
+        Get the presence entries of all devices in range.
+
+        Returns:
+            List of presence entry dictionaries
+        """
+        with self._lock:
+            return [dict(entry) for entry in self._devices.values()]
+
+    def __len__(self):
+        """Return the number of devices in range."""
+        return len(self._devices)
+
+    def _make_event(self, event_type, entry, timestamp):
+        """
+        Build a presence event.
+
+        Args:
+            event_type: EVENT_ARRIVE or EVENT_DEPART
+            entry: Presence entry of the device
+            timestamp: Time of the event
+
+        Returns:
+            Event dictionary
+        """
+        event = dict(entry)
+        event['event'] = event_type
+        event['timestamp'] = timestamp
+        return event
+
+    def _emit(self, events):
+        """
+        Pass events to the event callback.
+
+        Args:
+            events: List of event dictionaries
+        """
+        if not self.on_event:
+            return
+
+        for event in events:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                print(f"Error handling presence event: {str(e)}")
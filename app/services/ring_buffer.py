@@ -0,0 +1,159 @@
+"""
+Bounded ring buffer for Signal Catcher app.
+Hands captured signals from listener threads to consumers draining them in batches.
+
+The buffer holds a fixed number of slots allocated up front. Producers
+never wait on consumers unless the block policy is chosen: when the buffer
+is full, either the oldest item is overwritten or the new item is rejected,
+and the loss is counted so consumers can report it.
+"""
+import threading
+import time
+
+# Overflow policies: overwrite the oldest item, reject the new item, or
+# make the producer wait for space
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+OVERFLOW_BLOCK = 'block'
+
+# Default number of slots
+DEFAULT_CAPACITY = 256
+
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO buffer between one or more producers and consumers.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, policy=OVERFLOW_DROP_OLDEST):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Number of items held before the overflow policy applies
+            policy: OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST or OVERFLOW_BLOCK
+        """
+        if capacity < 1:
+            raise ValueError(f"Capacity must be at least 1, not {capacity}")
+        if policy not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK):
+            raise ValueError(f"Unknown overflow policy {policy}")
+
+        self.capacity = capacity
+        self.policy = policy
+
+        self.added = 0
+        self.drained = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.high_water = 0
+
+        self._slots = [None] * capacity
+        self._head = 0  # Index of the oldest item
+        self._size = 0
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+
+    def __len__(self):
+        return self._size
+
+    def put(self, item, timeout=None):
+        """
+        Add an item, applying the overflow policy if the buffer is full.
+
+        Args:
+            item: Item to add
+            timeout: Longest wait for space in seconds under OVERFLOW_BLOCK
+                (None to wait indefinitely)
+
+        Returns:
+            Boolean indicating if the item was added (False if it was
+            rejected, or the wait for space timed out)
+        """
+        with self._lock:
+            if self._size == self.capacity:
+                self.overflows += 1
+
+                if self.policy == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+
+                if self.policy == OVERFLOW_DROP_OLDEST:
+                    # Overwrite the oldest slot and advance past it
+                    self._slots[self._head] = item
+                    self._head = (self._head + 1) % self.capacity
+                    self.added += 1
+                    self.dropped += 1
+                    return True
+
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while self._size == self.capacity:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._not_full.wait(remaining)
+
+            self._slots[(self._head + self._size) % self.capacity] = item
+            self._size += 1
+            self.added += 1
+            self.high_water = max(self.high_water, self._size)
+            return True
+
+    def drain(self, max_items=None):
+        """
+        Remove the oldest items.
+
+        Args:
+            max_items: Most items removed (None for all)
+
+        Returns:
+            List of items, oldest first
+        """
+        with self._lock:
+            count = self._size if max_items is None else min(max_items, self._size)
+            items = []
+            for _ in range(count):
+                items.append(self._slots[self._head])
+                self._slots[self._head] = None
+                self._head = (self._head + 1) % self.capacity
+            self._size -= count
+            self.drained += count
+
+            if count:
+                self._not_full.notify_all()
+            return items
+
+    def clear(self):
+        """
+        Discard all items without counting them as drained.
+
+        Returns:
+            Number of items discarded
+        """
+        with self._lock:
+            count = self._size
+            self._slots = [None] * self.capacity
+            self._head = 0
+            self._size = 0
+
+            if count:
+                self._not_full.notify_all()
+            return count
+
+    def get_stats(self):
+        """
+        Get buffer counters.
+
+        Returns:
+            Dictionary with capacity, size, added, drained, dropped (items
+            lost to the overflow policy), overflows (puts that found the
+            buffer full) and high_water (largest size reached)
+        """
+        with self._lock:
+            return {
+                'capacity': self.capacity,
+                'size': self._size,
+                'added': self.added,
+                'drained': self.drained,
+                'dropped': self.dropped,
+                'overflows': self.overflows,
+                'high_water': self.high_water
+            }
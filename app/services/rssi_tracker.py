@@ -0,0 +1,248 @@
+"""
+RSSI tracker implementation for Signal Catcher app.
+Smooths RSSI and estimates distance for all tracked devices with NumPy.
+"""
+import threading
+import time
+
+import numpy as np
+
+# Initial number of device slots (grows as needed)
+DEFAULT_CAPACITY = 256
+
+# Expected RSSI at 1 m when the device does not advertise its TX power
+DEFAULT_REFERENCE_POWER = -59
+
+# Advertised TX power is specified at 0 m; free-space loss to 1 m is ~41 dB
+TX_POWER_TO_1M = 41
+
+
+class RSSITracker:
+    """
+    Tracker keeping per-device RSSI state in arrays.
+
+    Each update applies exponential smoothing, a 1-D Kalman filter and
+    log-distance path-loss estimation to every device of a scan tick in a
+    single vectorized pass.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, alpha=0.3, process_noise=1.0,
+                 measurement_noise=16.0, path_loss_exponent=2.0,
+                 reference_power=DEFAULT_REFERENCE_POWER):
+        """
+        Initialize the RSSI tracker.
+
+        Args:
+            capacity: Initial number of device slots
+            alpha: Weight of the newest sample in the exponential average
+            process_noise: Kalman process noise variance per second (dBm^2)
+            measurement_noise: Kalman measurement noise variance (dBm^2)
+            path_loss_exponent: Environment factor (2 in free space, 2.7-4 indoors)
+            reference_power: Default RSSI at 1 m in dBm
+        """
+        self.alpha = alpha
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.path_loss_exponent = path_loss_exponent
+        self.reference_power = reference_power
+
+        self._index = {}
+        self._addresses = []
+        self._free_slots = []
+        self._lock = threading.Lock()
+
+        self._raw = np.empty(0)
+        self._ema = np.empty(0)
+        self._estimate = np.empty(0)
+        self._variance = np.empty(0)
+        self._reference = np.empty(0)
+        self._distance = np.empty(0)
+        self._last_update = np.empty(0)
+        self._active = np.empty(0, dtype=bool)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """
+        Grow the state arrays, keeping the existing device state.
+
+        Args:
+            capacity: New number of device slots
+        """
+        size = len(self._addresses)
+
+        def grow(array, fill):
+            new_array = np.full(capacity, fill, dtype=array.dtype)
+            new_array[:size] = array[:size]
+            return new_array
+
+        self._raw = grow(self._raw, np.nan)
+        self._ema = grow(self._ema, np.nan)
+        self._estimate = grow(self._estimate, np.nan)
+        self._variance = grow(self._variance, np.nan)
+        self._reference = grow(self._reference, self.reference_power)
+        self._distance = grow(self._distance, np.nan)
+        self._last_update = grow(self._last_update, 0.0)
+        self._active = grow(self._active, False)
+
+    def _slot(self, address):
+        """
+        Get the array slot of an address, assigning one if needed.
+
+        Args:
+            address: Device address
+
+        Returns:
+            Integer slot index
+        """
+        slot = self._index.get(address)
+        if slot is not None:
+            return slot
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._addresses[slot] = address
+        else:
+            slot = len(self._addresses)
+            if slot >= len(self._raw):
+                self._allocate(len(self._raw) * 2)
+            self._addresses.append(address)
+
+        self._index[address] = slot
+        return slot
+
+    def update(self, devices, now=None):
+        """
+        Apply one scan tick of RSSI samples.
+
+        Devices without an RSSI reading are ignored. Each device dictionary
+        is annotated in place with 'rssi_smoothed' and 'distance'.
+
+        Args:
+            devices: List of device dictionaries from the scan tick
+            now: Time of the tick in seconds (defaults to time.time())
+        """
+        samples = [device for device in devices if device.get('rssi')]
+        if not samples:
+            return
+
+        now = now or time.time()
+
+        with self._lock:
+            slots = np.fromiter((self._slot(d['address']) for d in samples),
+                                dtype=np.intp, count=len(samples))
+            rssi = np.fromiter((d['rssi'] for d in samples),
+                               dtype=np.float64, count=len(samples))
+            reference = np.fromiter(
+                (d['tx_power'] - TX_POWER_TO_1M if d.get('tx_power') is not None
+                 else self.reference_power for d in samples),
+                dtype=np.float64, count=len(samples))
+
+            # Several samples for one device in a tick: keep the latest
+            unique_slots, last = np.unique(slots[::-1], return_index=True)
+            if len(unique_slots) != len(slots):
+                last = len(slots) - 1 - last
+                slots, rssi, reference = unique_slots, rssi[last], reference[last]
+
+            fresh = ~self._active[slots]
+            elapsed = np.maximum(now - self._last_update[slots], 0.0)
+
+            # Exponential moving average
+            ema = np.where(fresh, rssi,
+                           self.alpha * rssi + (1 - self.alpha) * self._ema[slots])
+
+            # Kalman filter with a random-walk model
+            predicted_variance = np.where(
+                fresh, self.measurement_noise,
+                self._variance[slots] + self.process_noise * elapsed)
+            predicted = np.where(fresh, rssi, self._estimate[slots])
+            gain = np.where(fresh, 1.0,
+                            predicted_variance / (predicted_variance + self.measurement_noise))
+            estimate = predicted + gain * (rssi - predicted)
+            variance = np.where(fresh, self.measurement_noise,
+                                (1 - gain) * predicted_variance)
+
+            # Log-distance path loss model
+            distance = 10 ** ((reference - estimate) / (10 * self.path_loss_exponent))
+
+            self._raw[slots] = rssi
+            self._ema[slots] = ema
+            self._estimate[slots] = estimate
+            self._variance[slots] = variance
+            self._reference[slots] = reference
+            self._distance[slots] = distance
+            self._last_update[slots] = now
+            self._active[slots] = True
+
+            for device in samples:
+                slot = self._index[device['address']]
+                device['rssi_smoothed'] = float(self._estimate[slot])
+                device['distance'] = float(self._distance[slot])
+
+    def get(self, address):
+        """
+        Get the tracked state of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            Dictionary with rssi, rssi_ema, rssi_smoothed, distance and
+            last_update, or None if the device is not tracked
+        """
+        with self._lock:
+            slot = self._index.get(address)
+            if slot is None or not self._active[slot]:
+                return None
+
+            return {
+                'rssi': float(self._raw[slot]),
+                'rssi_ema': float(self._ema[slot]),
+                'rssi_smoothed': float(self._estimate[slot]),
+                'distance': float(self._distance[slot]),
+                'last_update': float(self._last_update[slot])
+            }
+
+    def get_all(self):
+        """
+        Get the tracked state of every device.
+
+        Returns:
+            Dictionary mapping addresses to their tracked state
+        """
+        with self._lock:
+            return {address: {
+                        'rssi': float(self._raw[slot]),
+                        'rssi_ema': float(self._ema[slot]),
+                        'rssi_smoothed': float(self._estimate[slot]),
+                        'distance': float(self._distance[slot]),
+                        'last_update': float(self._last_update[slot])
+                    } for address, slot in self._index.items()}
+
+    def prune(self, max_age, now=None):
+        """
+        Stop tracking devices that have not been updated recently.
+
+        Args:
+            max_age: Maximum time since the last update in seconds
+            now: Current time in seconds (defaults to time.time())
+
+        Returns:
+            Number of devices removed
+        """
+        now = now or time.time()
+
+        with self._lock:
+            size = len(self._addresses)
+            stale = np.flatnonzero(self._active[:size] &
+                                   (now - self._last_update[:size] > max_age))
+
+            for slot in stale:
+                del self._index[self._addresses[slot]]
+                self._addresses[slot] = None
+                self._free_slots.append(int(slot))
+
+            self._active[stale] = False
+            return len(stale)
+
+    def __len__(self):
+        """Return the number of tracked devices."""
+        return len(self._index)
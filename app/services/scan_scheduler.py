@@ -0,0 +1,249 @@
+"""
+Scan scheduler implementation for Signal Catcher app.
+Runs Bluetooth scans continuously with duty cycling and adaptive intervals.
+"""
+import collections
+import threading
+import time
+
+# Number of recent timing decisions kept for the metrics
+DECISION_HISTORY = 50
+
+
+class ScanScheduler:
+    """
+    Scheduler running BluetoothService scans in the background.
+
+    Each cycle scans for scan_window seconds and then idles until the next
+    cycle starts. The interval between cycle starts shrinks while new devices
+    keep appearing and grows when a cycle finds nothing new. The scans are
+    cancelled through the scheduler's own stop event, so scans started or
+    cancelled elsewhere do not affect them.
+    """
+    def __init__(self, bluetooth_service, scan_window=4.0, min_interval=8.0,
+                 max_interval=120.0, backoff_factor=2.0, speedup_factor=2.0,
+                 novelty_ttl=300.0, scan_type='classic', on_device=None):
+        """
+        Initialize the scan scheduler.
+
+        Args:
+            bluetooth_service: BluetoothService used to run the scans
+            scan_window: Duration of each scan in seconds
+            min_interval: Shortest time between scan starts in seconds
+            max_interval: Longest time between scan starts in seconds
+            backoff_factor: Interval multiplier after a cycle with no new devices
+            speedup_factor: Interval divisor after a cycle with new devices
+            novelty_ttl: Seconds after which a returning device counts as new again
+            scan_type: 'classic' for inquiry scans or 'ble' for advertisement scans
+            on_device: Optional function called with every device sighting
+        """
+        self.bluetooth_service = bluetooth_service
+        self.scan_window = scan_window
+        self.min_interval = max(min_interval, scan_window)
+        self.max_interval = max(max_interval, self.min_interval)
+        self.backoff_factor = backoff_factor
+        self.speedup_factor = speedup_factor
+        self.novelty_ttl = novelty_ttl
+        self.scan_type = scan_type
+        self.on_device = on_device
+
+        self.interval = self.min_interval
+        self.running = False
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._last_seen = {}
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        """Reset the counters reported by get_metrics()."""
+        self.started_at = None
+        self.cycles = 0
+        self.scan_time = 0.0
+        self.sightings = 0
+        self.new_devices = 0
+        self.decisions = collections.deque(maxlen=DECISION_HISTORY)
+
+    def start(self):
+        """
+        Start scanning in the background.
+
+        Returns:
+            Boolean indicating if the scheduler was started
+        """
+        if self.running:
+            return False
+
+        self.running = True
+        self._stop_event.clear()
+        self._reset_metrics()
+        self.started_at = time.time()
+        self.interval = self.min_interval
+
+        self.thread = threading.Thread(target=self._run_process)
+        self.thread.daemon = True
+        self.thread.start()
+
+        return True
+
+    def stop(self):
+        """
+        Stop scanning, interrupting the scan in progress.
+
+        Returns:
+            Boolean indicating if the scheduler was stopped
+        """
+        if not self.running:
+            return False
+
+        self.running = False
+        self._stop_event.set()
+
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+        return True
+
+    def is_running(self):
+        """
+        Check if the scheduler is running.
+
+        Returns:
+            Boolean indicating if the scheduler is running
+        """
+        return self.running
+
+    def _run_process(self):
+        """Background process running scan cycles."""
+        try:
+            while not self._stop_event.is_set():
+                cycle_start = time.time()
+                devices, new_devices = self._run_cycle()
+                scan_duration = time.time() - cycle_start
+
+                if self._stop_event.is_set():
+                    break
+
+                self._update_interval(devices, new_devices, scan_duration)
+
+                # Idle for the rest of the interval
+                self._stop_event.wait(max(0, self.interval - scan_duration))
+
+        except Exception as e:
+            print(f"Scan scheduler error: {str(e)}")
+            self.running = False
+
+    def _run_cycle(self):
+        """
+        Run a single scan.
+
+        Returns:
+            Tuple of (devices seen, devices new to the scheduler)
+        """
+        counts = {'devices': 0, 'new': 0}
+
+        def on_device(device):
+            counts['devices'] += 1
+            if self._observe(device):
+                counts['new'] += 1
+            if self.on_device:
+                self.on_device(device)
+
+        start = time.time()
+
+        if self.scan_type == 'ble':
+            def on_batch(batch):
+                for device in batch:
+                    on_device(device)
+
+            self.bluetooth_service.scan_ble_devices(self.scan_window, callback=on_batch,
+                                                    cancel_event=self._stop_event)
+        else:
+            self.bluetooth_service.scan_devices(self.scan_window, callback=on_device,
+                                                cancel_event=self._stop_event)
+
+        # Expire departed devices and store the presence events
+        self.bluetooth_service.update_presence()
+
+        # Forget devices that have not been seen for a while
+        cutoff = time.time() - self.novelty_ttl
+        self._last_seen = {a: t for a, t in self._last_seen.items() if t >= cutoff}
+
+        with self._lock:
+            self.cycles += 1
+            self.scan_time += time.time() - start
+            self.sightings += counts['devices']
+            self.new_devices += counts['new']
+
+        return counts['devices'], counts['new']
+
+    def _observe(self, device):
+        """
+        Record a sighting and check whether the device is new.
+
+        Args:
+            device: Dictionary containing device information
+
+        Returns:
+            Boolean indicating if the device was not seen within novelty_ttl
+        """
+        now = time.time()
+        address = device.get('address')
+        last_seen = self._last_seen.get(address)
+        self._last_seen[address] = now
+
+        return last_seen is None or now - last_seen > self.novelty_ttl
+
+    def _update_interval(self, devices, new_devices, scan_duration):
+        """
+        Choose the interval before the next scan.
+
+        Args:
+            devices: Number of devices seen in the last scan
+            new_devices: Number of new devices seen in the last scan
+            scan_duration: Actual duration of the last scan in seconds
+        """
+        previous = self.interval
+
+        if new_devices > 0:
+            self.interval = max(self.min_interval, self.interval / self.speedup_factor)
+            reason = 'new_devices'
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+            reason = 'no_new_devices'
+
+        with self._lock:
+            self.decisions.append({
+                'timestamp': time.time(),
+                'scan_duration': scan_duration,
+                'devices': devices,
+                'new_devices': new_devices,
+                'previous_interval': previous,
+                'interval': self.interval,
+                'reason': reason
+            })
+
+    def get_metrics(self):
+        """
+        Get the scheduler's timing decisions and efficiency counters.
+
+        Returns:
+            Dictionary of metrics
+        """
+        with self._lock:
+            elapsed = time.time() - self.started_at if self.started_at else 0.0
+            return {
+                'running': self.running,
+                'cycles': self.cycles,
+                'elapsed': elapsed,
+                'scan_time': self.scan_time,
+                'duty_cycle': self.scan_time / elapsed if elapsed else 0.0,
+                'sightings': self.sightings,
+                'new_devices': self.new_devices,
+                'new_devices_per_scan_second': (
+                    self.new_devices / self.scan_time if self.scan_time else 0.0),
+                'scan_window': self.scan_window,
+                'interval': self.interval,
+                'decisions': list(self.decisions)
+            }
@@ -0,0 +1,197 @@
+"""
+Service discovery implementation for Signal Catcher app.
+Runs SDP queries for discovered devices on a bounded worker pool.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.services.cache import TTLCache
+
+# Number of concurrent SDP queries
+DEFAULT_MAX_WORKERS = 4
+
+# How long discovered services are reused before querying again (seconds)
+DEFAULT_SERVICE_TTL = 600.0
+
+# How long a failed query suppresses retries for the same device (seconds)
+DEFAULT_FAILURE_TTL = 60.0
+
+
+class ServiceDiscovery:
+    """
+    Concurrent SDP service discovery with a per-address TTL cache.
+    """
+    def __init__(self, backend, max_workers=DEFAULT_MAX_WORKERS,
+                 ttl=DEFAULT_SERVICE_TTL, failure_ttl=DEFAULT_FAILURE_TTL):
+        """
+        Initialize service discovery.
+
+        Args:
+            backend: Object providing find_services(address) -> list of dicts
+            max_workers: Maximum number of concurrent queries
+            ttl: Lifetime of cached results in seconds
+            failure_ttl: Time in seconds before a failed device is queried again
+        """
+        self.backend = backend
+        self.cache = TTLCache(ttl)
+        self.failures = TTLCache(failure_ttl)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='sdp')
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def discover(self, address, callback=None):
+        """
+        Discover the services of a device in the background.
+
+        Cached results are returned without querying the device again, and
+        concurrent requests for the same address share a single query.
+
+        Args:
+            address: Device address
+            callback: Optional function called with (address, services)
+
+        Returns:
+            Future resolving to the list of services
+        """
+        services = self.cache.get(address)
+        if services is not None or address in self.failures:
+            future = Future()
+            future.set_result(services or [])
+            if callback:
+                callback(address, future.result())
+            return future
+
+        with self._lock:
+            future = self._pending.get(address)
+            started = future is None
+            if started:
+                future = self.executor.submit(self._query, address)
+                self._pending[address] = future
+
+        # Registered outside the lock: a query that already finished runs
+        # the callback immediately, and _finish() takes the lock itself
+        if started:
+            future.add_done_callback(lambda f: self._finish(address))
+
+        if callback:
+            future.add_done_callback(lambda f: callback(address, f.result()))
+
+        return future
+
+    def get_services(self, address):
+        """
+        Get the cached services of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            List of services, or None if the device has no fresh cache entry
+        """
+        return self.cache.get(address)
+
+    def shutdown(self, wait=False):
+        """
+        Stop the worker pool.
+
+        Args:
+            wait: Whether to wait for running queries to finish
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _query(self, address):
+        """
+        Run the SDP query for a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            List of services (empty on failure)
+        """
+        start = time.time()
+
+        try:
+            services = self.backend.find_services(address)
+        except Exception as e:
+            print(f"Service discovery error for {address}: {str(e)}")
+            self.failures.set(address, str(e))
+            return []
+
+        for service in services:
+            service.setdefault('discovered_at', start)
+
+        self.cache.set(address, services)
+        return services
+
+    def _finish(self, address):
+        """Forget the in-flight query of an address."""
+        with self._lock:
+            self._pending.pop(address, None)
+
+
+class PyBluezSDPBackend:
+    """
+    SDP backend using PyBluez (non-Android platforms).
+    """
+    def find_services(self, address):
+        """
+        Query the services of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            List of dictionaries describing the services
+        """
+        import bluetooth
+
+        return [{
+            'name': service.get('name'),
+            'protocol': service.get('protocol'),
+            'port': service.get('port'),
+            'service_id': service.get('service-id'),
+            'service_classes': service.get('service-classes', []),
+            'profiles': [list(profile) for profile in service.get('profiles', [])],
+            'provider': service.get('provider')
+        } for service in bluetooth.find_service(address=address)]
+
+
+class AndroidSDPBackend:
+    """
+    SDP backend using BluetoothDevice.fetchUuidsWithSdp on Android.
+    """
+    def __init__(self, adapter, timeout=10.0):
+        """
+        Initialize the Android backend.
+
+        Args:
+            adapter: The android.bluetooth.BluetoothAdapter instance
+            timeout: Maximum time to wait for the SDP result in seconds
+        """
+        self.adapter = adapter
+        self.timeout = timeout
+
+    def find_services(self, address):
+        """
+        Query the service UUIDs of a device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            List of dictionaries describing the services
+        """
+        device = self.adapter.getRemoteDevice(address)
+        device.fetchUuidsWithSdp()
+
+        # The fresh result replaces the cached UUIDs once the query completes
+        deadline = time.time() + self.timeout
+        uuids = device.getUuids()
+        while not uuids and time.time() < deadline:
+            time.sleep(0.25)
+            uuids = device.getUuids()
+
+        return [{'service_classes': [uuid.toString()]} for uuid in (uuids or [])]
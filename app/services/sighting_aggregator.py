@@ -0,0 +1,172 @@
+"""
+Sighting aggregator implementation for Signal Catcher app.
+Coalesces repeated device sightings into periodic summary records.
+"""
+import collections
+import threading
+import time
+
+# Number of recent (timestamp, rssi) samples kept per device
+DEFAULT_BUFFER_SIZE = 16
+
+
+class SightingAggregator:
+    """
+    Aggregator sitting between device scanning and storage.
+
+    Sightings are accumulated per address and a single summary record per
+    device is handed to the sink for every aggregation window. Summaries
+    are only emitted by flush_expired() and flush(), which the owner calls
+    periodically, so the sink never runs on the thread adding sightings.
+    """
+    def __init__(self, sink, window=60.0, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Initialize the sighting aggregator.
+
+        Args:
+            sink: Function called with each summarized device record
+            window: Aggregation window in seconds
+            buffer_size: Number of recent samples kept per device
+        """
+        self.sink = sink
+        self.window = window
+        self.buffer_size = buffer_size
+        self.sightings_received = 0
+        self.records_emitted = 0
+        self._entries = {}
+        self._ready = []
+        self._lock = threading.Lock()
+
+    def add(self, device):
+        """
+        Add a device sighting.
+
+        Args:
+            device: Dictionary containing device information
+        """
+        timestamp = device.get('timestamp') or time.time()
+        rssi = device.get('rssi')
+
+        with self._lock:
+            self.sightings_received += 1
+            address = device.get('address')
+            entry = self._entries.get(address)
+
+            # The window ended: keep its summary for the next flush
+            if entry and timestamp - entry['first_seen'] >= self.window:
+                self._ready.append(self._entries.pop(address))
+                entry = None
+
+            if entry is None:
+                entry = {
+                    'device': device,
+                    'samples': collections.deque(maxlen=self.buffer_size),
+                    'count': 0,
+                    'rssi_count': 0,
+                    'rssi_sum': 0,
+                    'rssi_min': None,
+                    'rssi_max': None,
+                    'first_seen': timestamp,
+                    'last_seen': timestamp
+                }
+                self._entries[address] = entry
+
+            entry['device'] = device
+            entry['count'] += 1
+            entry['last_seen'] = max(entry['last_seen'], timestamp)
+            entry['samples'].append((timestamp, rssi))
+
+            # A zero or missing RSSI means the platform did not report one
+            if rssi:
+                entry['rssi_count'] += 1
+                entry['rssi_sum'] += rssi
+                entry['rssi_min'] = rssi if entry['rssi_min'] is None else min(entry['rssi_min'], rssi)
+                entry['rssi_max'] = rssi if entry['rssi_max'] is None else max(entry['rssi_max'], rssi)
+
+    def flush_expired(self, now=None):
+        """
+        Emit summaries for every device whose window has ended, including
+        devices that stopped being seen.
+
+        Args:
+            now: Current time in seconds (defaults to time.time())
+        """
+        with self._lock:
+            ready = self._ready + self._pop_expired(now or time.time())
+            self._ready = []
+
+        self._emit(ready)
+
+    def flush(self):
+        """Emit summaries for all pending devices, e.g. on shutdown."""
+        with self._lock:
+            ready = self._ready + list(self._entries.values())
+            self._ready = []
+            self._entries.clear()
+
+        self._emit(ready)
+
+    def pending_count(self):
+        """
+        Get the number of devices with an open aggregation window.
+
+        Returns:
+            Number of pending devices
+        """
+        with self._lock:
+            return len(self._entries)
+
+    def _pop_expired(self, now):
+        """
+        Remove and return the entries whose window has ended.
+
+        Args:
+            now: Current time in seconds
+
+        Returns:
+            List of expired entries
+        """
+        expired = [address for address, entry in self._entries.items()
+                   if now - entry['first_seen'] >= self.window]
+        return [self._entries.pop(address) for address in expired]
+
+    def _emit(self, entries):
+        """
+        Pass summarized entries to the sink.
+
+        Args:
+            entries: List of aggregation entries
+        """
+        for entry in entries:
+            try:
+                self.sink(self._summarize(entry))
+                self.records_emitted += 1
+            except Exception as e:
+                print(f"Error emitting sighting summary: {str(e)}")
+
+    def _summarize(self, entry):
+        """
+        Build the summary record for an aggregation entry.
+
+        Args:
+            entry: Aggregation entry
+
+        Returns:
+            Dictionary containing the latest device information and a
+            'sightings' summary
+        """
+        rssi_mean = entry['rssi_sum'] / entry['rssi_count'] if entry['rssi_count'] else None
+
+        record = dict(entry['device'])
+        record['rssi'] = round(rssi_mean) if rssi_mean is not None else 0
+        record['timestamp'] = entry['last_seen']
+        record['sightings'] = {
+            'count': entry['count'],
+            'rssi_min': entry['rssi_min'],
+            'rssi_max': entry['rssi_max'],
+            'rssi_mean': rssi_mean,
+            'first_seen': entry['first_seen'],
+            'last_seen': entry['last_seen'],
+            'samples': [list(sample) for sample in entry['samples']]
+        }
+        return record
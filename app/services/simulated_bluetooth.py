@@ -0,0 +1,335 @@
+"""
+Simulated Bluetooth backend for Signal Catcher app.
+Generates a deterministic stream of device sightings for load and scale testing.
+"""
+import heapq
+import math
+import random
+import time
+
+# OUIs used for simulated devices with public addresses
+SIMULATED_OUIS = (
+    (0x00, 0x1A, 0x7D), (0xF0, 0x18, 0x98), (0x3C, 0x5A, 0xB4),
+    (0x00, 0x25, 0x00), (0xAC, 0x37, 0x43), (0x88, 0xC6, 0x26)
+)
+
+# (name, Class of Device, services) templates for simulated devices
+SIMULATED_PROFILES = (
+    ('Headphones', 0x240404, ['Audio Sink', 'AVRCP']),
+    ('Speaker', 0x240414, ['Audio Sink']),
+    ('Phone', 0x5A020C, ['Hands-Free AG', 'OBEX Object Push']),
+    ('Laptop', 0x3A010C, ['Serial Port']),
+    ('Watch', 0x000704, []),
+    ('Keyboard', 0x002540, ['HID']),
+    (None, 0x001F00, [])
+)
+
+# Manufacturer (company) IDs advertised by simulated BLE devices
+SIMULATED_COMPANIES = (0x004C, 0x0006, 0x0075, 0x00E0, 0x0157)
+
+# Range of simulated RSSI values in dBm
+RSSI_MIN = -100
+RSSI_MAX = -30
+
+
+class SimulatedBluetoothBackend:
+    """
+    Seeded Bluetooth scan backend modelling a changing device population.
+
+    Devices arrive and depart as Poisson processes, their RSSI drifts as a
+    random walk and devices using random addresses rotate them periodically.
+    Sightings are generated at a configurable event rate. In realtime mode
+    events are paced against the wall clock; otherwise scan durations are
+    simulated time and events are produced as fast as they are consumed.
+
+    The backend can also be passed as the name and service discovery
+    backend so simulated devices resolve like real ones.
+    """
+    def __init__(self, seed=0, population=1000, event_rate=200.0, mean_dwell=300.0,
+                 return_probability=0.3, rssi_drift=1.0, rssi_noise=3.0,
+                 random_address_fraction=0.5, rotation_interval=900.0,
+                 realtime=True, start_time=None):
+        """
+        Initialize the simulated backend.
+
+        Args:
+            seed: Random seed making the simulation reproducible
+            population: Average number of devices present at once
+            event_rate: Average number of sightings per second
+            mean_dwell: Average time a device stays present in seconds
+            return_probability: Chance that an arrival is a previously seen device
+            rssi_drift: RSSI random walk step in dB per square-root second
+            rssi_noise: Standard deviation of per-sighting RSSI noise in dB
+            random_address_fraction: Fraction of devices using random addresses
+            rotation_interval: Time between random address rotations in seconds
+            realtime: Whether to pace events against the wall clock
+            start_time: Simulated start time (defaults to time.time())
+        """
+        self.rng = random.Random(seed)
+        self.population = population
+        self.event_rate = event_rate
+        self.mean_dwell = mean_dwell
+        self.arrival_rate = population / mean_dwell
+        self.return_probability = return_probability
+        self.rssi_drift = rssi_drift
+        self.rssi_noise = rssi_noise
+        self.random_address_fraction = random_address_fraction
+        self.rotation_interval = rotation_interval
+        self.realtime = realtime
+        self.now = time.time() if start_time is None else start_time
+
+        self.sightings = 0
+        self.arrivals = 0
+        self.departures = 0
+        self.rotations = 0
+
+        self._devices = []
+        self._present = []
+        self._present_index = {}
+        self._departed = []
+        self._departure_heap = []
+        self._by_address = {}
+        self._next_arrival = self.now + self.rng.expovariate(self.arrival_rate)
+
+        # Start with a population that is already in steady state
+        for _ in range(population):
+            self._arrive(self.now)
+
+    def iter_devices(self, duration, cancel_event, make_device_info):
+        """
+        Generate the sightings of one scan.
+
+        Args:
+            duration: Scan duration in seconds
+            cancel_event: threading.Event that stops the scan when set
+            make_device_info: Function building a device dictionary from
+                (name, address, rssi, device_class=...)
+
+        Yields:
+            Dictionaries containing device information
+        """
+        if self.realtime:
+            self.now = max(self.now, time.time())
+        end = self.now + duration
+
+        while not cancel_event.is_set():
+            event_time = self.now + self.rng.expovariate(self.event_rate)
+            if event_time > end:
+                self._advance(end)
+                break
+
+            if self.realtime:
+                # Sleep in short steps so the scan stays cancellable
+                while not cancel_event.is_set() and time.time() < event_time:
+                    time.sleep(min(0.1, max(0, event_time - time.time())))
+
+            self._advance(event_time)
+            if not self._present:
+                continue
+
+            device = self._present[self.rng.randrange(len(self._present))]
+            yield self._sighting(device, make_device_info)
+
+    def lookup_name(self, address):
+        """
+        Get the name of a simulated device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            The name or None
+        """
+        device = self._by_address.get(address)
+        return device['name'] if device else None
+
+    def find_services(self, address):
+        """
+        Get the services of a simulated device.
+
+        Args:
+            address: Device address
+
+        Returns:
+            List of dictionaries describing the services
+        """
+        device = self._by_address.get(address)
+        if not device:
+            raise OSError(f"Simulated device {address} not reachable")
+        return [{'name': name, 'protocol': 'RFCOMM', 'port': port + 1}
+                for port, name in enumerate(device['services'])]
+
+    def get_stats(self):
+        """
+        Get simulation counters.
+
+        Returns:
+            Dictionary with time, present, known devices and event counts
+        """
+        return {
+            'time': self.now,
+            'present': len(self._present),
+            'devices': len(self._devices),
+            'sightings': self.sightings,
+            'arrivals': self.arrivals,
+            'departures': self.departures,
+            'rotations': self.rotations
+        }
+
+    def _advance(self, until):
+        """
+        Apply arrivals and departures up to a point in simulated time.
+
+        Args:
+            until: Simulated time to advance to
+        """
+        while True:
+            next_departure = self._departure_heap[0][0] if self._departure_heap else math.inf
+            if min(self._next_arrival, next_departure) > until:
+                break
+
+            if self._next_arrival <= next_departure:
+                self._arrive(self._next_arrival)
+                self._next_arrival += self.rng.expovariate(self.arrival_rate)
+            else:
+                _, device_id = heapq.heappop(self._departure_heap)
+                self._depart(self._devices[device_id])
+
+        self.now = until
+
+    def _arrive(self, now):
+        """
+        Bring a new or returning device into range.
+
+        Args:
+            now: Simulated arrival time
+        """
+        if self._departed and self.rng.random() < self.return_probability:
+            device = self._departed.pop(self.rng.randrange(len(self._departed)))
+        else:
+            device = self._new_device(now)
+
+        device['rssi_time'] = now
+        self._present_index[device['id']] = len(self._present)
+        self._present.append(device)
+        heapq.heappush(self._departure_heap,
+                       (now + self.rng.expovariate(1 / self.mean_dwell), device['id']))
+        self.arrivals += 1
+
+    def _depart(self, device):
+        """
+        Take a device out of range.
+
+        Args:
+            device: Simulated device dictionary
+        """
+        # Swap with the last element for O(1) removal
+        index = self._present_index.pop(device['id'])
+        last = self._present.pop()
+        if last is not device:
+            self._present[index] = last
+            self._present_index[last['id']] = index
+
+        self._departed.append(device)
+        self.departures += 1
+
+    def _new_device(self, now):
+        """
+        Create a simulated device.
+
+        Args:
+            now: Simulated creation time
+
+        Returns:
+            Simulated device dictionary
+        """
+        name, device_class, services = self.rng.choice(SIMULATED_PROFILES)
+        randomized = self.rng.random() < self.random_address_fraction
+
+        device = {
+            'id': len(self._devices),
+            'name': f"{name} {len(self._devices)}" if name else None,
+            'device_class': device_class,
+            'services': services,
+            'randomized': randomized,
+            'base_rssi': self.rng.uniform(-95, -45),
+            'tx_power': self.rng.choice((-12, -8, -4, 0, 4)),
+            'company_id': self.rng.choice(SIMULATED_COMPANIES),
+            'manufacturer_data': bytes(self.rng.getrandbits(8) for _ in range(6)).hex(),
+            # Stagger rotations so they do not all happen at once
+            'next_rotation': now + self.rng.uniform(0, self.rotation_interval)
+        }
+        device['rssi'] = device['base_rssi']
+        device['address'] = self._new_address(randomized)
+        self._by_address[device['address']] = device
+        self._devices.append(device)
+
+        return device
+
+    def _new_address(self, randomized):
+        """
+        Generate a device address.
+
+        Args:
+            randomized: Whether to generate a resolvable private address
+
+        Returns:
+            Address string
+        """
+        if randomized:
+            # Resolvable private addresses have the top two bits set to 01
+            octets = [(self.rng.getrandbits(8) & 0x3F) | 0x40]
+            octets += [self.rng.getrandbits(8) for _ in range(5)]
+        else:
+            octets = list(self.rng.choice(SIMULATED_OUIS))
+            octets += [self.rng.getrandbits(8) for _ in range(3)]
+
+        return ':'.join(f"{octet:02X}" for octet in octets)
+
+    def _sighting(self, device, make_device_info):
+        """
+        Produce one sighting of a device at the current simulated time.
+
+        Args:
+            device: Simulated device dictionary
+            make_device_info: Function building a device dictionary
+
+        Returns:
+            Dictionary containing device information
+        """
+        now = self.now
+
+        if device['randomized'] and now >= device['next_rotation']:
+            device['address'] = self._new_address(True)
+            self._by_address[device['address']] = device
+            device['next_rotation'] = now + self.rotation_interval
+            self.rotations += 1
+
+        # Random walk pulled back towards the device's typical level
+        elapsed = max(0.0, now - device['rssi_time'])
+        device['rssi'] += self.rng.gauss(0, self.rssi_drift * math.sqrt(elapsed))
+        device['rssi'] += (device['base_rssi'] - device['rssi']) * min(1.0, elapsed / 60)
+        device['rssi'] = min(RSSI_MAX, max(RSSI_MIN, device['rssi']))
+        device['rssi_time'] = now
+
+        rssi = int(round(min(RSSI_MAX, max(RSSI_MIN,
+                                         device['rssi'] + self.rng.gauss(0, self.rssi_noise)))))
+
+        info = make_device_info(device['name'], device['address'], rssi,
+                                device_class=device['device_class'])
+        info['timestamp'] = now
+
+        if device['randomized']:
+            info['protocol'] = 'ble'
+            info['tx_power'] = device['tx_power']
+            info['advertisement'] = {
+                'flags': 0x06,
+                'service_uuids': [],
+                'service_data': {},
+                'manufacturer_data': {device['company_id']: device['manufacturer_data']},
+                'tx_power': device['tx_power'],
+                'local_name': device['name']
+            }
+
+        self.sightings += 1
+        return info
@@ -2,7 +2,24 @@
 Storage service implementation for Signal Catcher app.
 Provides an interface to the database for signal storage operations.
 """
+import itertools
+
 from app.models.database import Database
+from app.services.ir_decoder import DEFAULT_TOLERANCE
+
+# The infrared modules (and numpy, which the normalizer needs) are imported
+# by the methods using them, so Bluetooth-only use does not load them
+
+# Default snapping mode for normalizing imported patterns (ir_normalizer.SNAP_UNIT)
+DEFAULT_SNAP = 'unit'
+
+# Most stored signals verified per similarity search, and the number of
+# band keys they must share with the pattern searched for
+SIMILAR_CANDIDATES = 64
+SIMILAR_MIN_BANDS = 2
+
+# Number of records written per transaction when importing code libraries
+IMPORT_BATCH_SIZE = 1000
 
 class StorageService:
     """
@@ -12,6 +29,8 @@ class StorageService:
     def __init__(self):
         """Initialize the storage service."""
         self.database = Database()
+        self._patterns_indexed = False
+        self._patterns_hashed = False
         
     def save_record(self, record_data):
         """
@@ -25,7 +44,9 @@ class StorageService:
         """
         try:
             # Insert record into database
-            record_id = self.database.insert_signal(record_data)
+            record_data = self._with_pattern_hash(record_data)
+            record_id = self.database.insert_signal(record_data,
+                                                    self._pattern_bands(record_data))
             return record_id is not None
             
         except Exception as e:
@@ -66,6 +87,102 @@ class StorageService:
             print(f"Error retrieving records: {str(e)}")
             return []
             
+    def find_records(self, record_type=None, since=None, until=None, limit=None,
+                     service_mask=None, **filters):
+        """
+        Retrieve signal records by indexed properties.
+        
+        Args:
+            record_type: Optional type to filter by
+            since: Optional minimum timestamp
+            until: Optional maximum timestamp
+            limit: Optional maximum number of records
+            service_mask: Optional Class of Device service bits that must all be set
+            **filters: Indexed property values to match (e.g. address=...,
+                major_class='Audio/Video', ir_protocol='NEC')
+            
+        Returns:
+            List of dictionaries containing record data
+        """
+        try:
+            return self.database.find_signals(record_type, since, until, limit,
+                                              service_mask, **filters)
+            
+        except Exception as e:
+            print(f"Error finding records: {str(e)}")
+            return []
+            
+    def update_device_name(self, address, name):
+        """
+        Fill in the name of stored Bluetooth records that had no name.
+        
+        Args:
+            address: Device address
+            name: Resolved device name
+            
+        Returns:
+            Number of records updated
+        """
+        try:
+            return self.database.update_device_name(address, name)
+            
+        except Exception as e:
+            print(f"Error updating device name: {str(e)}")
+            return 0
+            
+    def get_group_addresses(self, group):
+        """
+        Get the addresses of the Bluetooth devices stored in a group.
+        
+        Args:
+            group: Device group name
+            
+        Returns:
+            List of distinct device addresses
+        """
+        addresses = []
+        for record in self.find_records('bluetooth', device_group=group):
+            address = record.get('address')
+            if address and address not in addresses:
+                addresses.append(address)
+        return addresses
+        
+    def save_presence_events(self, events):
+        """
+        Save device arrive/depart events.
+        
+        Args:
+            events: List of presence event dictionaries
+            
+        Returns:
+            Number of events saved
+        """
+        try:
+            return self.database.insert_presence_events(events)
+            
+        except Exception as e:
+            print(f"Error saving presence events: {str(e)}")
+            return 0
+            
+    def get_presence_events(self, address=None, since=None, limit=None):
+        """
+        Retrieve device arrive/depart events, newest first.
+        
+        Args:
+            address: Optional device address to filter by
+            since: Optional minimum timestamp
+            limit: Optional maximum number of events
+            
+        Returns:
+            List of presence event dictionaries
+        """
+        try:
+            return self.database.get_presence_events(address, since, limit)
+            
+        except Exception as e:
+            print(f"Error retrieving presence events: {str(e)}")
+            return []
+            
     def update_record(self, record_id, record_data):
         """
         Update a signal record.
@@ -78,7 +195,9 @@ class StorageService:
             Boolean indicating success or failure
         """
         try:
-            return self.database.update_signal(record_id, record_data)
+            record_data = self._with_pattern_hash(record_data)
+            return self.database.update_signal(record_id, record_data,
+                                               self._pattern_bands(record_data))
             
         except Exception as e:
             print(f"Error updating record: {str(e)}")
@@ -100,3 +219,322 @@ class StorageService:
         except Exception as e:
             print(f"Error deleting record: {str(e)}")
             return False
+            
+    def find_similar(self, pattern, k=5, tolerance=DEFAULT_TOLERANCE, max_mismatches=0):
+        """
+        Find the stored infrared signals whose pattern matches a captured one.
+        
+        Args:
+            pattern: Captured mark/space durations in microseconds
+            k: Maximum number of signals to return
+            tolerance: Relative timing error accepted on each edge
+            max_mismatches: Number of edges allowed outside the tolerance
+            
+        Returns:
+            List of up to k record dictionaries, best match first, each with
+            added 'mismatches' and 'distance' (mean relative timing difference)
+        """
+        try:
+            from app.services.ir_similarity import band_keys, compare
+            
+            if not self._patterns_indexed:
+                self.index_patterns()
+                
+            candidates = self.database.find_pattern_candidates(band_keys(pattern),
+                                                               SIMILAR_CANDIDATES,
+                                                               SIMILAR_MIN_BANDS)
+            
+            matches = []
+            for record in candidates:
+                record.pop('shared_bands', None)
+                result = compare(pattern, self._record_pattern(record), tolerance)
+                if result is None or result[0] > max_mismatches:
+                    continue
+                    
+                record['mismatches'], record['distance'] = result
+                matches.append(record)
+                
+            matches.sort(key=lambda record: (record['mismatches'], record['distance']))
+            return matches[:k]
+            
+        except Exception as e:
+            print(f"Error finding similar records: {str(e)}")
+            return []
+            
+    def index_patterns(self):
+        """
+        Add stored infrared signals missing from the similarity index, e.g.
+        those recorded before the index existed.
+        
+        Returns:
+            Number of signals indexed
+        """
+        try:
+            entries = []
+            for record in self.database.get_unindexed_signals('infrared'):
+                bands = self._pattern_bands(record)
+                if bands:
+                    entries.append((record['id'], bands))
+                    
+            count = self.database.insert_pattern_bands(entries) if entries else 0
+            self._patterns_indexed = True
+            return count
+            
+        except Exception as e:
+            print(f"Error indexing patterns: {str(e)}")
+            return 0
+            
+    def normalize_records(self, snap=DEFAULT_SNAP, batch_size=1000):
+        """
+        Normalize the patterns of all stored infrared records.
+        
+        Records are processed in batches, each normalized in one vectorized
+        pass and written back in one transaction along with its similarity
+        index band keys.
+        
+        Args:
+            snap: Snapping mode (see ir_normalizer)
+            batch_size: Number of records per batch
+            
+        Returns:
+            Number of records changed
+        """
+        changed = 0
+        try:
+            from app.services.ir_normalizer import normalize_patterns
+            
+            for batch in self.database.iter_signals('infrared', batch_size):
+                records = [record for record in batch if record.get('pattern')]
+                normalized = normalize_patterns([record['pattern'] for record in records],
+                                                [record.get('frequency') for record in records],
+                                                snap)
+                
+                updates = []
+                for record, pattern in zip(records, normalized):
+                    if pattern == record['pattern']:
+                        continue
+                    record['pattern'] = pattern
+                    record['duration'] = sum(pattern) / 1000  # Convert to milliseconds
+                    if isinstance(record.get('data'), dict) and 'pattern' in record['data']:
+                        record['data']['pattern'] = pattern
+                    updates.append(self._with_pattern_hash(record))
+                    
+                changed += self.database.update_signals(
+                    updates, [self._pattern_bands(record) for record in updates])
+                    
+        except Exception as e:
+            print(f"Error normalizing records: {str(e)}")
+            
+        return changed
+        
+    def import_file(self, path, source_format='auto', batch_size=IMPORT_BATCH_SIZE):
+        """
+        Import an infrared code library file (see ir_import).
+        
+        Args:
+            path: Path of a lircd.conf, Pronto hex or IRDB CSV file
+            source_format: Format of the file, or 'auto' to guess it
+            batch_size: Number of records written per transaction
+            
+        Returns:
+            Dictionary with the number of codes read, imported, duplicates
+            (already stored or repeated in the file) and skipped (unreadable)
+        """
+        stats = {'read': 0, 'imported': 0, 'duplicates': 0, 'skipped': 0}
+        try:
+            from app.services import ir_import
+            
+            records = ir_import.iter_file(path, source_format, stats)
+            stats.update(self.import_records(records, batch_size))
+            
+        except Exception as e:
+            print(f"Error importing {path}: {str(e)}")
+            
+        return stats
+        
+    def import_records(self, records, batch_size=IMPORT_BATCH_SIZE, snap=DEFAULT_SNAP):
+        """
+        Store a stream of infrared records, skipping those already stored.
+        
+        Records are consumed in batches; each batch is normalized in one
+        vectorized pass, checked for duplicates by pattern hash and written
+        in one transaction along with its similarity index band keys.
+        
+        Args:
+            records: Iterable of record dictionaries
+            batch_size: Number of records written per transaction
+            snap: Snapping mode for normalizing the patterns (see
+                ir_normalizer), or None to store them as they are
+            
+        Returns:
+            Dictionary with the number of records read, imported and
+            duplicates
+        """
+        stats = {'read': 0, 'imported': 0, 'duplicates': 0}
+        try:
+            from app.services.ir_normalizer import normalize_patterns
+            
+            if not self._patterns_hashed:
+                self.hash_records()
+                
+            records = iter(records)
+            while True:
+                batch = list(itertools.islice(records, batch_size))
+                if not batch:
+                    break
+                stats['read'] += len(batch)
+                
+                if snap:
+                    patterns = normalize_patterns([record.get('pattern') for record in batch],
+                                                  [record.get('frequency') for record in batch],
+                                                  snap)
+                    for record, pattern in zip(batch, patterns):
+                        if not pattern:
+                            continue
+                        record['pattern'] = pattern
+                        record['duration'] = sum(pattern) / 1000  # Convert to milliseconds
+                        if isinstance(record.get('data'), dict) and 'pattern' in record['data']:
+                            record['data']['pattern'] = pattern
+                            
+                batch = [self._with_pattern_hash(record) for record in batch]
+                stored = self.database.get_existing_values(
+                    'pattern_hash', [record['pattern_hash'] for record in batch
+                                     if record.get('pattern_hash')])
+                
+                # Earlier batches are already stored; the seen set only
+                # catches duplicates within this batch
+                new_records = []
+                seen = set(stored)
+                for record in batch:
+                    key = record.get('pattern_hash')
+                    if key and key in seen:
+                        stats['duplicates'] += 1
+                        continue
+                    seen.add(key)
+                    new_records.append(record)
+                    
+                stats['imported'] += self.database.insert_signals(
+                    new_records, [self._pattern_bands(record) for record in new_records])
+                    
+        except Exception as e:
+            print(f"Error importing records: {str(e)}")
+            
+        return stats
+        
+    def export_file(self, path, target_format='auto', batch_size=IMPORT_BATCH_SIZE):
+        """
+        Export the stored infrared records to a code library file (see ir_export).
+        
+        Args:
+            path: Path of the Pronto hex, Flipper .ir or Broadlink file
+            target_format: Format of the file, or 'auto' to guess it
+            batch_size: Number of records read per query
+            
+        Returns:
+            Number of records exported
+        """
+        def records():
+            for batch in self.database.iter_signals('infrared', batch_size):
+                for record in batch:
+                    record['pattern'] = self._record_pattern(record)
+                    yield record
+                    
+        try:
+            from app.services import ir_export
+            
+            return ir_export.write_file(path, records(), target_format)
+            
+        except Exception as e:
+            print(f"Error exporting {path}: {str(e)}")
+            return 0
+            
+    def hash_records(self, batch_size=1000):
+        """
+        Add the pattern hash to stored infrared records missing it, e.g.
+        those recorded before duplicates were detected.
+        
+        Args:
+            batch_size: Number of records per batch
+            
+        Returns:
+            Number of records changed
+        """
+        changed = 0
+        try:
+            for batch in self.database.iter_signals('infrared', batch_size, 'pattern_hash'):
+                updates = [self._with_pattern_hash(record) for record in batch]
+                updates = [record for record in updates if record.get('pattern_hash')]
+                changed += self.database.update_signals(updates)
+                    
+            self._patterns_hashed = True
+            
+        except Exception as e:
+            print(f"Error hashing records: {str(e)}")
+            
+        return changed
+        
+    def _record_pattern(self, record_data):
+        """
+        Get the pattern of an infrared record.
+        
+        Records without a raw pattern but with a decoded code use the
+        encoded waveform of the code.
+        
+        Args:
+            record_data: Dictionary containing record data
+            
+        Returns:
+            List of durations in microseconds, or None
+        """
+        pattern = record_data.get('pattern')
+        if not pattern and isinstance(record_data.get('data'), dict):
+            pattern = record_data['data'].get('pattern')
+            
+        if not pattern and record_data.get('ir_command') is not None:
+            from app.services import ir_encoder
+            
+            try:
+                pattern = ir_encoder.encode(record_data['ir_protocol'],
+                                            record_data.get('ir_address'),
+                                            record_data['ir_command'])['pattern']
+            except ValueError:
+                return None
+                
+        return pattern or None
+        
+    def _pattern_bands(self, record_data):
+        """
+        Compute the similarity index band keys of a record.
+        
+        Args:
+            record_data: Dictionary containing record data
+            
+        Returns:
+            List of band keys, or None for records without a pattern
+        """
+        if record_data.get('type') != 'infrared':
+            return None
+            
+        from app.services.ir_similarity import band_keys
+        
+        pattern = self._record_pattern(record_data)
+        return band_keys(pattern) if pattern else None
+        
+    def _with_pattern_hash(self, record_data):
+        """
+        Add the pattern hash used to find duplicates to an infrared record.
+        
+        Args:
+            record_data: Dictionary containing record data
+            
+        Returns:
+            The record dictionary, with 'pattern_hash' set for infrared
+            records that have a pattern
+        """
+        if record_data.get('type') != 'infrared':
+            return record_data
+            
+        from app.services.ir_similarity import pattern_hash
+        
+        pattern = self._record_pattern(record_data)
+        return dict(record_data, pattern_hash=pattern_hash(pattern) if pattern else None)
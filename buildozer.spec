@@ -13,7 +13,7 @@ package.domain = org.signalcatcher
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,atlas
+source.include_exts = py,png,jpg,kv,atlas,bin
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
@@ -36,7 +36,7 @@ version = 0.1
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy==2.3.1,pyjnius,plyer,android,sqlite3
+requirements = python3,kivy==2.3.1,pyjnius,plyer,android,sqlite3,numpy
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
@@ -0,0 +1,74 @@
+"""
+Tests for BLE advertisement parsing and batching, replaying recorded reports.
+"""
+import json
+
+from app.services.ble_scanner import (BLEScanner, RecordedAdvertisementBackend,
+                                      SCAN_MODE_BALANCED, parse_advertisement)
+
+# Flags, 16-bit service UUID 0x180F and Apple manufacturer data
+ADVERTISEMENT = '020106' '03030f18' '07ff4c0002150102'
+
+# Complete local name "Tag" and TX power -8 dBm
+SCAN_RESPONSE = '0409546167' '020af8'
+
+BATTERY_SERVICE = '0000180f-0000-1000-8000-00805f9b34fb'
+
+
+def write_records(path, records):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+
+def scan(backend, batch_size=32, duration=0.3):
+    scanner = BLEScanner(backend, batch_size)
+    return list(scanner.iter_batches(duration, SCAN_MODE_BALANCED))
+
+
+def test_parse_advertisement():
+    result = parse_advertisement(bytes.fromhex(ADVERTISEMENT + SCAN_RESPONSE))
+    assert result['flags'] == 0x06
+    assert result['service_uuids'] == [BATTERY_SERVICE]
+    assert result['manufacturer_data'] == {0x004C: '02150102'}
+    assert result['local_name'] == 'Tag'
+    assert result['tx_power'] == -8
+
+
+def test_parse_truncated_advertisement():
+    # The name structure claims 9 bytes but only 3 follow
+    result = parse_advertisement(bytes.fromhex('020106' '0a09546167'))
+    assert result['flags'] == 0x06
+    assert result['local_name'] is None
+
+
+def test_replay_merges_scan_responses(tmp_path):
+    path = tmp_path / 'reports.jsonl'
+    write_records(path, [
+        {'address': 'AA:AA:AA:AA:AA:01', 'rssi': -60, 'payload': ADVERTISEMENT},
+        {'address': 'AA:AA:AA:AA:AA:02', 'rssi': -75, 'payload': '020106'},
+        {'address': 'AA:AA:AA:AA:AA:01', 'rssi': -58, 'payload': SCAN_RESPONSE}
+    ])
+
+    batches = scan(RecordedAdvertisementBackend.from_file(str(path)))
+    assert len(batches) == 1
+
+    results = {result['address']: result for result in batches[0]}
+    assert set(results) == {'AA:AA:AA:AA:AA:01', 'AA:AA:AA:AA:AA:02'}
+
+    merged = results['AA:AA:AA:AA:AA:01']
+    assert merged['rssi'] == -58
+    assert merged['advertisement']['service_uuids'] == [BATTERY_SERVICE]
+    assert merged['advertisement']['local_name'] == 'Tag'
+    assert merged['advertisement']['tx_power'] == -8
+    assert results['AA:AA:AA:AA:AA:02']['advertisement']['local_name'] is None
+
+
+def test_replay_splits_full_batches():
+    records = [{'address': f'AA:AA:AA:AA:AA:{i:02X}', 'rssi': -70, 'payload': b'\x02\x01\x06'}
+               for i in range(5)]
+
+    batches = scan(RecordedAdvertisementBackend(records), batch_size=2)
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [result['address'] for batch in batches for result in batch] == \
+        [record['address'] for record in records]
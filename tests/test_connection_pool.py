@@ -0,0 +1,122 @@
+"""
+Tests for sending through the connection pool over local TCP and Unix sockets.
+"""
+import socket
+import socketserver
+import threading
+
+import pytest
+
+from app.services.connection_pool import ConnectionPool, SocketTransport
+
+
+class Collector:
+    """Received bytes per accepted connection."""
+    def __init__(self):
+        self.connections = []
+        self.condition = threading.Condition()
+
+    def handler(self):
+        collector = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with collector.condition:
+                    index = len(collector.connections)
+                    collector.connections.append(b'')
+                while True:
+                    data = self.request.recv(4096)
+                    if not data:
+                        break
+                    with collector.condition:
+                        collector.connections[index] += data
+                        collector.condition.notify_all()
+
+        return Handler
+
+    def wait_for(self, total):
+        with self.condition:
+            assert self.condition.wait_for(
+                lambda: sum(len(data) for data in self.connections) >= total, 5)
+            return list(self.connections)
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def tcp_server():
+    collector = Collector()
+    server = serve(socketserver.ThreadingTCPServer(('127.0.0.1', 0), collector.handler()))
+    yield f"127.0.0.1:{server.server_address[1]}", collector
+    server.shutdown()
+    server.server_close()
+
+
+def closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"127.0.0.1:{port}"
+
+
+def test_tcp_round_trip_reuses_connection(tcp_server):
+    endpoint, collector = tcp_server
+    pool = ConnectionPool(SocketTransport({'AA:BB:CC:DD:EE:01': endpoint}))
+
+    assert pool.send('AA:BB:CC:DD:EE:01', b'hello ', 5) is True
+    assert pool.send('AA:BB:CC:DD:EE:01', b'world', 5) is False
+    assert collector.wait_for(11) == [b'hello world']
+    assert (pool.connects, pool.reuses) == (1, 1)
+
+    pool.close('AA:BB:CC:DD:EE:01')
+    assert pool.send('AA:BB:CC:DD:EE:01', b'!', 5) is True
+    assert collector.wait_for(12) == [b'hello world', b'!']
+    pool.close_all()
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="Unix sockets unavailable")
+def test_unix_socket_round_trip(tmp_path):
+    collector = Collector()
+    path = str(tmp_path / 'device.sock')
+    server = serve(socketserver.ThreadingUnixStreamServer(path, collector.handler()))
+    try:
+        pool = ConnectionPool(SocketTransport({'AA:BB:CC:DD:EE:02': path}))
+        pool.send('AA:BB:CC:DD:EE:02', b'ping', 5)
+        assert collector.wait_for(4) == [b'ping']
+        pool.close_all()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unreachable_endpoint_raises():
+    pool = ConnectionPool(SocketTransport())
+    with pytest.raises(OSError):
+        pool.send(closed_port(), b'ping', 1)
+    assert pool.connects == 0
+
+
+def test_broadcast_over_tcp(tcp_server):
+    pytest.importorskip('kivy')
+    from app.services.bluetooth_service import BluetoothService
+
+    endpoint, collector = tcp_server
+    transport = SocketTransport({'AA:BB:CC:DD:EE:01': endpoint,
+                                 'AA:BB:CC:DD:EE:02': endpoint,
+                                 'AA:BB:CC:DD:EE:03': closed_port()})
+    service = BluetoothService(transport=transport)
+    service.available = True
+
+    results = service.broadcast('on', ['AA:BB:CC:DD:EE:01', 'AA:BB:CC:DD:EE:02',
+                                       'AA:BB:CC:DD:EE:03'], timeout=2, retries=1)
+    assert [(result['address'], result['success']) for result in results] == [
+        ('AA:BB:CC:DD:EE:01', True), ('AA:BB:CC:DD:EE:02', True), ('AA:BB:CC:DD:EE:03', False)]
+    assert results[2]['attempts'] == 2
+    assert collector.wait_for(4) == [b'on', b'on']
+    service.connection_pool.close_all()
@@ -0,0 +1,200 @@
+"""
+Round-trip tests for the Pronto, Broadlink and Flipper Zero .ir codecs.
+"""
+import io
+import random
+
+import pytest
+
+from app.services import ir_broadlink
+from app.services import ir_flipper
+from app.services import ir_pronto
+from app.services.ir_decoder import PROTOCOLS, decode
+from app.services.ir_encoder import encode
+
+# Random patterns checked per codec
+PATTERN_COUNT = 2000
+
+# Carrier frequencies of common remotes (Hz)
+FREQUENCIES = (36000, 38000, 40000, 56000)
+
+
+def random_pattern(rng):
+    """
+    Build a random frame.
+
+    Args:
+        rng: random.Random instance
+
+    Returns:
+        Alternating mark/space durations in microseconds, starting and
+        ending with a mark
+    """
+    length = rng.randrange(1, 140, 2)
+    return [rng.randint(200, 20000) for _ in range(length)]
+
+
+def random_codes(rng, per_protocol=20):
+    """
+    Build random codes that fit each protocol of the decoder table.
+
+    Args:
+        rng: random.Random instance
+        per_protocol: Number of codes per protocol
+
+    Yields:
+        Tuples of (protocol, address, command)
+    """
+    for protocol in PROTOCOLS:
+        if protocol.get('repeat'):
+            continue
+        widths = {}
+        for field, offset, bits, *_ in protocol['layout']:
+            if field in ('address', 'command'):
+                widths[field] = max(widths.get(field, 0), offset + bits)
+        for _ in range(per_protocol):
+            address = rng.getrandbits(widths['address']) if 'address' in widths else 0
+            command = rng.getrandbits(widths['command'])
+            if protocol['name'] == 'RC5X':
+                command |= 0x40  # Lower commands are sent as plain RC5
+            yield protocol['name'], address, command
+
+
+def test_pronto_round_trip():
+    rng = random.Random(1)
+    for _ in range(PATTERN_COUNT):
+        frequency = rng.choice(FREQUENCIES)
+        pattern = random_pattern(rng)
+
+        code = ir_pronto.pattern_to_pronto(frequency, pattern)
+        result = ir_pronto.pronto_to_pattern(code)
+
+        # Durations are counted in carrier periods
+        period = 1e6 / frequency
+        assert abs(result['frequency'] - frequency) <= frequency * 0.01
+        assert len(result['pattern']) == len(pattern)
+        assert all(abs(a - b) <= period for a, b in zip(result['pattern'], pattern))
+        assert result['repeat_pattern'] == []
+
+        # A converted code converts back to itself
+        assert ir_pronto.pattern_to_pronto(result['frequency'], result['pattern'],
+                                           gap=result['gap']) == code
+
+
+def test_pronto_repeat_pattern():
+    code = ir_pronto.pattern_to_pronto(38000, [9000, 4500, 560], [9000, 2250, 560])
+    result = ir_pronto.pronto_to_pattern(code)
+    assert code.split()[2:4] == ['0002', '0002']
+    assert len(result['pattern']) == 3
+    assert len(result['repeat_pattern']) == 3
+
+
+def test_pronto_unmodulated():
+    code = ir_pronto.pattern_to_pronto(0, [500, 500, 500])
+    assert code.startswith('0100')
+    assert ir_pronto.pronto_to_pattern(code)['frequency'] == 0
+
+
+@pytest.mark.parametrize('code', [
+    '',
+    '0000 006D 0001',
+    '0000 006D 0002 0000 0010 0010',
+    '0000 0000 0001 0000 0010 0010',
+    '5000 006D 0001 0000 0010 0010',
+    '0000 006D 0001 0000 0010 00ZZ'
+])
+def test_pronto_invalid(code):
+    with pytest.raises(ValueError):
+        ir_pronto.pronto_to_pattern(code)
+    assert ir_pronto.pronto_to_patterns([code]) == [None]
+
+
+def test_pronto_decodes():
+    for protocol, address, command in random_codes(random.Random(2)):
+        waveform = encode(protocol, address, command)
+        code = ir_pronto.pattern_to_pronto(waveform['frequency'], waveform['pattern'])
+        decoded = decode(ir_pronto.pronto_to_pattern(code)['pattern'])
+        assert (decoded['protocol'], decoded['address'], decoded['command']) == \
+            (protocol, address, command)
+
+
+def test_broadlink_round_trip():
+    rng = random.Random(3)
+    for _ in range(PATTERN_COUNT):
+        pattern = random_pattern(rng)
+
+        code = ir_broadlink.pattern_to_broadlink(pattern)
+        result = ir_broadlink.broadlink_to_pattern(code)
+
+        assert len(result['pattern']) == len(pattern)
+        assert all(abs(a - b) <= ir_broadlink.TICK for a, b in zip(result['pattern'], pattern))
+        assert result['gap'] == round(ir_broadlink.END_GAP_TICKS * ir_broadlink.TICK)
+        assert ir_broadlink.pattern_to_broadlink(result['pattern']) == code
+
+
+def test_broadlink_packet_layout():
+    code = ir_broadlink.pattern_to_broadlink([9000, 4500, 560], repeat=2)
+    packet = ir_broadlink.base64.b64decode(code)
+    assert packet[0] == ir_broadlink.PACKET_IR
+    assert packet[1] == 2
+    assert len(packet) % ir_broadlink.PACKET_ALIGN == 0
+    assert ir_broadlink.broadlink_to_pattern(code)['repeat'] == 2
+
+
+@pytest.mark.parametrize('code', ['', 'not base64!', 'sgAEAAECAwQ=', 'JgAQAAEC'])
+def test_broadlink_invalid(code):
+    with pytest.raises(ValueError):
+        ir_broadlink.broadlink_to_pattern(code)
+    assert ir_broadlink.broadlink_to_patterns([code]) == [None]
+
+
+def test_broadlink_decodes():
+    for protocol, address, command in random_codes(random.Random(4)):
+        waveform = encode(protocol, address, command)
+        code = ir_broadlink.pattern_to_broadlink(waveform['pattern'])
+        decoded = decode(ir_broadlink.broadlink_to_pattern(code)['pattern'])
+        assert (decoded['protocol'], decoded['address'], decoded['command']) == \
+            (protocol, address, command)
+
+
+def test_flipper_round_trip():
+    rng = random.Random(5)
+    signals = [{'name': f"{protocol} {index}", 'ir_protocol': protocol,
+                'ir_address': address, 'ir_command': command}
+               for index, (protocol, address, command) in enumerate(random_codes(rng))]
+    signals += [{'name': f"Raw {index}", 'frequency': rng.choice(FREQUENCIES),
+                 'pattern': random_pattern(rng)} for index in range(50)]
+
+    file = io.StringIO()
+    assert ir_flipper.write_signals(file, signals) == len(signals)
+    file.seek(0)
+    entries = list(ir_flipper.iter_entries(file))
+    assert len(entries) == len(signals)
+
+    for signal, entry in zip(signals, entries):
+        result = ir_flipper.entry_to_signal(entry)
+        assert result['name'] == signal['name']
+
+        if 'ir_protocol' in signal:
+            assert entry['type'] == 'parsed'
+            decoded = decode(result['pattern'])
+            assert (decoded['protocol'], decoded['address'], decoded['command']) == \
+                (signal['ir_protocol'], signal['ir_address'], signal['ir_command'])
+        else:
+            assert entry['type'] == 'raw'
+            assert result['frequency'] == signal['frequency']
+            assert result['pattern'] == signal['pattern']
+
+
+def test_flipper_fields():
+    assert ir_flipper._format_field(0x7F04) == '04 7F 00 00'
+    assert ir_flipper._parse_field('04 7F 00 00') == 0x7F04
+    with pytest.raises(ValueError):
+        ir_flipper._parse_field('0G')
+
+
+def test_flipper_skips_unwritable_signals():
+    file = io.StringIO()
+    assert ir_flipper.write_signals(file, [{'name': 'Empty', 'pattern': []}]) == 0
+    with pytest.raises(ValueError):
+        ir_flipper.entry_to_signal({'name': 'Odd', 'type': 'unknown'})
@@ -0,0 +1,41 @@
+"""
+Tests for the decoder table and its encoder counterpart.
+"""
+import pytest
+
+from app.services.ir_decoder import PROTOCOLS, _biphase_bits, _unpack, decode
+from app.services.ir_encoder import encode
+from app.services.ir_import import _irdb_code
+
+
+def protocol_entry(name):
+    return next(protocol for protocol in PROTOCOLS if protocol['name'] == name)
+
+
+@pytest.mark.parametrize('command', [0x40, 0x45, 0x7F])
+def test_rc5x_round_trip(command):
+    for toggle in (0, 1):
+        decoded = decode(encode('RC5X', 0x1A, command, toggle=toggle)['pattern'])
+        assert (decoded['protocol'], decoded['address'], decoded['command'], decoded['toggle']) == \
+            ('RC5X', 0x1A, command, toggle)
+
+
+def test_rc5x_second_start_bit():
+    # Start bit, S2 (inverted command bit 6), toggle, 5 address bits,
+    # then the low 6 command bits
+    protocol = protocol_entry('RC5X')
+    bits = _biphase_bits(encode('RC5X', 0x05, 0x45)['pattern'], protocol, 0.25)
+    assert bits == [1, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1]
+    assert _unpack(bits, protocol) == {'command': 0x45, 'toggle': 0, 'address': 0x05}
+
+
+def test_rc5x_low_commands_are_rc5():
+    decoded = decode(encode('RC5X', 0x05, 0x05)['pattern'])
+    assert (decoded['protocol'], decoded['address'], decoded['command']) == ('RC5', 0x05, 0x05)
+    with pytest.raises(ValueError):
+        encode('RC5X', 0x05, 0x80)
+
+
+def test_irdb_rc5_extended_function():
+    assert _irdb_code({'protocol': 'RC5', 'device': '5', 'function': '69'}) == ('RC5X', 5, 69)
+    assert _irdb_code({'protocol': 'RC5', 'device': '5', 'function': '5'}) == ('RC5', 5, 5)
@@ -0,0 +1,100 @@
+"""
+Tests for segmenting mode2 captures replayed from text and binary files.
+"""
+import array
+import threading
+
+import pytest
+
+from app.services.ir_encoder import encode
+from app.services.ir_receiver import (IRReceiver, LIRC_MODE2_FREQUENCY, LIRC_MODE2_OVERFLOW,
+                                      LIRC_MODE2_PULSE, LIRC_MODE2_SPACE, LIRC_MODE2_TIMEOUT)
+
+NEC = encode('NEC', 0x04, 0x08)['pattern']
+NEC_REPEAT = [9000, 2250, 560]
+RC5 = encode('RC5', 0x05, 0x0C)['pattern']
+
+
+def edges(pattern):
+    return [(index % 2 == 0, duration) for index, duration in enumerate(pattern)]
+
+
+def read_frames(path, source_format='auto'):
+    return list(IRReceiver(str(path), source_format).iter_frames(threading.Event()))
+
+
+def write_text(path, samples):
+    lines = []
+    for kind, value in samples:
+        if kind is True or kind is False:
+            lines.append(f"{'pulse' if kind else 'space'} {value}")
+        else:
+            lines.append(f"{kind} {value}")
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def write_binary(path, samples):
+    kinds = {True: LIRC_MODE2_PULSE, False: LIRC_MODE2_SPACE, 'timeout': LIRC_MODE2_TIMEOUT,
+             'carrier': LIRC_MODE2_FREQUENCY, 'overflow': LIRC_MODE2_OVERFLOW}
+    data = array.array('I', [kinds[kind] << 24 | value for kind, value in samples])
+    path.write_bytes(data.tobytes())
+
+
+# NEC frame and its repeat code, a timeout, a new carrier, a lone pulse of
+# noise and an RC5 frame ended only by the end of the file
+SAMPLES = ([(False, 500000)] + edges(NEC) + [(False, 40000)] + edges(NEC_REPEAT) +
+           [('timeout', 125000), ('carrier', 36000), (True, 300), (False, 50000)] +
+           edges(RC5))
+
+
+def check_frames(frames):
+    assert [frame['pattern'] for frame in frames] == [NEC, NEC_REPEAT, RC5]
+    assert [frame['gap'] for frame in frames] == [40000, 125000, 0]
+    assert [frame['frequency'] for frame in frames] == [38000, 38000, 36000]
+
+    # Frames are stamped with their start in stream time
+    assert frames[1]['timestamp'] - frames[0]['timestamp'] == \
+        pytest.approx((sum(NEC) + 40000) / 1e6)
+    assert frames[2]['timestamp'] - frames[1]['timestamp'] == \
+        pytest.approx((sum(NEC_REPEAT) + 125000 + 300 + 50000) / 1e6)
+
+
+@pytest.mark.parametrize('source_format', ['text', 'auto'])
+def test_text_capture(tmp_path, source_format):
+    path = tmp_path / 'capture.txt'
+    write_text(path, SAMPLES)
+    check_frames(read_frames(path, source_format))
+
+
+@pytest.mark.parametrize('source_format', ['binary', 'auto'])
+def test_binary_capture(tmp_path, source_format):
+    path = tmp_path / 'capture.bin'
+    write_binary(path, SAMPLES)
+    check_frames(read_frames(path, source_format))
+
+
+def test_signed_text_capture(tmp_path):
+    path = tmp_path / 'capture.txt'
+    path.write_text(' '.join(f"+{d}" if pulse else f"-{d}" for pulse, d in edges(NEC)) +
+                    ' -20000\n')
+    frames = read_frames(path, 'text')
+    assert [frame['pattern'] for frame in frames] == [NEC]
+
+
+def test_binary_overflow_drops_frame(tmp_path):
+    path = tmp_path / 'capture.bin'
+    write_binary(path, edges(NEC[:20]) + [('overflow', 0)] + edges(RC5) + [(False, 30000)])
+
+    receiver = IRReceiver(str(path), 'binary')
+    frames = list(receiver.iter_frames(threading.Event()))
+    assert [frame['pattern'] for frame in frames] == [RC5]
+    assert receiver.overflows == 1
+
+
+def test_binary_partial_sample_is_ignored(tmp_path):
+    path = tmp_path / 'capture.bin'
+    write_binary(path, edges(RC5) + [(False, 30000)])
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02')
+
+    assert [frame['pattern'] for frame in read_frames(path, 'binary')] == [RC5]
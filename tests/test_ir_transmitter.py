@@ -0,0 +1,98 @@
+"""
+Tests for compiling macros into emitter calls within the emitter limits.
+"""
+import pytest
+
+from app.services.ir_encoder import encode
+from app.services.ir_transmitter import (DEFAULT_MAX_COALESCE_GAP, FakeEmitter, IRTransmitter,
+                                         compile_bursts)
+
+NEC = encode('NEC', 0x04, 0x08)['pattern']
+RC5 = encode('RC5', 0x05, 0x0C)['pattern']
+
+
+def nec_step(**options):
+    return dict({'frequency': 38000, 'pattern': NEC}, **options)
+
+
+def send_all(emitter, bursts):
+    # Raises like real hardware when a burst breaks the emitter limits
+    for burst in bursts:
+        emitter.transmit(burst['frequency'], burst['pattern'])
+
+
+def test_repeats_coalesce():
+    bursts = compile_bursts([nec_step(repeat=3, interval=40000)])
+    assert len(bursts) == 1
+    assert bursts[0]['frames'] == 3
+    assert bursts[0]['offset'] == 0
+    assert bursts[0]['pattern'] == NEC + [40000] + NEC + [40000] + NEC
+
+
+def test_trailing_space_joins_the_gap():
+    bursts = compile_bursts([nec_step(pattern=NEC + [30000], delay=20000), nec_step()])
+    assert bursts[0]['pattern'] == NEC + [20000] + NEC
+
+
+def test_long_gap_starts_a_new_burst():
+    delay = DEFAULT_MAX_COALESCE_GAP + 1
+    bursts = compile_bursts([nec_step(delay=delay), nec_step()])
+    assert [burst['frames'] for burst in bursts] == [1, 1]
+    assert bursts[1]['offset'] == pytest.approx((sum(NEC) + delay) / 1e6)
+
+
+def test_frequency_change_starts_a_new_burst():
+    bursts = compile_bursts([nec_step(delay=30000),
+                             {'frequency': 36000, 'pattern': RC5, 'repeat': 2}])
+    assert [(burst['frequency'], burst['frames']) for burst in bursts] == \
+        [(38000, 1), (36000, 2)]
+    assert bursts[1]['offset'] == pytest.approx((sum(NEC) + 30000) / 1e6)
+
+
+def test_coalescing_can_be_disabled():
+    assert len(compile_bursts([nec_step(repeat=3)], coalesce=False)) == 3
+    assert len(compile_bursts([nec_step(), nec_step(coalesce=False), nec_step()])) == 3
+
+
+def test_coalescing_stops_at_the_duration_limit():
+    emitter = FakeEmitter(max_duration=250000, realtime=False)
+    bursts = compile_bursts([nec_step(repeat=10, interval=40000)], emitter.max_duration)
+
+    # Each NEC frame with its gap takes about 108 ms, so two fit per call
+    assert [burst['frames'] for burst in bursts] == [2, 2, 2, 2, 2]
+    send_all(emitter, bursts)
+
+
+def test_long_frames_split_at_spaces():
+    pattern = [500, 1500] * 150 + [500]
+    emitter = FakeEmitter(max_length=100, realtime=False)
+    bursts = compile_bursts([{'frequency': 38000, 'pattern': pattern, 'delay': 10000}],
+                            max_length=emitter.max_length)
+
+    assert len(bursts) == 4
+    assert all(len(burst['pattern']) % 2 == 1 for burst in bursts)
+    send_all(emitter, bursts)
+
+    # Consecutive pieces are one space apart, so the frame is sent unchanged
+    rebuilt = []
+    for burst in bursts:
+        if rebuilt:
+            rebuilt.append(1500)
+        rebuilt.extend(burst['pattern'])
+    assert rebuilt == pattern
+
+
+def test_mark_over_the_duration_limit_is_rejected():
+    with pytest.raises(ValueError):
+        compile_bursts([{'frequency': 38000, 'pattern': [300000, 1000, 500]}], 200000)
+
+
+def test_transmitter_sends_within_limits():
+    emitter = FakeEmitter(max_length=70, realtime=False)
+    transmitter = IRTransmitter(emitter)
+    report = transmitter.submit([nec_step(repeat=3, interval=40000)]).result(timeout=5)
+
+    assert report['success']
+    assert report['frames'] == 3
+    assert [call['pattern'] for call in emitter.calls] == [NEC, NEC, NEC]
+    assert transmitter.get_stats()['bursts'] == 3
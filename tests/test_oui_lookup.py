@@ -0,0 +1,78 @@
+"""
+Tests for building and searching the OUI vendor table.
+"""
+import struct
+
+from app.services.oui_lookup import HEADER_FORMAT, OUIIndex, build_index, parse_oui
+
+# Excerpt of the IEEE MA-L registry text file
+REGISTRY = """\
+OUI/MA-L                                                    Organization
+company_id                                                  Organization
+                                                            Address
+
+00-1A-7D   (hex)\t\tcyber-blue(HK)Ltd
+001A7D     (base 16)\t\tcyber-blue(HK)Ltd
+\t\t\t\tRoom 1408 block C stand Tower
+\t\t\t\tHong Kong  999077
+\t\t\t\tHK
+
+00-03-93   (hex)\t\tApple, Inc.
+000393     (base 16)\t\tApple, Inc.
+\t\t\t\t1 Infinite Loop
+\t\t\t\tCupertino  CA  95014
+\t\t\t\tUS
+
+00-00-0C   (hex)\t\tCisco Systems, Inc
+00000C     (base 16)\t\tCisco Systems, Inc
+\t\t\t\t80 West Tasman Drive
+\t\t\t\tSan Jose  CA  94568
+\t\t\t\tUS
+"""
+
+
+def build(tmp_path, record_size=48):
+    source = tmp_path / 'oui.txt'
+    source.write_text(REGISTRY, encoding='utf-8')
+    output = tmp_path / 'oui.bin'
+    return build_index(str(source), str(output), record_size), str(output)
+
+
+def test_build_and_lookup(tmp_path):
+    count, path = build(tmp_path)
+    assert count == 3
+
+    index = OUIIndex(path)
+    assert len(index) == 3
+    assert index.lookup('00:03:93:12:34:56') == 'Apple, Inc.'
+    assert index.lookup('00-1A-7D-DA-71-13') == 'cyber-blue(HK)Ltd'
+    assert index.lookup('00:00:0c:00:00:01') == 'Cisco Systems, Inc'
+    assert index.lookup('00:03:94:12:34:56') is None
+    index.close()
+
+
+def test_table_is_sorted(tmp_path):
+    _, path = build(tmp_path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    _, count, record_size = struct.unpack_from(HEADER_FORMAT, data)
+    header = struct.calcsize(HEADER_FORMAT)
+    keys = [data[header + i * record_size:header + i * record_size + 3] for i in range(count)]
+    assert keys == sorted(keys)
+
+
+def test_long_names_are_truncated(tmp_path):
+    _, path = build(tmp_path, record_size=8)
+    assert OUIIndex(path).lookup('00:03:93:00:00:00') == 'Apple'
+
+
+def test_randomized_and_invalid_addresses():
+    assert parse_oui('02:00:00:00:00:00') is None
+    assert parse_oui('00:03') is None
+    assert parse_oui('00:03:93:12:34:56') == b'\x00\x03\x93'
+
+
+def test_missing_table(tmp_path):
+    index = OUIIndex(str(tmp_path / 'missing.bin'))
+    assert index.lookup('00:03:93:12:34:56') is None
+    assert index.available is False
@@ -0,0 +1,115 @@
+"""
+Tests for the SDP result cache and query sharing of ServiceDiscovery.
+"""
+import threading
+
+import pytest
+
+from app.services import cache
+from app.services.service_discovery import ServiceDiscovery
+
+ADDRESS = '00:11:22:33:44:55'
+
+
+class FakeClock:
+    """Stand-in for the time module as seen by the cache."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeSDPBackend:
+    """SDP backend answering from a table, counting queries."""
+    def __init__(self, services=None, fail=False):
+        self.services = services or [{'name': 'Serial Port', 'protocol': 'RFCOMM', 'port': 1}]
+        self.fail = fail
+        self.queries = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def find_services(self, address):
+        self.queries.append(address)
+        self.release.wait(5)
+        if self.fail:
+            raise OSError("Host is down")
+        return [dict(service) for service in self.services]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def discovery():
+    discoveries = []
+
+    def make(backend, **options):
+        discoveries.append(ServiceDiscovery(backend, **options))
+        return discoveries[-1]
+
+    yield make
+    for instance in discoveries:
+        instance.shutdown(wait=True)
+
+
+def test_results_are_cached(clock, discovery):
+    backend = FakeSDPBackend()
+    sdp = discovery(backend, ttl=600)
+
+    services = sdp.discover(ADDRESS).result(timeout=5)
+    assert [service['name'] for service in services] == ['Serial Port']
+    assert 'discovered_at' in services[0]
+
+    assert sdp.discover(ADDRESS).result(timeout=5) == services
+    assert sdp.get_services(ADDRESS) == services
+    assert backend.queries == [ADDRESS]
+
+
+def test_cache_expires(clock, discovery):
+    backend = FakeSDPBackend()
+    sdp = discovery(backend, ttl=600)
+    sdp.discover(ADDRESS).result(timeout=5)
+
+    clock.now += 599
+    sdp.discover(ADDRESS).result(timeout=5)
+    assert len(backend.queries) == 1
+
+    clock.now += 2
+    assert sdp.get_services(ADDRESS) is None
+    sdp.discover(ADDRESS).result(timeout=5)
+    assert len(backend.queries) == 2
+
+
+def test_failures_suppress_retries(clock, discovery):
+    backend = FakeSDPBackend(fail=True)
+    sdp = discovery(backend, failure_ttl=60)
+
+    assert sdp.discover(ADDRESS).result(timeout=5) == []
+    assert sdp.discover(ADDRESS).result(timeout=5) == []
+    assert len(backend.queries) == 1
+
+    clock.now += 61
+    backend.fail = False
+    assert len(sdp.discover(ADDRESS).result(timeout=5)) == 1
+    assert len(backend.queries) == 2
+
+
+def test_concurrent_requests_share_a_query(clock, discovery):
+    backend = FakeSDPBackend()
+    backend.release.clear()
+    sdp = discovery(backend)
+
+    called = threading.Semaphore(0)
+    first = sdp.discover(ADDRESS, callback=lambda address, services: called.release())
+    second = sdp.discover(ADDRESS, callback=lambda address, services: called.release())
+    assert first is second
+
+    backend.release.set()
+    assert first.result(timeout=5) == second.result(timeout=5)
+    assert called.acquire(timeout=5) and called.acquire(timeout=5)
+    assert backend.queries == [ADDRESS]
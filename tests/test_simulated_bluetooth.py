@@ -0,0 +1,86 @@
+"""
+Tests for the seeded Bluetooth population simulation.
+"""
+import threading
+
+import pytest
+
+from app.services.simulated_bluetooth import (RSSI_MAX, RSSI_MIN, SIMULATED_OUIS,
+                                              SimulatedBluetoothBackend)
+
+START = 1000000.0
+
+
+def make_device_info(name, address, rssi, device_class=None):
+    return {'name': name, 'address': address, 'rssi': rssi, 'device_class': device_class}
+
+
+def simulate(duration=10.0, **options):
+    options = dict({'population': 200, 'realtime': False, 'start_time': START}, **options)
+    backend = SimulatedBluetoothBackend(**options)
+    return backend, list(backend.iter_devices(duration, threading.Event(), make_device_info))
+
+
+def test_same_seed_gives_the_same_sightings():
+    _, first = simulate(seed=7)
+    _, second = simulate(seed=7)
+    _, other = simulate(seed=8)
+    assert first == second
+    assert first != other
+
+
+def test_sightings_follow_the_event_rate():
+    backend, sightings = simulate(duration=20.0, event_rate=100.0)
+
+    # Poisson count with mean 2000 and standard deviation about 45
+    assert 1800 < len(sightings) < 2200
+    timestamps = [sighting['timestamp'] for sighting in sightings]
+    assert timestamps == sorted(timestamps)
+    assert START <= timestamps[0] and timestamps[-1] <= START + 20.0
+
+    stats = backend.get_stats()
+    assert stats['time'] == START + 20.0
+    assert stats['sightings'] == len(sightings)
+    assert all(RSSI_MIN <= sighting['rssi'] <= RSSI_MAX for sighting in sightings)
+
+
+def test_population_stays_near_its_average():
+    backend, _ = simulate(duration=1200.0, event_rate=5.0, mean_dwell=60.0)
+    stats = backend.get_stats()
+    assert 150 < stats['present'] < 250
+    assert stats['arrivals'] - stats['departures'] == stats['present']
+
+
+def test_addresses():
+    _, sightings = simulate(random_address_fraction=0.5)
+    prefixes = {tuple(int(octet, 16) for octet in sighting['address'].split(':')[:3])
+                for sighting in sightings}
+
+    # Resolvable private addresses start with the bits 01
+    private = {prefix for prefix in prefixes if prefix[0] & 0xC0 == 0x40}
+    assert private
+    assert prefixes - private and prefixes - private <= set(SIMULATED_OUIS)
+
+
+def test_random_addresses_rotate():
+    backend, _ = simulate(duration=120.0, event_rate=20.0, random_address_fraction=1.0,
+                          rotation_interval=30.0)
+    assert backend.get_stats()['rotations'] > 0
+
+
+def test_names_and_services_resolve():
+    backend, sightings = simulate()
+    sighting = next(s for s in sightings if s['name'])
+    assert backend.lookup_name(sighting['address']) == sighting['name']
+    assert isinstance(backend.find_services(sighting['address']), list)
+
+    assert backend.lookup_name('00:00:00:00:00:00') is None
+    with pytest.raises(OSError):
+        backend.find_services('00:00:00:00:00:00')
+
+
+def test_cancelled_scan_stops():
+    backend = SimulatedBluetoothBackend(population=50, realtime=False, start_time=START)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    assert list(backend.iter_devices(10.0, cancel_event, make_device_info)) == []